@@ -0,0 +1,63 @@
+"""add_restaurant_balances
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create restaurant_balances projection table
+    op.create_table(
+        'restaurant_balances',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('restaurant_id', sa.String(length=255), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('available', sa.Integer(), nullable=False),
+        sa.Column('reserved', sa.Integer(), nullable=False),
+        sa.Column('last_entry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('restaurant_id', 'currency', name='uq_restaurant_balance_restaurant_currency')
+    )
+    op.create_index(op.f('ix_restaurant_balances_id'), 'restaurant_balances', ['id'], unique=False)
+
+    # Backfill from the existing ledger
+    op.execute(
+        """
+        INSERT INTO restaurant_balances
+            (id, restaurant_id, currency, available, reserved, last_entry_at, entry_count)
+        SELECT
+            gen_random_uuid(),
+            restaurant_id,
+            currency,
+            SUM(amount),
+            SUM(CASE
+                WHEN entry_type = 'PAYOUT_RESERVE' THEN -amount
+                WHEN entry_type = 'PAYOUT_RELEASE' THEN amount
+                ELSE 0
+            END),
+            MAX(created_at),
+            COUNT(id)
+        FROM ledger_entries
+        GROUP BY restaurant_id, currency
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_restaurant_balances_id'), table_name='restaurant_balances')
+    op.drop_table('restaurant_balances')
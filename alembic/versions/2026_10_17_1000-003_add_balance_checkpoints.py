@@ -0,0 +1,51 @@
+"""add_balance_checkpoints
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create balance_checkpoints table
+    op.create_table(
+        'balance_checkpoints',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('restaurant_id', sa.String(length=255), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('covered_until', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('balance', sa.Integer(), nullable=False),
+        sa.Column('totals', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column('last_entry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('restaurant_id', 'currency', name='uq_balance_checkpoint_restaurant_currency')
+    )
+    op.create_index(op.f('ix_balance_checkpoints_id'), 'balance_checkpoints', ['id'], unique=False)
+
+    # Tail scans after a checkpoint filter on created_at
+    op.create_index(
+        'idx_ledger_restaurant_currency_created',
+        'ledger_entries',
+        ['restaurant_id', 'currency', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ledger_restaurant_currency_created', table_name='ledger_entries')
+    op.drop_index(op.f('ix_balance_checkpoints_id'), table_name='balance_checkpoints')
+    op.drop_table('balance_checkpoints')
@@ -0,0 +1,50 @@
+"""add_payout_runs
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create payout_runs table
+    op.create_table(
+        'payout_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('run_id', sa.String(length=255), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('as_of_date', sa.Date(), nullable=False),
+        sa.Column('min_amount', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='payoutrunstatus'), nullable=False),
+        sa.Column('restaurants_scanned', sa.Integer(), nullable=False),
+        sa.Column('payouts_created', sa.Integer(), nullable=False),
+        sa.Column('failures', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payout_runs_id'), 'payout_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_payout_runs_run_id'), 'payout_runs', ['run_id'], unique=True)
+    op.create_index(op.f('ix_payout_runs_status'), 'payout_runs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payout_runs_status'), table_name='payout_runs')
+    op.drop_index(op.f('ix_payout_runs_run_id'), table_name='payout_runs')
+    op.drop_index(op.f('ix_payout_runs_id'), table_name='payout_runs')
+    op.drop_table('payout_runs')
+    op.execute('DROP TYPE IF EXISTS payoutrunstatus')
@@ -0,0 +1,28 @@
+"""add_payout_run_partitions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-run partition progress
+    op.add_column('payout_runs', sa.Column('partitions', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('payout_runs', sa.Column('partitions_completed', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('payout_runs', 'partitions_completed')
+    op.drop_column('payout_runs', 'partitions')
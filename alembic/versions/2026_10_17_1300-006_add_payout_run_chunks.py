@@ -0,0 +1,47 @@
+"""add_payout_run_chunks
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create payout_run_chunks work queue (shares the payoutrunstatus type)
+    op.create_table(
+        'payout_run_chunks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('run_id', sa.String(length=255), nullable=False),
+        sa.Column('partition', sa.Integer(), nullable=False),
+        sa.Column('status', postgresql.ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='payoutrunstatus', create_type=False), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('claimed_by', sa.String(length=255), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('restaurants_scanned', sa.Integer(), nullable=False),
+        sa.Column('payouts_created', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_id', 'partition', name='uq_payout_run_chunk_run_partition')
+    )
+    op.create_index(op.f('ix_payout_run_chunks_id'), 'payout_run_chunks', ['id'], unique=False)
+    op.create_index('idx_payout_run_chunks_claim', 'payout_run_chunks', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_payout_run_chunks_claim', table_name='payout_run_chunks')
+    op.drop_index(op.f('ix_payout_run_chunks_id'), table_name='payout_run_chunks')
+    op.drop_table('payout_run_chunks')
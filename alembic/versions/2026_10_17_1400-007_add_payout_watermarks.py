@@ -0,0 +1,54 @@
+"""add_payout_watermarks
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create payout_watermarks table
+    op.create_table(
+        'payout_watermarks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('restaurant_id', sa.String(length=255), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('covered_until', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_payout_id', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('restaurant_id', 'currency', name='uq_payout_watermark_restaurant_currency')
+    )
+    op.create_index(op.f('ix_payout_watermarks_id'), 'payout_watermarks', ['id'], unique=False)
+
+    # Existing payouts covered everything up to their reserve entry
+    op.execute(
+        """
+        INSERT INTO payout_watermarks (id, created_at, restaurant_id, currency, covered_until, last_payout_id)
+        SELECT DISTINCT ON (p.restaurant_id, p.currency)
+            gen_random_uuid(), now(), p.restaurant_id, p.currency, l.created_at, p.payout_id
+        FROM payouts p
+        JOIN ledger_entries l
+            ON l.reference_type = 'payout'
+            AND l.reference_id = p.payout_id
+            AND l.entry_type = 'PAYOUT_RESERVE'
+        ORDER BY p.restaurant_id, p.currency, l.created_at DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payout_watermarks_id'), table_name='payout_watermarks')
+    op.drop_table('payout_watermarks')
@@ -0,0 +1,25 @@
+"""add_payout_listing_index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of GET /v1/payouts on (as_of_date, id)
+    op.create_index('idx_payouts_as_of_id', 'payouts', ['as_of_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_payouts_as_of_id', table_name='payouts')
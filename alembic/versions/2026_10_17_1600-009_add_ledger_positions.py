@@ -0,0 +1,78 @@
+"""add_ledger_positions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ledger_entries', sa.Column('position', sa.BigInteger(), nullable=True))
+    op.add_column('restaurant_balances', sa.Column('last_position', sa.BigInteger(), nullable=True))
+    op.add_column('balance_checkpoints', sa.Column('covered_position', sa.BigInteger(), nullable=True))
+
+    # Number existing entries per restaurant in created_at order
+    op.execute(
+        """
+        UPDATE ledger_entries l
+        SET position = numbered.position
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY restaurant_id, currency ORDER BY created_at, id
+            ) AS position
+            FROM ledger_entries
+        ) numbered
+        WHERE l.id = numbered.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE restaurant_balances b
+        SET last_position = COALESCE((
+            SELECT MAX(l.position)
+            FROM ledger_entries l
+            WHERE l.restaurant_id = b.restaurant_id AND l.currency = b.currency
+        ), 0)
+        """
+    )
+    # Checkpoints covered the entries created before covered_until
+    op.execute(
+        """
+        UPDATE balance_checkpoints c
+        SET covered_position = COALESCE((
+            SELECT MAX(l.position)
+            FROM ledger_entries l
+            WHERE l.restaurant_id = c.restaurant_id
+                AND l.currency = c.currency
+                AND l.created_at < c.covered_until
+        ), 0)
+        """
+    )
+
+    op.alter_column('ledger_entries', 'position', nullable=False)
+    op.alter_column('restaurant_balances', 'last_position', nullable=False)
+    op.alter_column('balance_checkpoints', 'covered_position', nullable=False)
+    op.create_index(
+        'idx_ledger_restaurant_currency_position',
+        'ledger_entries',
+        ['restaurant_id', 'currency', 'position'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ledger_restaurant_currency_position', table_name='ledger_entries')
+    op.drop_column('balance_checkpoints', 'covered_position')
+    op.drop_column('restaurant_balances', 'last_position')
+    op.drop_column('ledger_entries', 'position')
@@ -0,0 +1,41 @@
+"""add_payout_watermark_positions
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payout_watermarks', sa.Column('covered_position', sa.BigInteger(), nullable=True))
+
+    # Watermarks covered the entries created up to covered_until
+    op.execute(
+        """
+        UPDATE payout_watermarks w
+        SET covered_position = COALESCE((
+            SELECT MAX(l.position)
+            FROM ledger_entries l
+            WHERE l.restaurant_id = w.restaurant_id
+                AND l.currency = w.currency
+                AND l.created_at <= w.covered_until
+        ), 0)
+        """
+    )
+
+    op.alter_column('payout_watermarks', 'covered_position', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('payout_watermarks', 'covered_position')
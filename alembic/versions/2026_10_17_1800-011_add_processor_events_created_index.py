@@ -0,0 +1,38 @@
+"""add_processor_events_created_index
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Event-id filter warm load reads the newest events first; built without
+    # blocking ingestion
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_processor_events_created',
+            'processor_events',
+            ['created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_processor_events_created',
+            table_name='processor_events',
+            postgresql_concurrently=True,
+        )
@@ -1,6 +1,6 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.database import AsyncSessionLocal
 
@@ -26,3 +26,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency for endpoints that open their own sessions.
+
+    Streaming responses are produced after the request's session from
+    get_db is closed, so they read through a session of their own.
+
+    Returns:
+        Session factory of the application database
+    """
+    return AsyncSessionLocal
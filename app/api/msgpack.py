@@ -0,0 +1,126 @@
+from typing import Annotated, Any, Optional
+
+import msgspec
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BeforeValidator
+from starlette.responses import Response
+
+from app.core.exceptions import UnsupportedMediaTypeError
+from app.schemas.processor import (
+    ProcessorEventBatchRequest,
+    ProcessorEventBatchStruct,
+    ProcessorEventRequest,
+    ProcessorEventStruct,
+)
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPE = "application/json"
+
+_event_decoder = msgspec.msgpack.Decoder(ProcessorEventStruct)
+_batch_decoder = msgspec.msgpack.Decoder(ProcessorEventBatchStruct)
+_encoder = msgspec.msgpack.Encoder()
+
+
+def _media_type(header: Optional[str]) -> str:
+    return (header or "").split(";")[0].strip().lower()
+
+
+def require_json_or_msgpack(request: Request) -> None:
+    """
+    Dependency refusing request bodies that are neither JSON nor MessagePack.
+
+    Raises:
+        UnsupportedMediaTypeError: For any other Content-Type
+    """
+    content_type = _media_type(request.headers.get("content-type"))
+    if content_type not in ("", JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE):
+        raise UnsupportedMediaTypeError(content_type, [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE])
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    Whether the client asked for MessagePack in its Accept header.
+
+    MessagePack must be listed explicitly and ranked at least as high as
+    JSON; wildcards and a missing header get JSON.
+    """
+    quality = {}
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = (piece.strip() for piece in part.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[media_type.lower()] = q
+    msgpack_q = quality.get(MSGPACK_MEDIA_TYPE, 0.0)
+    return msgpack_q > 0 and msgpack_q >= quality.get(JSON_MEDIA_TYPE, 0.0)
+
+
+class MsgPackResponse(Response):
+    """Response with a MessagePack encoded body."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
+
+
+def decode_event(raw: msgspec.Raw) -> ProcessorEventRequest:
+    """
+    Decode a MessagePack event into a validated request model.
+
+    Raises:
+        msgspec.DecodeError: If it is not valid MessagePack or not a valid
+            event (msgspec.ValidationError)
+    """
+    return _event_decoder.decode(raw).to_request()
+
+
+def event_id_of(raw: msgspec.Raw) -> Optional[str]:
+    """Best-effort event_id of a rejected MessagePack event."""
+    try:
+        event_id = msgspec.msgpack.decode(raw).get("event_id")
+    except (msgspec.DecodeError, AttributeError):
+        return None
+    return event_id if isinstance(event_id, str) else None
+
+
+def _invalid_body(error: msgspec.DecodeError) -> RequestValidationError:
+    """422 error for a MessagePack body, shaped like FastAPI's invalid JSON error."""
+    # Raised as is through Pydantic: a ValueError would echo the raw bytes as input
+    return RequestValidationError(
+        [{"type": "msgpack_invalid", "loc": ("body",), "msg": str(error), "input": {}}]
+    )
+
+
+def _decode_msgpack_event(value: Any) -> Any:
+    # FastAPI passes non-JSON bodies through as bytes
+    if not isinstance(value, bytes):
+        return value
+    try:
+        return decode_event(value)
+    except msgspec.DecodeError as e:
+        raise _invalid_body(e) from e
+
+
+def _decode_msgpack_batch(value: Any) -> Any:
+    if not isinstance(value, bytes):
+        return value
+    try:
+        batch = _batch_decoder.decode(value)
+    except msgspec.DecodeError as e:
+        raise _invalid_body(e) from e
+    # Events stay encoded (msgspec.Raw) and are decoded one by one
+    return ProcessorEventBatchRequest.model_construct(events=batch.events)
+
+
+# Request bodies read from JSON (Pydantic) or MessagePack (msgspec)
+ProcessorEventBody = Annotated[ProcessorEventRequest, BeforeValidator(_decode_msgpack_event)]
+ProcessorEventBatchBody = Annotated[
+    ProcessorEventBatchRequest, BeforeValidator(_decode_msgpack_batch)
+]
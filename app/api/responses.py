@@ -0,0 +1,19 @@
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    Streaming response produced while the request body is still being read.
+
+    StreamingResponse watches for client disconnects by reading request
+    messages concurrently, which would swallow body chunks the response
+    iterator has not read yet. Here the body iterator is the only reader of
+    the request; a disconnect surfaces as ClientDisconnect from
+    request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -1,49 +1,36 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
 
-from app.api.deps import get_db
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_db, get_session_factory
+from app.core.database import begin_read_only
+from app.core.etag import etag_matches, make_etag
+from app.core.exceptions import PayoutNotFoundError
 from app.core.logging import get_logger
-from app.schemas.payout import PayoutRunRequest, PayoutRunResponse, PayoutResponse
+from app.models.payout import PayoutStatus
+from app.schemas.payout import (
+    PayoutListResponse,
+    PayoutPreviewResponse,
+    PayoutRunRequest,
+    PayoutRunResponse,
+    PayoutRunStatusResponse,
+    PayoutResponse,
+    PayoutSettlementRequest,
+    PayoutSettlementResponse,
+    SettlementFormat,
+)
+from app.services.event_processor import EventProcessorService
 from app.services.payout_generator import PayoutGeneratorService
+from app.services.payout_runner import PayoutRunService, payout_run_worker
+from app.services.settlement_export import MEDIA_TYPES, SettlementExportService
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 
-async def run_payout_generation_task(
-    currency: str,
-    as_of_date,
-    min_amount: int,
-    db: AsyncSession,
-) -> None:
-    """
-    Background task for generating payouts.
-
-    This runs asynchronously to avoid blocking the API response.
-    """
-    service = PayoutGeneratorService(db)
-
-    try:
-        payouts_created = await service.generate_payouts(
-            currency, as_of_date, min_amount
-        )
-        logger.info(
-            "Payout generation task completed",
-            extra={
-                "currency": currency,
-                "payouts_created": payouts_created,
-            },
-        )
-    except Exception as e:
-        logger.error(
-            "Payout generation task failed",
-            extra={
-                "currency": currency,
-                "error": str(e),
-            },
-        )
-
-
 @router.post(
     "/run",
     response_model=PayoutRunResponse,
@@ -54,13 +41,14 @@ async def run_payout_generation_task(
 )
 async def run_payout_generation(
     request: PayoutRunRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ) -> PayoutRunResponse:
     """
-    Generate payouts for all eligible restaurants.
+    Start payout generation for all eligible restaurants.
 
-    This endpoint triggers an asynchronous batch process that:
+    The run is recorded as one work-queue chunk per restaurant partition.
+    Background workers on every instance claim the chunks and, with their
+    own database sessions:
     1. Finds all restaurants with balance >= min_amount
     2. Creates payout records for each eligible restaurant
     3. Reserves funds by creating ledger entries
@@ -71,49 +59,315 @@ async def run_payout_generation(
     - **min_amount**: Minimum balance in cents to generate payout
 
     **Returns:**
-    - **202 Accepted**: Payout generation started in background
-
-    **Note:** This is a simplified implementation using BackgroundTasks.
-    In production, use Celery or similar task queue.
+    - **202 Accepted**: run_id to poll at GET /v1/payouts/runs/{run_id}
     """
-    # For this implementation, we'll run it synchronously but return quickly
-    # In production, this would be a Celery task
-    service = PayoutGeneratorService(db)
+    service = PayoutRunService(db)
 
-    payouts_created = await service.generate_payouts(
+    run = await service.create_run(
         request.currency.upper(),
         request.as_of,
         request.min_amount,
     )
+    # Workers claim the chunks from their own sessions
+    await db.commit()
+    payout_run_worker.notify()
 
     logger.info(
         "Payout generation initiated",
         extra={
+            "run_id": run.run_id,
             "currency": request.currency,
             "as_of": request.as_of.isoformat(),
             "min_amount": request.min_amount,
-            "payouts_created": payouts_created,
         },
     )
 
     return PayoutRunResponse(
-        status="accepted",
-        message=f"Payout generation completed",
-        payouts_created=payouts_created,
+        run_id=run.run_id,
+        status=run.status,
+        message="Payout generation started",
+    )
+
+
+@router.post(
+    "/settlements:import",
+    response_model=PayoutSettlementResponse,
+    summary="Import a bank settlement",
+    description="Mark many payouts as paid in one transaction",
+    tags=["payouts"],
+)
+async def import_settlement(
+    request: PayoutSettlementRequest,
+    db: AsyncSession = Depends(get_db),
+) -> PayoutSettlementResponse:
+    """
+    Mark the payouts confirmed by a bank settlement file as paid.
+
+    Equivalent to one payout_paid event per payout, applied with set-based
+    statements: one UPDATE ... RETURNING for the statuses and one batched
+    INSERT for the PAYOUT_RELEASE ledger entries.
+
+    **Parameters:**
+    - **payout_ids**: Payouts confirmed as paid
+
+    **Returns:**
+    - Number of payouts marked as paid
+    - Ids skipped because they were already paid, are in another status,
+      or do not exist
+    """
+    service = EventProcessorService(db)
+
+    result = await service.settle_payouts(request.payout_ids)
+
+    return PayoutSettlementResponse(
+        paid=len(result.paid),
+        already_paid=result.already_paid,
+        not_payable=result.not_payable,
+        unknown=result.unknown,
     )
 
 
+@router.get(
+    "",
+    response_model=PayoutListResponse,
+    summary="List payouts",
+    description="List payouts with filters, using cursor pagination",
+    tags=["payouts"],
+)
+async def list_payouts(
+    restaurant_id: Optional[str] = Query(
+        default=None,
+        description="Only payouts of this restaurant",
+    ),
+    currency: Optional[str] = Query(
+        default=None,
+        min_length=3,
+        max_length=3,
+        description="Currency code (ISO 4217)",
+    ),
+    payout_status: Optional[PayoutStatus] = Query(
+        default=None,
+        alias="status",
+        description="Only payouts with this status",
+    ),
+    as_of_from: Optional[date] = Query(
+        default=None,
+        description="Only payouts on or after this date (YYYY-MM-DD)",
+    ),
+    as_of_to: Optional[date] = Query(
+        default=None,
+        description="Only payouts on or before this date (YYYY-MM-DD)",
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor of the previous page",
+    ),
+    limit: int = Query(
+        default=50,
+        ge=1,
+        le=200,
+        description="Page size",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> PayoutListResponse:
+    """
+    List payouts, newest as_of date first, with their breakdown items.
+
+    Pages are keyset-based on (as_of, id): pass the returned `next_cursor`
+    to get the next page. Deep pages are as fast as the first one.
+
+    **Parameters:**
+    - **restaurant_id**, **currency**, **status**: Optional filters
+    - **as_of_from**, **as_of_to**: Optional payout date range (inclusive)
+    - **cursor**: Cursor of the next page
+    - **limit**: Page size (1-200, default 50)
+
+    **Returns:**
+    - Payouts of the page and `next_cursor` (null on the last page)
+
+    **Raises:**
+    - **400 Bad Request**: Invalid cursor
+    """
+    service = PayoutGeneratorService(db)
+
+    return await service.list_payouts(
+        limit,
+        cursor=cursor,
+        restaurant_id=restaurant_id,
+        currency=currency.upper() if currency else None,
+        status=payout_status,
+        as_of_from=as_of_from,
+        as_of_to=as_of_to,
+    )
+
+
+@router.get(
+    "/preview",
+    response_model=PayoutPreviewResponse,
+    summary="Preview payout generation",
+    description="Show the payouts a run would create, without writing anything",
+    tags=["payouts"],
+)
+async def preview_payout_generation(
+    currency: str = Query(
+        ...,
+        min_length=3,
+        max_length=3,
+        description="Currency code (ISO 4217)",
+    ),
+    as_of: date = Query(
+        ...,
+        description="Payout date (YYYY-MM-DD)",
+    ),
+    min_amount: int = Query(
+        ...,
+        gt=0,
+        description="Minimum balance in cents to generate payout",
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor of the previous page",
+    ),
+    limit: int = Query(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Page size",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> PayoutPreviewResponse:
+    """
+    Dry run of POST /v1/payouts/run.
+
+    Computed with the same aggregate query as a run, in a read-only
+    transaction: no payout, item or ledger row is written.
+
+    **Parameters:**
+    - **currency**, **as_of**, **min_amount**: Same as POST /v1/payouts/run
+    - **cursor**: Cursor of the next page
+    - **limit**: Restaurants per page (1-1000, default 100)
+
+    **Returns:**
+    - Number of eligible restaurants and total amount (all pages)
+    - One page of restaurants with their amount and breakdown items
+    - `next_cursor` (null on the last page)
+
+    **Raises:**
+    - **400 Bad Request**: Invalid cursor
+    """
+    await begin_read_only(db)
+    service = PayoutGeneratorService(db)
+
+    return await service.preview_payouts(
+        currency.upper(), as_of, min_amount, limit, cursor=cursor
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export settlement file",
+    description="Stream the payouts of a date with their items as CSV or NDJSON",
+    tags=["payouts"],
+    responses={
+        200: {
+            "content": {
+                "text/csv": {},
+                "application/x-ndjson": {},
+                "application/gzip": {},
+            }
+        }
+    },
+)
+async def export_settlement(
+    currency: str = Query(
+        ...,
+        min_length=3,
+        max_length=3,
+        description="Currency code (ISO 4217)",
+    ),
+    as_of: date = Query(
+        ...,
+        description="Payout date (YYYY-MM-DD)",
+    ),
+    format: SettlementFormat = Query(
+        default=SettlementFormat.CSV,
+        description="csv (one row per payout) or ndjson (one object per payout)",
+    ),
+    compress: bool = Query(
+        default=False,
+        description="Gzip the file",
+    ),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> StreamingResponse:
+    """
+    Stream the settlement file of a payout date.
+
+    Payouts are read with a server-side cursor and sent in chunks, so the
+    file can hold any number of payouts without buffering it in memory.
+
+    **Parameters:**
+    - **currency**: Currency code (e.g., "PEN")
+    - **as_of**: Payout date (YYYY-MM-DD)
+    - **format**: csv (default) or ndjson
+    - **compress**: Gzip the stream (`.gz` download)
+
+    **Returns:**
+    - Settlement file as an attachment: payout_id, restaurant, amount,
+      status, timestamps and breakdown items
+    """
+    currency = currency.upper()
+    service = SettlementExportService(session_factory)
+    filename = service.filename(currency, as_of, format, compress)
+
+    return StreamingResponse(
+        service.stream(currency, as_of, format, compress),
+        media_type="application/gzip" if compress else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/runs/{run_id}",
+    response_model=PayoutRunStatusResponse,
+    summary="Get payout run progress",
+    description="Retrieve status and progress of a payout generation run",
+    tags=["payouts"],
+)
+async def get_payout_run(
+    run_id: str,
+    db: AsyncSession = Depends(get_db),
+) -> PayoutRunStatusResponse:
+    """
+    Get the progress of a payout run.
+
+    **Parameters:**
+    - **run_id**: Run identifier returned by POST /v1/payouts/run
+
+    **Returns:**
+    - Status, restaurants scanned, payouts created, failures and elapsed time
+
+    **Raises:**
+    - **404 Not Found**: Run not found
+    """
+    service = PayoutRunService(db)
+
+    return await service.get_run(run_id)
+
+
 @router.get(
     "/{payout_id}",
     response_model=PayoutResponse,
     summary="Get payout details",
     description="Retrieve details of a specific payout",
     tags=["payouts"],
+    responses={304: {"description": "Payout unchanged since the given ETag"}},
 )
 async def get_payout(
     payout_id: str,
+    if_none_match: Optional[str] = Header(default=None),
     db: AsyncSession = Depends(get_db),
-) -> PayoutResponse:
+) -> Response:
     """
     Get details of a specific payout.
 
@@ -122,20 +376,33 @@ async def get_payout(
 
     **Returns:**
     - Payout details including breakdown items
+    - ETag header; send it back as If-None-Match to get
+      **304 Not Modified** while the payout is unchanged
 
     **Raises:**
     - **404 Not Found**: Payout not found
     """
     service = PayoutGeneratorService(db)
 
-    payout = await service.get_payout(payout_id)
+    # Cached payouts are answered without a query; otherwise status and
+    # paid_at only, items are loaded just for a full response
+    cached = service.get_cached_payout(payout_id)
+    version = cached.version if cached else await service.get_payout_version(payout_id)
+    if version is None:
+        raise PayoutNotFoundError(payout_id)
 
-    logger.info(
-        "Payout retrieved",
-        extra={
-            "payout_id": payout_id,
-            "restaurant_id": payout.restaurant_id,
-        },
-    )
+    etag = make_etag("payout", version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    return payout
+    if cached is None:
+        cached = await service.get_payout_json(payout_id)
+
+    logger.info("Payout retrieved", extra={"payout_id": payout_id})
+
+    # Already serialized: skip response_model validation
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": make_etag("payout", cached.version)},
+    )
@@ -1,14 +1,84 @@
-from fastapi import APIRouter, Depends, Response, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional, Union
 
-from app.api.deps import get_db
+import msgspec
+from fastapi import APIRouter, Depends, Request, Response, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_db, get_session_factory
+from app.api.msgpack import (
+    MSGPACK_MEDIA_TYPE,
+    MsgPackResponse,
+    ProcessorEventBatchBody,
+    ProcessorEventBody,
+    accepts_msgpack,
+    decode_event,
+    event_id_of,
+    require_json_or_msgpack,
+)
+from app.api.responses import RequestStreamingResponse
+from app.config import settings
+from app.core.exceptions import UnsupportedMediaTypeError
 from app.core.logging import get_logger
-from app.schemas.processor import ProcessorEventRequest, ProcessorEventResponse
+from app.schemas.processor import (
+    ProcessorEventRequest,
+    ProcessorEventResponse,
+    ProcessorEventBatchItem,
+    ProcessorEventBatchResponse,
+)
 from app.services.event_processor import EventProcessorService
+from app.services.event_dispatcher import event_dispatcher
+from app.services.event_spool import event_spool
+from app.services.event_stream import (
+    NDJSON_MEDIA_TYPE,
+    EventStreamIngestionService,
+    format_validation_error,
+)
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# MessagePack alongside JSON in the OpenAPI schema of the processor endpoints
+_MSGPACK_CONTENT = {MSGPACK_MEDIA_TYPE: {}}
+
+
+def _msgpack_request_body(schema: str) -> dict:
+    return {
+        "requestBody": {
+            "content": {MSGPACK_MEDIA_TYPE: {"schema": {"$ref": f"#/components/schemas/{schema}"}}}
+        }
+    }
+
+
+def _negotiate(
+    request: Request, body: BaseModel, status_code: int = status.HTTP_200_OK
+) -> Union[BaseModel, MsgPackResponse]:
+    """Return the body as MessagePack if the client's Accept header asks for it."""
+    if accepts_msgpack(request):
+        return MsgPackResponse(body.model_dump(), status_code=status_code)
+    return body
+
+
+def _parse_batch_event(raw_event: Any) -> Union[ProcessorEventRequest, ProcessorEventBatchItem]:
+    """Validate one batch item (JSON object or MessagePack), or build its rejection."""
+    if isinstance(raw_event, msgspec.Raw):
+        try:
+            return decode_event(raw_event)
+        except msgspec.DecodeError as e:
+            event_id, message = event_id_of(raw_event), str(e)
+    elif not isinstance(raw_event, dict):
+        event_id, message = None, "Event is not a JSON object"
+    else:
+        try:
+            return ProcessorEventRequest.model_validate(raw_event)
+        except ValidationError as e:
+            event_id, message = raw_event.get("event_id"), format_validation_error(e)
+    return ProcessorEventBatchItem(
+        event_id=event_id if isinstance(event_id, str) else None,
+        status="rejected",
+        message=message,
+    )
+
 
 @router.post(
     "/events",
@@ -16,22 +86,33 @@ logger = get_logger(__name__)
     summary="Ingest payment processor events",
     description="Process events from payment processor with idempotency",
     tags=["processor"],
+    dependencies=[Depends(require_json_or_msgpack)],
+    openapi_extra=_msgpack_request_body("ProcessorEventRequest"),
     responses={
-        201: {"description": "Event processed for the first time"},
-        200: {"description": "Event already processed (idempotency)"},
+        201: {"description": "Event processed for the first time", "content": _MSGPACK_CONTENT},
+        200: {"description": "Event already processed (idempotency)", "content": _MSGPACK_CONTENT},
+        202: {
+            "description": "Event spooled, applied asynchronously (spool mode)",
+            "content": _MSGPACK_CONTENT,
+        },
+        415: {"description": "Request body is neither JSON nor MessagePack"},
     },
 )
 async def ingest_processor_event(
-    event: ProcessorEventRequest,
+    event: ProcessorEventBody,
+    request: Request,
     response: Response,
     db: AsyncSession = Depends(get_db),
-) -> ProcessorEventResponse:
+) -> Union[ProcessorEventResponse, MsgPackResponse]:
     """
     Ingest and process a payment processor event.
 
     This endpoint is idempotent - submitting the same event_id multiple times
     will only process it once.
 
+    The body can be JSON or MessagePack (`Content-Type: application/msgpack`);
+    send `Accept: application/msgpack` to get a MessagePack response.
+
     **Event Types:**
     - `charge_succeeded`: Money in from successful charge
     - `refund_succeeded`: Money out from refund
@@ -39,12 +120,43 @@ async def ingest_processor_event(
 
     **Returns:**
     - **201 Created**: Event processed for the first time
-    - **200 OK**: Event already processed (idempotency)
+    - **200 OK**: Event already processed (idempotency); recently seen
+      event_ids are answered from the in-memory event-id filter
+    - **202 Accepted**: With EVENT_SPOOL_ENABLED, the event was written to
+      the durable local spool and will be applied asynchronously
     """
     service = EventProcessorService(db)
 
-    # Process the event
-    is_new, message = await service.process_event(event)
+    # Retried deliveries of recently processed events are answered from memory
+    if await service.is_known_duplicate(event.event_id):
+        response.status_code = status.HTTP_200_OK
+        return _negotiate(
+            request,
+            ProcessorEventResponse(
+                event_id=event.event_id,
+                status="already_processed",
+                message="Event already processed",
+            ),
+        )
+
+    if settings.EVENT_SPOOL_ENABLED:
+        await event_spool.append(event)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return _negotiate(
+            request,
+            ProcessorEventResponse(
+                event_id=event.event_id,
+                status="accepted",
+                message="Event accepted for processing",
+            ),
+            status.HTTP_202_ACCEPTED,
+        )
+
+    if settings.EVENT_DISPATCH_ENABLED:
+        # Applied in order with the restaurant's other events, micro-batched
+        is_new, message = await event_dispatcher.submit(event)
+    else:
+        is_new, message = await service.process_event(event)
 
     # Set appropriate status code
     if is_new:
@@ -52,8 +164,141 @@ async def ingest_processor_event(
     else:
         response.status_code = status.HTTP_200_OK
 
-    return ProcessorEventResponse(
-        event_id=event.event_id,
-        status="processed" if is_new else "already_processed",
-        message=message,
+    return _negotiate(
+        request,
+        ProcessorEventResponse(
+            event_id=event.event_id,
+            status="processed" if is_new else "already_processed",
+            message=message,
+        ),
+        response.status_code,
+    )
+
+
+@router.post(
+    "/events:batch",
+    response_model=ProcessorEventBatchResponse,
+    summary="Ingest a batch of payment processor events",
+    description="Process many events in one transaction with idempotency",
+    tags=["processor"],
+    dependencies=[Depends(require_json_or_msgpack)],
+    openapi_extra=_msgpack_request_body("ProcessorEventBatchRequest"),
+    responses={
+        200: {"content": _MSGPACK_CONTENT},
+        415: {"description": "Request body is neither JSON nor MessagePack"},
+    },
+)
+async def ingest_processor_events_batch(
+    batch: ProcessorEventBatchBody,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Union[ProcessorEventBatchResponse, MsgPackResponse]:
+    """
+    Ingest and process a batch of payment processor events.
+
+    Events are deduplicated within the batch and against already processed
+    events, then inserted with multi-row statements in a single transaction.
+    The body can be JSON or MessagePack; MessagePack events are validated
+    one by one with msgspec. `Accept: application/msgpack` selects a
+    MessagePack response.
+
+    **Item statuses:**
+    - `created`: Event processed for the first time
+    - `duplicate`: Event already processed, or repeated in the batch
+    - `rejected`: Event failed validation and was not processed
+    """
+    results: List[Optional[ProcessorEventBatchItem]] = []
+    valid_events: List[ProcessorEventRequest] = []
+    valid_positions: List[int] = []
+
+    for raw_event in batch.events:
+        parsed = _parse_batch_event(raw_event)
+        if isinstance(parsed, ProcessorEventBatchItem):
+            results.append(parsed)
+            continue
+        valid_positions.append(len(results))
+        valid_events.append(parsed)
+        results.append(None)  # Filled in once the batch is processed
+
+    service = EventProcessorService(db)
+    processed = await service.process_events_batch(valid_events)
+
+    for position, (event_id, is_new, message) in zip(valid_positions, processed):
+        results[position] = ProcessorEventBatchItem(
+            event_id=event_id,
+            status="created" if is_new else "duplicate",
+            message=message,
+        )
+
+    response = ProcessorEventBatchResponse(
+        created=sum(1 for r in results if r.status == "created"),
+        duplicates=sum(1 for r in results if r.status == "duplicate"),
+        rejected=sum(1 for r in results if r.status == "rejected"),
+        results=results,
+    )
+
+    logger.info(
+        "Event batch ingested",
+        extra={
+            "received": len(batch.events),
+            "events_created": response.created,
+            "duplicates": response.duplicates,
+            "rejected": response.rejected,
+        },
+    )
+
+    return _negotiate(request, response)
+
+
+@router.post(
+    "/events:stream",
+    response_class=RequestStreamingResponse,
+    summary="Ingest a stream of payment processor events",
+    description=(
+        "Apply an NDJSON stream of events in micro-batches, streaming back per-line results"
+    ),
+    tags=["processor"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": "#/components/schemas/ProcessorEventRequest"}
+                }
+            },
+        }
+    },
+    responses={
+        200: {
+            "description": "One ProcessorEventStreamItem per non-blank line, in line order",
+            "content": {NDJSON_MEDIA_TYPE: {}},
+        },
+        415: {"description": "Request body is not application/x-ndjson"},
+    },
+)
+async def ingest_processor_event_stream(
+    request: Request,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> RequestStreamingResponse:
+    """
+    Ingest an NDJSON stream of payment processor events.
+
+    One ProcessorEventRequest object per line. Lines are parsed as they
+    arrive and applied in micro-batches of EVENT_STREAM_BATCH_SIZE lines,
+    each in its own transaction, so a client can push millions of events
+    over one connection with bounded server memory.
+
+    **Line statuses (streamed back as NDJSON, in line order):**
+    - `created`: Event processed for the first time
+    - `duplicate`: Event already processed, or repeated in its micro-batch
+    - `rejected`: Line is not a valid event (or exceeds EVENT_STREAM_MAX_LINE_BYTES)
+    - `failed`: The micro-batch could not be applied; the line can be resent
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type != NDJSON_MEDIA_TYPE:
+        raise UnsupportedMediaTypeError(content_type, [NDJSON_MEDIA_TYPE])
+
+    service = EventStreamIngestionService(session_factory)
+    return RequestStreamingResponse(
+        service.ingest(request.stream()), media_type=NDJSON_MEDIA_TYPE
     )
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.etag import etag_matches, make_etag
+from app.core.exceptions import RestaurantNotFoundError
 from app.core.logging import get_logger
-from app.schemas.restaurant import RestaurantBalanceResponse
+from app.schemas.restaurant import (
+    RestaurantBalanceResponse,
+    RestaurantBalanceQueryRequest,
+    RestaurantBalanceQueryResponse,
+)
 from app.services.ledger import LedgerService
 
 router = APIRouter()
@@ -16,15 +24,22 @@ logger = get_logger(__name__)
     summary="Get restaurant balance",
     description="Retrieve the current balance for a restaurant",
     tags=["restaurants"],
+    responses={304: {"description": "Balance unchanged since the given ETag"}},
 )
 async def get_restaurant_balance(
     restaurant_id: str,
+    response: Response,
     currency: str = Query(
         default="PEN",
         min_length=3,
         max_length=3,
         description="Currency code (ISO 4217)",
     ),
+    include_breakdown: bool = Query(
+        default=False,
+        description="Include totals per ledger entry type",
+    ),
+    if_none_match: Optional[str] = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ) -> RestaurantBalanceResponse:
     """
@@ -33,18 +48,34 @@ async def get_restaurant_balance(
     **Parameters:**
     - **restaurant_id**: Restaurant identifier (e.g., "res_001")
     - **currency**: Currency code (default: "PEN")
+    - **include_breakdown**: Include totals per ledger entry type
 
     **Returns:**
     - Available balance in cents
     - Last event timestamp
-    - Pending balance (reserved for payouts)
+    - Pending balance (reserved for payouts not yet paid)
+    - Breakdown by entry type (if requested)
+    - ETag header; send it back as If-None-Match to get
+      **304 Not Modified** while the balance is unchanged
 
     **Raises:**
     - **404 Not Found**: Restaurant has no transactions
     """
     service = LedgerService(db)
 
-    balance = await service.get_restaurant_balance(restaurant_id, currency.upper())
+    # Read the version before the balance, so the ETag is never newer than the body
+    version = await service.get_balance_version(restaurant_id, currency.upper())
+    if version is None:
+        raise RestaurantNotFoundError(restaurant_id)
+
+    etag = make_etag("balance", version, include_breakdown)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    balance = await service.get_restaurant_balance(
+        restaurant_id, currency.upper(), include_breakdown
+    )
+    response.headers["ETag"] = etag
 
     logger.info(
         "Balance retrieved",
@@ -56,3 +87,45 @@ async def get_restaurant_balance(
     )
 
     return balance
+
+
+@router.post(
+    "/balances:query",
+    response_model=RestaurantBalanceQueryResponse,
+    response_model_exclude_none=True,
+    summary="Query many restaurant balances",
+    description="Retrieve balances for many restaurants and currencies in one call",
+    tags=["restaurants"],
+)
+async def query_restaurant_balances(
+    request: RestaurantBalanceQueryRequest,
+    db: AsyncSession = Depends(get_db),
+) -> RestaurantBalanceQueryResponse:
+    """
+    Get balances for many restaurants at once.
+
+    Answered with a single query, whatever the number of restaurants.
+
+    **Parameters:**
+    - **restaurant_ids**: Restaurant identifiers
+    - **currencies**: Optional currency filter (default: all currencies)
+
+    **Returns:**
+    - One balance per restaurant and currency with transactions.
+      Restaurants without transactions are omitted.
+    """
+    service = LedgerService(db)
+
+    balances = await service.get_restaurant_balances(
+        request.restaurant_ids, request.currencies
+    )
+
+    logger.info(
+        "Balances queried",
+        extra={
+            "restaurants_requested": len(request.restaurant_ids),
+            "balances_returned": len(balances),
+        },
+    )
+
+    return RestaurantBalanceQueryResponse(balances=balances)
@@ -16,6 +16,78 @@ class Settings(BaseSettings):
     # API
     API_V1_PREFIX: str = "/v1"
 
+    # Ingestion
+    EVENT_BATCH_MAX_SIZE: int = 1000
+
+    # Per-restaurant sharded ingestion: POST /v1/processor/events queues each
+    # event on one of EVENT_DISPATCH_SHARDS bounded queues (by restaurant_id);
+    # one worker per queue applies micro-batches in one transaction
+    EVENT_DISPATCH_ENABLED: bool = False
+    EVENT_DISPATCH_SHARDS: int = 8
+    EVENT_DISPATCH_QUEUE_SIZE: int = 1000
+    EVENT_DISPATCH_BATCH_SIZE: int = 500
+
+    # Durable ingestion spool: POST /v1/processor/events appends events to a
+    # local fsync'd file and answers 202; a drain worker applies them in
+    # batches (each process needs its own directory)
+    EVENT_SPOOL_ENABLED: bool = False
+    EVENT_SPOOL_DIR: str = "./var/spool/events"
+    EVENT_SPOOL_FSYNC_INTERVAL_MS: int = 5
+    EVENT_SPOOL_SEGMENT_BYTES: int = 67108864
+    EVENT_SPOOL_DRAIN_BATCH_SIZE: int = 1000
+    EVENT_SPOOL_DRAIN_POLL_SECONDS: float = 1.0
+
+    # In-memory event-id filter in front of the idempotency check: an LRU
+    # set of recent event_ids plus a scalable Bloom filter (initial capacity,
+    # false positive rate), warm-loaded with the latest stored event_ids
+    EVENT_ID_FILTER_ENABLED: bool = True
+    EVENT_ID_FILTER_LRU_SIZE: int = 100000
+    EVENT_ID_FILTER_BLOOM_CAPACITY: int = 1000000
+    EVENT_ID_FILTER_ERROR_RATE: float = 0.001
+    EVENT_ID_FILTER_WARM_LOAD_LIMIT: int = 1000000
+
+    # Streaming ingestion (POST /v1/processor/events:stream): NDJSON lines
+    # applied per micro-batch transaction, and the longest accepted line
+    EVENT_STREAM_BATCH_SIZE: int = 500
+    EVENT_STREAM_MAX_LINE_BYTES: int = 65536
+
+    # Bulk settlement import (payout_ids per request)
+    PAYOUT_SETTLEMENT_MAX_IDS: int = 50000
+
+    # Balance queries
+    BALANCE_QUERY_MAX_RESTAURANTS: int = 1000
+
+    # In-process balance cache (max size 0 disables it)
+    BALANCE_CACHE_MAX_SIZE: int = 10000
+    BALANCE_CACHE_TTL_SECONDS: int = 30
+
+    # In-process payout detail cache: paid payouts never change and stay
+    # until evicted (LRU); others expire after the TTL
+    PAYOUT_CACHE_MAX_SIZE: int = 10000
+    PAYOUT_CACHE_TTL_SECONDS: int = 5
+
+    # Payout runs: restaurants are split into hash partitions (work-queue
+    # chunks) that workers on every instance claim, each processed in its own
+    # session and transaction (concurrency 0 disables this instance's worker)
+    PAYOUT_RUN_PARTITIONS: int = 16
+    PAYOUT_RUN_CONCURRENCY: int = 4
+    PAYOUT_RUN_PARTITION_RETRIES: int = 2
+    PAYOUT_RUN_LEASE_SECONDS: int = 600
+    PAYOUT_RUN_POLL_SECONDS: int = 5
+
+    # Cross-worker cache invalidation over PostgreSQL LISTEN/NOTIFY
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+
+    # Balance checkpoints (interval 0 disables the background checkpointer)
+    BALANCE_CHECKPOINT_INTERVAL_SECONDS: int = 300
+    BALANCE_CHECKPOINT_LAG_SECONDS: int = 300
+
+    # Settlement export: rows fetched per server-side cursor round trip and
+    # bytes buffered per streamed chunk
+    SETTLEMENT_EXPORT_FETCH_SIZE: int = 1000
+    SETTLEMENT_EXPORT_CHUNK_BYTES: int = 65536
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,215 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+V = TypeVar("V")
+
+# session.info key holding (cache_name, key) pairs to evict once the transaction commits
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded in-process LRU cache with per-entry time-to-live.
+
+    Least recently used entries are evicted once max_size is reached.
+    Not shared between worker processes. A max_size of 0 disables caching.
+
+    A reader that loads a value from the database takes a generation()
+    token before its SELECT and passes it to set(). If the key was
+    invalidated in between, the value may predate the invalidating commit
+    and set() drops it. The last max_size invalidations are remembered per
+    key; older ones only through a shared floor, which can drop a fill that
+    was in fact fresh.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+        # Bumped by every invalidation; per-key generation of recent ones
+        self._generation = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._invalidated_floor = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get a cached value, or None if absent or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def generation(self) -> int:
+        """Token to take before reading a value that will be passed to set()."""
+        return self._generation
+
+    def set(
+        self,
+        key: Hashable,
+        value: V,
+        ttl_seconds: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Cache a value, evicting least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl_seconds: Time-to-live (the cache default if None)
+            generation: generation() taken before the value was read; the
+                value is dropped if the key was invalidated since
+        """
+        if self.max_size <= 0:
+            return
+        if generation is not None and self._invalidated_since(key, generation):
+            self.stale_sets += 1
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (value, self._clock() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove a key. Returns True if it was cached."""
+        self._generation += 1
+        self._invalidated[key] = self._generation
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > max(self.max_size, 1):
+            _, forgotten = self._invalidated.popitem(last=False)
+            self._invalidated_floor = max(self._invalidated_floor, forgotten)
+
+        if self._data.pop(key, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+        self._data.clear()
+        self._generation += 1
+        self._invalidated.clear()
+        self._invalidated_floor = self._generation
+
+    def _invalidated_since(self, key: Hashable, generation: int) -> bool:
+        """Whether the key may have been invalidated after `generation`."""
+        return self._invalidated.get(key, self._invalidated_floor) > generation
+
+    def stats(self) -> Dict[str, int]:
+        """Size and hit/miss/eviction counters."""
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets,
+        }
+
+
+# Named caches, so invalidations can be published to other workers by name
+caches: Dict[str, TTLCache] = {}
+
+
+def register_cache(name: str, cache: TTLCache[V]) -> TTLCache[V]:
+    """Register a cache under a name usable in invalidate_on_commit."""
+    caches[name] = cache
+    return cache
+
+
+def evict(cache_name: str, key: Hashable) -> bool:
+    """Evict a key from a named cache (unknown names are ignored)."""
+    cache = caches.get(cache_name)
+    return cache.invalidate(key) if cache is not None else False
+
+
+def clear_all_caches() -> None:
+    """Empty every registered cache."""
+    for cache in caches.values():
+        cache.clear()
+
+
+def pending_invalidations(session: Session) -> List[Tuple[str, Hashable]]:
+    """(cache_name, key) pairs registered on a session's open transaction."""
+    return session.info.get(_PENDING_INVALIDATIONS, [])
+
+
+def invalidate_on_commit(session: AsyncSession, cache_name: str, key: Hashable) -> None:
+    """
+    Evict a key from a named cache once the session's transaction commits.
+
+    Evicting at commit (not at write time) keeps the old value from being
+    re-cached by a reader that SELECTs after the eviction but before the
+    commit. A reader that SELECTs before the commit and caches after the
+    eviction is covered by the generation token passed to TTLCache.set().
+    Discarded on rollback.
+    """
+    pending: List[Tuple[str, Hashable]] = session.info.setdefault(
+        _PENDING_INVALIDATIONS, []
+    )
+    pending.append((cache_name, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session) -> None:
+    for cache_name, key in session.info.pop(_PENDING_INVALIDATIONS, []):
+        evict(cache_name, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+# Balances keyed by (restaurant_id, currency)
+balance_cache: TTLCache[Any] = register_cache(
+    "balance",
+    TTLCache(
+        max_size=settings.BALANCE_CACHE_MAX_SIZE,
+        ttl_seconds=settings.BALANCE_CACHE_TTL_SECONDS,
+    ),
+)
+
+
+# Serialized payout details keyed by payout_id
+payout_cache: TTLCache[Any] = register_cache(
+    "payout",
+    TTLCache(
+        max_size=settings.PAYOUT_CACHE_MAX_SIZE,
+        ttl_seconds=settings.PAYOUT_CACHE_TTL_SECONDS,
+    ),
+)
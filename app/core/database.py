@@ -1,5 +1,6 @@
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -25,6 +26,22 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+async def begin_read_only(session: AsyncSession) -> None:
+    """
+    Start the session's transaction as a read-only snapshot.
+
+    Must be called before the session runs any other statement. On
+    PostgreSQL the transaction is REPEATABLE READ READ ONLY: every query
+    sees the same snapshot and any write is rejected. Other dialects
+    (SQLite in tests) keep a regular transaction.
+
+    Args:
+        session: Session whose transaction has not started yet
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"))
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting async database sessions.
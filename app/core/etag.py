@@ -0,0 +1,38 @@
+import hashlib
+from typing import Any, Optional
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong, opaque ETag from version components.
+
+    Args:
+        parts: Values identifying the representation version
+            (e.g. an entry count, a status and timestamp)
+
+    Returns:
+        Quoted ETag header value
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Uses weak comparison, as required for If-None-Match (RFC 9110).
+
+    Args:
+        if_none_match: Raw If-None-Match header value, if sent
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current (respond 304)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
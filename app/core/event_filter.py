@@ -0,0 +1,261 @@
+import hashlib
+import math
+from collections import OrderedDict, deque
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# session.info key holding event_ids to remember once the transaction commits
+_PENDING_EVENT_IDS = "pending_event_ids"
+
+# Each new Bloom slice holds twice as many ids with half the error rate
+# (the total false positive rate stays below the configured rate), up to
+# BLOOM_MAX_SLICES slices. Past that, slices of the largest size are
+# rotated and the oldest is dropped, so memory and hashes per lookup stay
+# fixed: forgotten ids only lose the fast path.
+BLOOM_GROWTH = 2
+BLOOM_TIGHTENING = 0.5
+BLOOM_MAX_SLICES = 4
+
+
+class _BloomSlice:
+    """Fixed-size Bloom filter sized for a capacity and error rate."""
+
+    __slots__ = ("capacity", "count", "hashes", "bits", "_array")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.count = 0
+        self.hashes = max(1, math.ceil(-math.log2(error_rate)))
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def add(self, h1: int, h2: int) -> None:
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.bits
+            self._array[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, hashes: tuple) -> bool:
+        h1, h2 = hashes
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.bits
+            if not self._array[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with the number of keys added.
+
+    Keys are added to the newest slice; a new, larger slice with a tighter
+    error rate is started once it reaches its capacity. Once
+    BLOOM_MAX_SLICES slices exist, new slices keep the size of the largest
+    one and the oldest is dropped, so memory is bounded. Membership means
+    "probably added" (false positives at about error_rate), absence means
+    "not added, or forgotten with a dropped slice".
+    """
+
+    def __init__(self, initial_capacity: int, error_rate: float):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self._slices: Deque[_BloomSlice] = deque()
+        self._generation = 0
+        self._add_slice()
+
+    @staticmethod
+    def _hashes(key: str) -> tuple:
+        """Two independent 64-bit hashes, combined per bit (double hashing)."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def _add_slice(self) -> None:
+        # Growth stops at the last slice that fits under BLOOM_MAX_SLICES
+        generation = min(self._generation, BLOOM_MAX_SLICES - 1)
+        self._slices.append(
+            _BloomSlice(
+                self.initial_capacity * BLOOM_GROWTH ** generation,
+                self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** generation,
+            )
+        )
+        self._generation += 1
+        if len(self._slices) > BLOOM_MAX_SLICES:
+            self._slices.popleft()
+
+    def add(self, key: str) -> None:
+        """Add a key (no-op if it is probably present already)."""
+        hashes = self._hashes(key)
+        if any(hashes in bloom for bloom in self._slices):
+            return
+        newest = self._slices[-1]
+        if newest.count >= newest.capacity:
+            self._add_slice()
+            newest = self._slices[-1]
+        newest.add(*hashes)
+
+    def __contains__(self, key: str) -> bool:
+        hashes = self._hashes(key)
+        return any(hashes in bloom for bloom in reversed(self._slices))
+
+    def clear(self) -> None:
+        self._slices.clear()
+        self._generation = 0
+        self._add_slice()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "slices": len(self._slices),
+            "keys": sum(bloom.count for bloom in self._slices),
+            "bytes": sum(len(bloom._array) for bloom in self._slices),
+        }
+
+
+class Membership(Enum):
+    """Answer of the event-id filter."""
+
+    SEEN = "seen"  # In the LRU set: definitely processed
+    MAYBE = "maybe"  # Only in the Bloom filter: probably processed
+    UNSEEN = "unseen"  # Not processed by this process (as far as it remembers)
+
+
+class EventIdFilter:
+    """
+    In-memory filter of processed event_ids in front of the idempotency check.
+
+    An LRU set holds the most recent event_ids exactly; a scalable Bloom
+    filter remembers many more in compact form. Only ids committed to
+    processor_events are added, so an LRU hit is a definite duplicate. A
+    Bloom-only hit is confirmed against the database, and anything else
+    goes through the event_id unique constraint as before. Not shared
+    between worker processes.
+    """
+
+    def __init__(
+        self,
+        lru_size: int = settings.EVENT_ID_FILTER_LRU_SIZE,
+        bloom_capacity: int = settings.EVENT_ID_FILTER_BLOOM_CAPACITY,
+        error_rate: float = settings.EVENT_ID_FILTER_ERROR_RATE,
+    ):
+        self.lru_size = lru_size
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._bloom = ScalableBloomFilter(bloom_capacity, error_rate)
+        self.hits = 0
+        self.probable_hits = 0
+        self.false_positives = 0
+        self.misses = 0
+
+    def check(self, event_id: str) -> Membership:
+        """Look an event_id up without touching the database."""
+        if event_id in self._recent:
+            self._recent.move_to_end(event_id)
+            return Membership.SEEN
+        if event_id in self._bloom:
+            return Membership.MAYBE
+        return Membership.UNSEEN
+
+    async def is_duplicate(
+        self, event_id: str, exists: Callable[[str], Awaitable[bool]]
+    ) -> bool:
+        """
+        Decide whether an event was already processed, if that is cheap.
+
+        Args:
+            event_id: Unique event identifier
+            exists: Database lookup, only called on a Bloom-only hit
+
+        Returns:
+            True if the event is known to be processed; False means "go
+            through the idempotent insert"
+        """
+        membership = self.check(event_id)
+        if membership is Membership.SEEN:
+            self.hits += 1
+            return True
+        if membership is Membership.MAYBE:
+            if await exists(event_id):
+                self.probable_hits += 1
+                self.add(event_id)
+                return True
+            self.false_positives += 1
+            return False
+        self.misses += 1
+        return False
+
+    def add(self, event_id: str) -> None:
+        """Remember a committed event_id, evicting the least recent from the LRU."""
+        self._recent[event_id] = None
+        self._recent.move_to_end(event_id)
+        if len(self._recent) > self.lru_size:
+            self._recent.popitem(last=False)
+        self._bloom.add(event_id)
+
+    async def warm_load(self, event_ids: AsyncIterator[str]) -> int:
+        """
+        Fill the filter from stored events, most recent first.
+
+        Args:
+            event_ids: Processed event_ids, most recently processed first
+
+        Returns:
+            Number of event_ids loaded
+        """
+        recent: List[str] = []
+        loaded = 0
+        async for event_id in event_ids:
+            if len(recent) < self.lru_size:
+                recent.append(event_id)
+            self._bloom.add(event_id)
+            loaded += 1
+        # Oldest first, so the most recent ids are the last to be evicted
+        for event_id in reversed(recent):
+            self._recent[event_id] = None
+        return loaded
+
+    def clear(self) -> None:
+        """Forget every event_id (counters are kept)."""
+        self._recent.clear()
+        self._bloom.clear()
+
+    def stats(self) -> dict:
+        """Sizes and hit/miss counters."""
+        return {
+            "lru_size": len(self._recent),
+            "lru_max_size": self.lru_size,
+            "bloom": self._bloom.stats(),
+            "hits": self.hits,
+            "probable_hits": self.probable_hits,
+            "false_positives": self.false_positives,
+            "misses": self.misses,
+        }
+
+
+# Shared by the API, the event processor and the application lifespan
+event_id_filter = EventIdFilter()
+
+
+def remember_on_commit(session: AsyncSession, event_ids: Iterable[str]) -> None:
+    """
+    Add event_ids to the filter once the session's transaction commits.
+
+    Discarded on rollback, so the filter never holds an id that is not
+    stored in processor_events.
+    """
+    pending: List[str] = session.info.setdefault(_PENDING_EVENT_IDS, [])
+    pending.extend(event_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_event_ids(session: Session) -> None:
+    for event_id in session.info.pop(_PENDING_EVENT_IDS, []):
+        event_id_filter.add(event_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_event_ids(session: Session) -> None:
+    session.info.pop(_PENDING_EVENT_IDS, None)
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 class AppException(Exception):
@@ -82,6 +82,39 @@ class PayoutNotFoundError(AppException):
         )
 
 
+class PayoutRunNotFoundError(AppException):
+    """Raised when a payout run is not found."""
+
+    def __init__(self, run_id: str) -> None:
+        super().__init__(
+            code="PAYOUT_RUN_NOT_FOUND",
+            message=f"Payout run {run_id} not found",
+            details={"run_id": run_id},
+        )
+
+
+class InvalidCursorError(AppException):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, cursor: str) -> None:
+        super().__init__(
+            code="INVALID_CURSOR",
+            message="Invalid pagination cursor",
+            details={"cursor": cursor},
+        )
+
+
+class UnsupportedMediaTypeError(AppException):
+    """Raised when a request body has a content type the endpoint cannot read."""
+
+    def __init__(self, content_type: str, supported: List[str]) -> None:
+        super().__init__(
+            code="UNSUPPORTED_MEDIA_TYPE",
+            message=f"Unsupported content type: {content_type or 'none'}",
+            details={"content_type": content_type, "supported": supported},
+        )
+
+
 class PayoutGenerationError(AppException):
     """Raised when payout generation fails."""
 
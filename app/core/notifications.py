@@ -0,0 +1,167 @@
+import asyncio
+import json
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import clear_all_caches, evict, pending_invalidations
+from app.core.database import engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7000
+
+
+def encode_invalidations(invalidations: List[Tuple[str, Hashable]]) -> List[str]:
+    """
+    Encode (cache_name, key) pairs as JSON NOTIFY payloads.
+
+    Keys are grouped per cache (duplicates dropped, order kept) and split
+    so every payload fits in a NOTIFY. Tuple keys are sent as JSON arrays.
+    """
+    by_cache: Dict[str, Dict[Hashable, Any]] = {}
+    for cache_name, key in invalidations:
+        keys = by_cache.setdefault(cache_name, {})
+        if key not in keys:
+            keys[key] = list(key) if isinstance(key, tuple) else key
+
+    payloads = []
+    for cache_name, keys in by_cache.items():
+        # Size of the payload without keys; each key adds its JSON plus ", "
+        empty_size = len(json.dumps({"cache": cache_name, "keys": []}).encode())
+        chunk: List[Any] = []
+        size = empty_size
+        for key in keys.values():
+            key_size = len(json.dumps(key).encode())
+            if chunk and size + 2 + key_size > MAX_PAYLOAD_BYTES:
+                payloads.append(json.dumps({"cache": cache_name, "keys": chunk}))
+                chunk, size = [], empty_size
+            size += key_size + (2 if chunk else 0)
+            chunk.append(key)
+        if chunk:
+            payloads.append(json.dumps({"cache": cache_name, "keys": chunk}))
+    return payloads
+
+
+def apply_invalidation_payload(payload: str) -> int:
+    """
+    Evict the keys of a NOTIFY payload from the local caches.
+
+    Returns:
+        Number of keys that were cached and got evicted
+    """
+    message = json.loads(payload)
+    evicted = 0
+    for key in message["keys"]:
+        if evict(message["cache"], tuple(key) if isinstance(key, list) else key):
+            evicted += 1
+    return evicted
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_pending_invalidations(session: Session) -> None:
+    """
+    NOTIFY other workers about cache keys written in this transaction.
+
+    PostgreSQL only delivers NOTIFY when the transaction commits, so other
+    workers evict exactly when the new rows become visible.
+    """
+    if not settings.CACHE_INVALIDATION_ENABLED:
+        return
+    invalidations = pending_invalidations(session)
+    if not invalidations or session.bind.dialect.name != "postgresql":
+        return
+
+    connection = session.connection()
+    for payload in encode_invalidations(invalidations):
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": settings.CACHE_INVALIDATION_CHANNEL, "payload": payload},
+        )
+
+
+class CacheInvalidationListener:
+    """
+    Background task that LISTENs for cache invalidations from other workers.
+
+    Holds one dedicated connection. All local caches are cleared whenever
+    the listener (re)connects, since notifications sent while disconnected
+    are lost.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        db_engine: AsyncEngine = engine,
+        reconnect_seconds: float = 5.0,
+    ):
+        self.channel = channel
+        self.engine = db_engine
+        self.reconnect_seconds = reconnect_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            apply_invalidation_payload(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "Invalid cache invalidation payload",
+                extra={"channel": channel, "error": str(e)},
+            )
+
+    async def _listen(self) -> None:
+        """Listen on one connection until it is lost."""
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_connection = raw.driver_connection
+
+            lost: asyncio.Future = asyncio.get_running_loop().create_future()
+            driver_connection.add_termination_listener(
+                lambda _: lost.done() or lost.set_result(None)
+            )
+            await driver_connection.add_listener(self.channel, self._on_notification)
+
+            # Anything cached before we started listening may be stale
+            clear_all_caches()
+            logger.info("Listening for cache invalidations", extra={"channel": self.channel})
+
+            try:
+                await lost
+            finally:
+                if not driver_connection.is_closed():
+                    await driver_connection.remove_listener(
+                        self.channel, self._on_notification
+                    )
+
+    async def _run_forever(self) -> None:
+        """Keep a listening connection open, reconnecting on failure."""
+        while True:
+            try:
+                await self._listen()
+                logger.warning("Cache invalidation connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Cache invalidation listener failed", extra={"error": str(e)})
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def start(self) -> None:
+        """Start the background listener."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Cancel the listener and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import Any, List
+
+from app.core.exceptions import InvalidCursorError
+
+
+def encode_cursor(*parts: Any) -> str:
+    """
+    Build an opaque keyset pagination cursor.
+
+    Args:
+        parts: Sort key values of the last row of a page
+            (e.g. its as_of_date and id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([str(part) for part in parts], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Decode a cursor built by encode_cursor.
+
+    Args:
+        cursor: Cursor sent by the client
+        size: Expected number of sort key values
+
+    Returns:
+        Sort key values, as strings
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(cursor) from e
+    if (
+        not isinstance(parts, list)
+        or len(parts) != size
+        or not all(isinstance(part, str) for part in parts)
+    ):
+        raise InvalidCursorError(cursor)
+    return parts
@@ -5,23 +5,89 @@ from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.core.cache import balance_cache, payout_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.core.event_filter import event_id_filter
 from app.core.logging import setup_logging, get_logger
 from app.core.exceptions import (
     AppException,
     RestaurantNotFoundError,
     PayoutNotFoundError,
+    PayoutRunNotFoundError,
+    UnsupportedMediaTypeError,
 )
+from app.core.notifications import CacheInvalidationListener
+from app.repositories.event import ProcessorEventRepository
+from app.services.balance_checkpointer import BalanceCheckpointer
+from app.services.event_dispatcher import event_dispatcher
+from app.services.event_spool import event_spool
+from app.services.payout_runner import payout_run_worker
 
 # Setup logging
 setup_logging(settings.LOG_LEVEL)
 logger = get_logger(__name__)
 
 
+async def warm_load_event_id_filter() -> None:
+    """Fill the event-id filter with the latest stored event_ids."""
+    try:
+        async with AsyncSessionLocal() as session:
+            loaded = await event_id_filter.warm_load(
+                ProcessorEventRepository(session).stream_recent_event_ids(
+                    settings.EVENT_ID_FILTER_WARM_LOAD_LIMIT
+                )
+            )
+    except Exception as e:
+        # Only the fast path is lost: events still go through the database
+        logger.error("Event-id filter warm load failed", extra={"error": str(e)})
+        return
+    logger.info("Event-id filter warm loaded", extra={"event_ids": loaded})
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     """Application lifespan events."""
     logger.info("Starting application", extra={"app_name": settings.APP_NAME})
+
+    if settings.EVENT_ID_FILTER_ENABLED:
+        await warm_load_event_id_filter()
+
+    checkpointer = None
+    if settings.BALANCE_CHECKPOINT_INTERVAL_SECONDS > 0:
+        checkpointer = BalanceCheckpointer(
+            settings.BALANCE_CHECKPOINT_INTERVAL_SECONDS,
+            settings.BALANCE_CHECKPOINT_LAG_SECONDS,
+        )
+        checkpointer.start()
+
+    invalidation_listener = None
+    if settings.CACHE_INVALIDATION_ENABLED and engine.dialect.name == "postgresql":
+        invalidation_listener = CacheInvalidationListener(
+            settings.CACHE_INVALIDATION_CHANNEL
+        )
+        invalidation_listener.start()
+
+    if settings.PAYOUT_RUN_CONCURRENCY > 0:
+        payout_run_worker.start()
+
+    if settings.EVENT_DISPATCH_ENABLED:
+        event_dispatcher.start()
+
+    if settings.EVENT_SPOOL_ENABLED:
+        # Replays events spooled before the last shutdown or crash
+        event_spool.start()
+
     yield
+
+    if settings.EVENT_SPOOL_ENABLED:
+        await event_spool.stop()
+    if settings.EVENT_DISPATCH_ENABLED:
+        await event_dispatcher.stop()
+    await payout_run_worker.stop()
+    if invalidation_listener is not None:
+        await invalidation_listener.stop()
+    if checkpointer is not None:
+        await checkpointer.stop()
     logger.info("Shutting down application")
 
 
@@ -104,6 +170,56 @@ async def payout_not_found_handler(
     )
 
 
+@app.exception_handler(PayoutRunNotFoundError)
+async def payout_run_not_found_handler(
+    request: Request, exc: PayoutRunNotFoundError
+) -> JSONResponse:
+    """Handle payout run not found errors."""
+    logger.warning(
+        "Payout run not found",
+        extra={
+            "error_code": exc.code,
+            "path": request.url.path,
+            "details": exc.details,
+        },
+    )
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "error": {
+                "code": exc.code,
+                "message": exc.message,
+                "details": exc.details,
+            }
+        },
+    )
+
+
+@app.exception_handler(UnsupportedMediaTypeError)
+async def unsupported_media_type_handler(
+    request: Request, exc: UnsupportedMediaTypeError
+) -> JSONResponse:
+    """Handle request bodies in an unsupported content type."""
+    logger.warning(
+        "Unsupported media type",
+        extra={
+            "error_code": exc.code,
+            "path": request.url.path,
+            "details": exc.details,
+        },
+    )
+    return JSONResponse(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        content={
+            "error": {
+                "code": exc.code,
+                "message": exc.message,
+                "details": exc.details,
+            }
+        },
+    )
+
+
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
     """Handle general application-specific exceptions."""
@@ -142,12 +258,23 @@ async def root() -> dict:
 async def health_check() -> dict:
     """
     Health check endpoint for monitoring.
-    Checks basic application health.
+    Checks basic application health and reports cache counters.
     """
     return {
         "status": "healthy",
         "service": settings.APP_NAME,
         "version": settings.APP_VERSION,
+        "caches": {
+            "balance": balance_cache.stats(),
+            "payout": payout_cache.stats(),
+        },
+        "event_id_filter": (
+            event_id_filter.stats() if settings.EVENT_ID_FILTER_ENABLED else None
+        ),
+        "event_dispatcher": (
+            event_dispatcher.stats() if settings.EVENT_DISPATCH_ENABLED else None
+        ),
+        "event_spool": event_spool.stats() if settings.EVENT_SPOOL_ENABLED else None,
     }
 
 
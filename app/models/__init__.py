@@ -3,6 +3,11 @@ from app.models.processor_event import ProcessorEvent
 from app.models.ledger_entry import LedgerEntry, LedgerEntryType
 from app.models.payout import Payout, PayoutStatus
 from app.models.payout_item import PayoutItem
+from app.models.payout_run import PayoutRun, PayoutRunStatus
+from app.models.payout_run_chunk import PayoutRunChunk
+from app.models.payout_watermark import PayoutWatermark
+from app.models.restaurant_balance import RestaurantBalance
+from app.models.balance_checkpoint import BalanceCheckpoint
 
 __all__ = [
     "BaseModel",
@@ -12,4 +17,10 @@ __all__ = [
     "Payout",
     "PayoutStatus",
     "PayoutItem",
+    "PayoutRun",
+    "PayoutRunStatus",
+    "PayoutRunChunk",
+    "PayoutWatermark",
+    "RestaurantBalance",
+    "BalanceCheckpoint",
 ]
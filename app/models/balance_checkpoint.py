@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class BalanceCheckpoint(BaseModel):
+    """
+    Compacted ledger totals per restaurant and currency.
+
+    Covers every ledger entry of the restaurant up to `covered_position`
+    (see LedgerEntry.position). Balance and breakdown queries add only the
+    entries after that point, so their cost is bounded by the active tail
+    instead of the full history. `covered_until` is the cutoff of the
+    compaction that last advanced the checkpoint.
+    """
+
+    __tablename__ = "balance_checkpoints"
+
+    restaurant_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+
+    currency: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+    )
+
+    covered_until: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    covered_position: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+
+    balance: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    # Sum per LedgerEntryType value, e.g. {"charge": 12000, "fee": -600}
+    totals: Mapped[Dict[str, int]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=dict,
+    )
+
+    last_entry_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    entry_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "restaurant_id",
+            "currency",
+            name="uq_balance_checkpoint_restaurant_currency",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<BalanceCheckpoint(restaurant_id={self.restaurant_id}, "
+            f"currency={self.currency}, covered_until={self.covered_until})>"
+        )
@@ -1,7 +1,7 @@
 import enum
 from typing import Dict, Any, Optional
 
-from sqlalchemy import Integer, String, Enum, Index, JSON
+from sqlalchemy import BigInteger, Integer, String, Enum, Index, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import BaseModel
@@ -64,8 +64,27 @@ class LedgerEntry(BaseModel):
         nullable=True,
     )
 
+    # Position within the restaurant's entries in commit order (1, 2, ...),
+    # assigned under the restaurant_balances row lock
+    position: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
     __table_args__ = (
         Index("idx_ledger_restaurant_currency", "restaurant_id", "currency"),
+        Index(
+            "idx_ledger_restaurant_currency_created",
+            "restaurant_id",
+            "currency",
+            "created_at",
+        ),
+        Index(
+            "idx_ledger_restaurant_currency_position",
+            "restaurant_id",
+            "currency",
+            "position",
+        ),
         Index("idx_ledger_reference", "reference_type", "reference_id"),
     )
 
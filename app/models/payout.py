@@ -81,6 +81,8 @@ class Payout(BaseModel):
             name="uq_payout_restaurant_currency_date",
         ),
         Index("idx_payouts_restaurant", "restaurant_id", "currency", "as_of_date"),
+        # Keyset pagination of payout listings
+        Index("idx_payouts_as_of_id", "as_of_date", "id"),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,105 @@
+import enum
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, Enum, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class PayoutRunStatus(str, enum.Enum):
+    """Status of a payout generation run."""
+
+    PENDING = "pending"  # Accepted, not started yet
+    RUNNING = "running"  # Being processed by a worker
+    COMPLETED = "completed"  # Finished successfully
+    FAILED = "failed"  # Finished with an error
+
+
+class PayoutRun(BaseModel):
+    """
+    Payout generation job.
+
+    Created by POST /v1/payouts/run and processed in the background,
+    so the request returns immediately and progress can be polled.
+    """
+
+    __tablename__ = "payout_runs"
+
+    run_id: Mapped[str] = mapped_column(
+        String(255),
+        unique=True,
+        nullable=False,
+        index=True,
+    )
+
+    currency: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+    )
+
+    as_of_date: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+
+    min_amount: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    status: Mapped[PayoutRunStatus] = mapped_column(
+        Enum(PayoutRunStatus),
+        nullable=False,
+        default=PayoutRunStatus.PENDING,
+        index=True,
+    )
+
+    partitions: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+    )
+
+    partitions_completed: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    restaurants_scanned: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    payouts_created: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    failures: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"<PayoutRun(run_id={self.run_id}, status={self.status})>"
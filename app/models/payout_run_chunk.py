@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Enum, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+from app.models.payout_run import PayoutRunStatus
+
+
+class PayoutRunChunk(BaseModel):
+    """
+    Work-queue item: one restaurant hash partition of a payout run.
+
+    Workers on any instance claim chunks with SELECT ... FOR UPDATE SKIP
+    LOCKED and hold them under a lease; chunks whose lease expired (e.g. the
+    worker crashed) are claimed again.
+    """
+
+    __tablename__ = "payout_run_chunks"
+
+    run_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+
+    partition: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    status: Mapped[PayoutRunStatus] = mapped_column(
+        Enum(PayoutRunStatus),
+        nullable=False,
+        default=PayoutRunStatus.PENDING,
+    )
+
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    claimed_by: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+    )
+
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    restaurants_scanned: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    payouts_created: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "run_id",
+            "partition",
+            name="uq_payout_run_chunk_run_partition",
+        ),
+        Index("idx_payout_run_chunks_claim", "status", "lease_expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<PayoutRunChunk(run_id={self.run_id}, partition={self.partition}, "
+            f"status={self.status})>"
+        )
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class PayoutWatermark(BaseModel):
+    """
+    Last ledger position included in a payout, per restaurant and currency.
+
+    The breakdown of the next payout (gross sales, fees, refunds) only
+    covers ledger entries after `covered_position` (see
+    LedgerEntry.position). `covered_until` is the creation time of the
+    newest entry covered.
+    """
+
+    __tablename__ = "payout_watermarks"
+
+    restaurant_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+
+    currency: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+    )
+
+    covered_until: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    covered_position: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+    last_payout_id: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "restaurant_id",
+            "currency",
+            name="uq_payout_watermark_restaurant_currency",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<PayoutWatermark(restaurant_id={self.restaurant_id}, "
+            f"currency={self.currency}, covered_until={self.covered_until})>"
+        )
@@ -67,6 +67,8 @@ class ProcessorEvent(BaseModel):
 
     __table_args__ = (
         Index("idx_processor_events_restaurant_occurred", "restaurant_id", "occurred_at"),
+        # Newest-first scan of the event-id filter warm load
+        Index("idx_processor_events_created", "created_at"),
     )
 
     def __repr__(self) -> str:
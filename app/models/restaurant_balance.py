@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class RestaurantBalance(BaseModel):
+    """
+    Materialized balance per restaurant and currency.
+
+    Projection of ledger_entries, updated in the same transaction as every
+    ledger insert so balance reads are a single-row lookup.
+    The ledger remains the source of truth; this table can be rebuilt from it.
+    """
+
+    __tablename__ = "restaurant_balances"
+
+    restaurant_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+
+    currency: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+    )
+
+    available: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    reserved: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    last_entry_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    entry_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    # Position of the newest ledger entry; see LedgerEntry.position
+    last_position: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "restaurant_id",
+            "currency",
+            name="uq_restaurant_balance_restaurant_currency",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<RestaurantBalance(restaurant_id={self.restaurant_id}, "
+            f"currency={self.currency}, available={self.available})>"
+        )
@@ -1,11 +1,23 @@
 from app.repositories.base import BaseRepository
+from app.repositories.balance import RestaurantBalanceRepository
+from app.repositories.checkpoint import BalanceCheckpointRepository
 from app.repositories.event import ProcessorEventRepository
 from app.repositories.ledger import LedgerRepository
 from app.repositories.payout import PayoutRepository
+from app.repositories.payout_run import PayoutRunRepository
+from app.repositories.payout_run_chunk import PayoutRunChunkRepository
+from app.repositories.payout_watermark import PayoutWatermarkRepository
+from app.repositories.unit_of_work import UnitOfWork
 
 __all__ = [
     "BaseRepository",
+    "RestaurantBalanceRepository",
+    "BalanceCheckpointRepository",
     "ProcessorEventRepository",
     "LedgerRepository",
     "PayoutRepository",
+    "PayoutRunRepository",
+    "PayoutRunChunkRepository",
+    "PayoutWatermarkRepository",
+    "UnitOfWork",
 ]
@@ -0,0 +1,240 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_on_commit
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.restaurant_balance import RestaurantBalance
+from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+
+def reserved_delta(entry_type: LedgerEntryType, amount: int) -> int:
+    """
+    Change in reserved funds caused by a ledger entry.
+
+    PAYOUT_RESERVE (negative amount) locks funds, PAYOUT_RELEASE (negative
+    amount) frees them again. Other entry types do not touch reserves.
+    """
+    if entry_type == LedgerEntryType.PAYOUT_RESERVE:
+        return -amount
+    if entry_type == LedgerEntryType.PAYOUT_RELEASE:
+        return amount
+    return 0
+
+
+class RestaurantBalanceRepository(BaseRepository[RestaurantBalance]):
+    """Repository for the materialized restaurant_balances projection."""
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(RestaurantBalance, session, uow)
+
+    async def get_for_restaurant(
+        self, restaurant_id: str, currency: str
+    ) -> Optional[RestaurantBalance]:
+        """
+        Get the materialized balance for a restaurant (single-row lookup).
+
+        Args:
+            restaurant_id: Restaurant identifier
+            currency: Currency code
+
+        Returns:
+            RestaurantBalance if the restaurant has ledger entries, None otherwise
+        """
+        result = await self.session.execute(
+            select(RestaurantBalance)
+            .where(
+                and_(
+                    RestaurantBalance.restaurant_id == restaurant_id,
+                    RestaurantBalance.currency == currency,
+                )
+            )
+            # Upserts bypass the identity map, so always take the stored values
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_many(
+        self, restaurant_ids: List[str], currencies: Optional[List[str]] = None
+    ) -> List[RestaurantBalance]:
+        """
+        Get materialized balances for many restaurants in one query.
+
+        Args:
+            restaurant_ids: Restaurant identifiers
+            currencies: Currency codes to include (all if None)
+
+        Returns:
+            Balances ordered by restaurant_id and currency. Restaurants
+            without ledger entries are absent.
+        """
+        conditions = [RestaurantBalance.restaurant_id.in_(restaurant_ids)]
+        if currencies:
+            conditions.append(RestaurantBalance.currency.in_(currencies))
+
+        result = await self.session.execute(
+            select(RestaurantBalance)
+            .where(and_(*conditions))
+            .order_by(RestaurantBalance.restaurant_id, RestaurantBalance.currency)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def apply_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Fold new ledger entries into the projection and assign their positions.
+
+        Deltas are aggregated per (restaurant_id, currency) and applied with a
+        single INSERT ... ON CONFLICT DO UPDATE, so concurrent writers add to
+        the row atomically. Must run in the same transaction as the inserts,
+        and before them: each entry dict gets its `position` from the row's
+        last_position. The row lock is held until commit, so positions of a
+        restaurant follow commit order and never leave a gap that is filled
+        later. Cached balances for the affected keys are evicted when it
+        commits.
+
+        Args:
+            entries: Column values of the ledger entries being inserted
+        """
+        deltas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entry in entries:
+            key = (entry["restaurant_id"], entry["currency"])
+            delta = deltas.setdefault(
+                key,
+                {
+                    "restaurant_id": entry["restaurant_id"],
+                    "currency": entry["currency"],
+                    "available": 0,
+                    "reserved": 0,
+                    "entry_count": 0,
+                    "last_entry_at": func.now(),
+                    "last_position": 0,
+                },
+            )
+            delta["available"] += entry["amount"]
+            delta["reserved"] += reserved_delta(entry["entry_type"], entry["amount"])
+            delta["entry_count"] += 1
+            delta["last_position"] += 1
+
+        if not deltas:
+            return
+
+        for key in deltas:
+            invalidate_on_commit(self.session, "balance", key)
+
+        # Stable key order keeps concurrent upserts from deadlocking
+        stmt = self._upsert().values([deltas[key] for key in sorted(deltas)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["restaurant_id", "currency"],
+            set_={
+                "available": RestaurantBalance.available + stmt.excluded.available,
+                "reserved": RestaurantBalance.reserved + stmt.excluded.reserved,
+                "entry_count": RestaurantBalance.entry_count + stmt.excluded.entry_count,
+                "last_entry_at": stmt.excluded.last_entry_at,
+                "last_position": RestaurantBalance.last_position
+                + stmt.excluded.last_position,
+            },
+        ).returning(
+            RestaurantBalance.restaurant_id,
+            RestaurantBalance.currency,
+            RestaurantBalance.last_position,
+        )
+        result = await self.session.execute(stmt)
+
+        # Number the entries of each key up to its new last_position
+        next_position: Dict[Tuple[str, str], int] = {}
+        for row in result:
+            key = (row.restaurant_id, row.currency)
+            next_position[key] = row.last_position - deltas[key]["last_position"] + 1
+        for entry in entries:
+            key = (entry["restaurant_id"], entry["currency"])
+            entry["position"] = next_position[key]
+            next_position[key] += 1
+
+    async def compute_from_ledger(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Aggregate the ledger into projection values.
+
+        Returns:
+            Projection values keyed by (restaurant_id, currency)
+        """
+        reserved = case(
+            (LedgerEntry.entry_type == LedgerEntryType.PAYOUT_RESERVE, -LedgerEntry.amount),
+            (LedgerEntry.entry_type == LedgerEntryType.PAYOUT_RELEASE, LedgerEntry.amount),
+            else_=0,
+        )
+        result = await self.session.execute(
+            select(
+                LedgerEntry.restaurant_id,
+                LedgerEntry.currency,
+                func.sum(LedgerEntry.amount).label("available"),
+                func.sum(reserved).label("reserved"),
+                func.max(LedgerEntry.created_at).label("last_entry_at"),
+                func.count(LedgerEntry.id).label("entry_count"),
+                func.max(LedgerEntry.position).label("last_position"),
+            ).group_by(LedgerEntry.restaurant_id, LedgerEntry.currency)
+        )
+        return {
+            (row.restaurant_id, row.currency): {
+                "restaurant_id": row.restaurant_id,
+                "currency": row.currency,
+                "available": int(row.available),
+                "reserved": int(row.reserved),
+                "last_entry_at": row.last_entry_at,
+                "entry_count": int(row.entry_count),
+                "last_position": int(row.last_position),
+            }
+            for row in result
+        }
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the whole projection from the ledger.
+
+        Returns:
+            Number of balance rows written
+        """
+        computed = await self.compute_from_ledger()
+        await self.session.execute(delete(RestaurantBalance))
+        return await self.bulk_create(list(computed.values()))
+
+    async def find_mismatches(self) -> List[Dict[str, Any]]:
+        """
+        Compare the projection against the ledger.
+
+        Returns:
+            One item per (restaurant_id, currency) whose available, reserved,
+            entry_count or last_position differs, with both the expected and
+            stored values
+        """
+        fields = ("available", "reserved", "entry_count", "last_position")
+        expected = await self.compute_from_ledger()
+        result = await self.session.execute(select(RestaurantBalance))
+        stored = {(b.restaurant_id, b.currency): b for b in result.scalars()}
+
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys()):
+            want = expected.get(key)
+            have = stored.get(key)
+            have_values = (
+                {f: getattr(have, f) for f in fields}
+                if have
+                else None
+            )
+            want_values = (
+                {f: want[f] for f in fields}
+                if want
+                else None
+            )
+            if have_values != want_values:
+                mismatches.append(
+                    {
+                        "restaurant_id": key[0],
+                        "currency": key[1],
+                        "expected": want_values,
+                        "stored": have_values,
+                    }
+                )
+        return mismatches
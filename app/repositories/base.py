@@ -1,10 +1,12 @@
-from typing import Generic, TypeVar, Type, Optional, List
-from uuid import UUID
+from typing import Any, Dict, Generic, TypeVar, Type, Optional, List
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import String, any_, bindparam, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.base import BaseModel
+from app.repositories.unit_of_work import UnitOfWork, column_values
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
@@ -14,11 +16,20 @@ class BaseRepository(Generic[ModelType]):
     Base repository with common CRUD operations.
 
     This implements the Repository pattern to abstract database operations.
+
+    When a UnitOfWork is given, create() and create_many() buffer new objects
+    in it instead of flushing them immediately.
     """
 
-    def __init__(self, model: Type[ModelType], session: AsyncSession):
+    def __init__(
+        self,
+        model: Type[ModelType],
+        session: AsyncSession,
+        uow: Optional[UnitOfWork] = None,
+    ):
         self.model = model
         self.session = session
+        self.uow = uow
 
     async def get_by_id(self, id: UUID) -> Optional[ModelType]:
         """Get a single record by ID."""
@@ -35,12 +46,75 @@ class BaseRepository(Generic[ModelType]):
         return list(result.scalars().all())
 
     async def create(self, obj: ModelType) -> ModelType:
-        """Create a new record."""
+        """Create a new record (buffered if a unit of work is active)."""
+        if self.uow is not None:
+            return self.uow.add(obj)
         self.session.add(obj)
         await self.session.flush()
         await self.session.refresh(obj)
         return obj
 
+    async def create_many(self, objs: List[ModelType]) -> List[ModelType]:
+        """
+        Create several records in one batched INSERT, without refresh.
+
+        Objects get their primary key assigned before the insert. Database
+        defaults (e.g. created_at) are not loaded back onto them.
+        """
+        if self.uow is not None:
+            return self.uow.add_all(objs)
+        for obj in objs:
+            if obj.id is None:
+                obj.id = uuid4()
+        await self._insert_rows([column_values(obj) for obj in objs])
+        return objs
+
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert several records from column values in one batched statement.
+
+        Rows are sent as a single executemany/multi-row INSERT. No ORM
+        objects are tracked and nothing is refreshed afterwards.
+
+        Args:
+            rows: Column values for each record
+
+        Returns:
+            Number of rows inserted
+        """
+        return await self._insert_rows(rows)
+
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Execute a batched INSERT of column values for this model."""
+        if not rows:
+            return 0
+        await self.session.execute(insert(self.model), rows)
+        return len(rows)
+
+    def _upsert(self):
+        """
+        Build a dialect-specific INSERT that supports ON CONFLICT clauses.
+
+        PostgreSQL in production, SQLite in the test suite.
+        """
+        if self.session.bind.dialect.name == "sqlite":
+            return sqlite.insert(self.model)
+        return postgresql.insert(self.model)
+
+    def _in_values(self, column, values: List[str]):
+        """
+        Build a dialect-specific `column IN values` filter for string values.
+
+        PostgreSQL gets `column = ANY(:values)` with a single array
+        parameter, whatever the number of values (no bind parameter limit,
+        one cached statement); SQLite gets a plain IN list.
+        """
+        if self.session.bind.dialect.name == "sqlite":
+            return column.in_(values)
+        return column == any_(
+            bindparam(None, value=values, type_=postgresql.ARRAY(String))
+        )
+
     async def delete(self, id: UUID) -> bool:
         """Delete a record by ID."""
         obj = await self.get_by_id(id)
@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.ledger_entry import LedgerEntry
+from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+# Arbitrary key for the advisory lock that serializes compaction runs
+COMPACTION_LOCK_KEY = 247_001
+
+
+class BalanceCheckpointRepository(BaseRepository[BalanceCheckpoint]):
+    """Repository for balance checkpoints (compacted ledger totals)."""
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(BalanceCheckpoint, session, uow)
+
+    async def get_for_restaurant(
+        self, restaurant_id: str, currency: str
+    ) -> Optional[BalanceCheckpoint]:
+        """
+        Get the checkpoint for a restaurant.
+
+        Args:
+            restaurant_id: Restaurant identifier
+            currency: Currency code
+
+        Returns:
+            BalanceCheckpoint if one exists, None otherwise
+        """
+        result = await self.session.execute(
+            select(BalanceCheckpoint)
+            .where(
+                and_(
+                    BalanceCheckpoint.restaurant_id == restaurant_id,
+                    BalanceCheckpoint.currency == currency,
+                )
+            )
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def compact(self, cutoff: datetime) -> int:
+        """
+        Fold ledger entries created before `cutoff` into the checkpoints.
+
+        Per restaurant, the checkpoint advances to the newest position of an
+        entry created before `cutoff` and folds every entry up to that
+        position. Positions follow commit order, so no entry at or below it
+        can still be uncommitted; entries of long-running transactions are
+        never skipped, only folded by a later run. Only entries after each
+        restaurant's current checkpoint are read, in one grouped aggregate.
+        Runs are serialized with an advisory lock on PostgreSQL; a run that
+        cannot take the lock does nothing.
+
+        Args:
+            cutoff: Entries newer than this stay in the active tail
+
+        Returns:
+            Number of checkpoints created or advanced
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            locked = await self.session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"),
+                {"key": COMPACTION_LOCK_KEY},
+            )
+            if not locked.scalar_one():
+                return 0
+
+        existing = await self.session.execute(select(BalanceCheckpoint))
+        checkpoints = {(c.restaurant_id, c.currency): c for c in existing.scalars()}
+
+        checkpoint_join = and_(
+            LedgerEntry.restaurant_id == BalanceCheckpoint.restaurant_id,
+            LedgerEntry.currency == BalanceCheckpoint.currency,
+        )
+        not_checkpointed = or_(
+            BalanceCheckpoint.id.is_(None),
+            LedgerEntry.position > BalanceCheckpoint.covered_position,
+        )
+        bound = (
+            select(
+                LedgerEntry.restaurant_id,
+                LedgerEntry.currency,
+                func.max(LedgerEntry.position).label("covered_position"),
+            )
+            .outerjoin(BalanceCheckpoint, checkpoint_join)
+            .where(and_(LedgerEntry.created_at < cutoff, not_checkpointed))
+            .group_by(LedgerEntry.restaurant_id, LedgerEntry.currency)
+            .subquery()
+        )
+
+        result = await self.session.execute(
+            select(
+                LedgerEntry.restaurant_id,
+                LedgerEntry.currency,
+                LedgerEntry.entry_type,
+                bound.c.covered_position,
+                func.sum(LedgerEntry.amount).label("total"),
+                func.count(LedgerEntry.id).label("entries"),
+                func.max(LedgerEntry.created_at).label("last_entry_at"),
+            )
+            .join(
+                bound,
+                and_(
+                    bound.c.restaurant_id == LedgerEntry.restaurant_id,
+                    bound.c.currency == LedgerEntry.currency,
+                    LedgerEntry.position <= bound.c.covered_position,
+                ),
+            )
+            .outerjoin(BalanceCheckpoint, checkpoint_join)
+            .where(not_checkpointed)
+            .group_by(
+                LedgerEntry.restaurant_id,
+                LedgerEntry.currency,
+                LedgerEntry.entry_type,
+                bound.c.covered_position,
+            )
+        )
+
+        updated: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in result:
+            key = (row.restaurant_id, row.currency)
+            if key not in updated:
+                current = checkpoints.get(key)
+                updated[key] = {
+                    "restaurant_id": row.restaurant_id,
+                    "currency": row.currency,
+                    "covered_until": cutoff,
+                    "covered_position": int(row.covered_position),
+                    "balance": current.balance if current else 0,
+                    "totals": dict(current.totals) if current else {},
+                    "last_entry_at": current.last_entry_at if current else None,
+                    "entry_count": current.entry_count if current else 0,
+                }
+            values = updated[key]
+            entry_type = row.entry_type.value
+            values["totals"][entry_type] = values["totals"].get(entry_type, 0) + int(row.total)
+            values["balance"] += int(row.total)
+            values["entry_count"] += int(row.entries)
+            if values["last_entry_at"] is None or row.last_entry_at > values["last_entry_at"]:
+                values["last_entry_at"] = row.last_entry_at
+
+        if not updated:
+            return 0
+
+        stmt = self._upsert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["restaurant_id", "currency"],
+            set_={
+                "covered_until": stmt.excluded.covered_until,
+                "covered_position": stmt.excluded.covered_position,
+                "balance": stmt.excluded.balance,
+                "totals": stmt.excluded.totals,
+                "last_entry_at": stmt.excluded.last_entry_at,
+                "entry_count": stmt.excluded.entry_count,
+            },
+        )
+        await self.session.execute(stmt, [updated[key] for key in sorted(updated)])
+        return len(updated)
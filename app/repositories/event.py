@@ -1,17 +1,18 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.processor_event import ProcessorEvent
 from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
 
 
 class ProcessorEventRepository(BaseRepository[ProcessorEvent]):
     """Repository for processor event operations."""
 
-    def __init__(self, session: AsyncSession):
-        super().__init__(ProcessorEvent, session)
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(ProcessorEvent, session, uow)
 
     async def get_by_event_id(self, event_id: str) -> Optional[ProcessorEvent]:
         """
@@ -40,3 +41,77 @@ class ProcessorEventRepository(BaseRepository[ProcessorEvent]):
         """
         event = await self.get_by_event_id(event_id)
         return event is not None
+
+    async def insert_if_absent(self, row: Dict[str, Any]) -> bool:
+        """
+        Insert an event unless its event_id already exists.
+
+        Single round trip: INSERT ... ON CONFLICT (event_id) DO NOTHING
+        RETURNING id. Concurrent deliveries of the same event_id are resolved
+        by the unique constraint instead of raising an integrity error.
+
+        Args:
+            row: Column values for the event
+
+        Returns:
+            True if the event was inserted, False if it already existed
+        """
+        stmt = (
+            self._upsert()
+            .values(**row)
+            .on_conflict_do_nothing(index_elements=["event_id"])
+            .returning(ProcessorEvent.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def insert_many_ignore_duplicates(
+        self, rows: List[Dict[str, Any]]
+    ) -> Set[str]:
+        """
+        Insert several events in one statement, skipping known event_ids.
+
+        Uses INSERT ... ON CONFLICT (event_id) DO NOTHING RETURNING event_id,
+        so the unique constraint decides idempotency without a prior SELECT.
+
+        Args:
+            rows: Column values for each event
+
+        Returns:
+            Set of event_ids that were actually inserted
+        """
+        if not rows:
+            return set()
+
+        stmt = (
+            self._upsert()
+            .on_conflict_do_nothing(index_elements=["event_id"])
+            .returning(ProcessorEvent.event_id)
+        )
+        result = await self.session.scalars(stmt, rows)
+        return set(result.all())
+
+    async def stream_recent_event_ids(
+        self, limit: int, fetch_size: int = 10000
+    ) -> AsyncIterator[str]:
+        """
+        Stream the most recently stored event_ids.
+
+        Rows are read through a server-side cursor, `fetch_size` at a time,
+        walking the created_at index backwards (no sort).
+
+        Args:
+            limit: Maximum number of event_ids
+            fetch_size: Rows fetched per round trip
+
+        Yields:
+            event_ids, most recently stored first
+        """
+        result = await self.session.stream_scalars(
+            select(ProcessorEvent.event_id)
+            .order_by(ProcessorEvent.created_at.desc())
+            .limit(limit)
+            .execution_options(yield_per=fetch_size)
+        )
+        async for event_id in result:
+            yield event_id
@@ -1,23 +1,72 @@
-from typing import Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import BigInteger, select, func, and_, case, exists, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.balance_checkpoint import BalanceCheckpoint
 from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.payout import Payout
+from app.models.payout_watermark import PayoutWatermark
+from app.models.restaurant_balance import RestaurantBalance
+from app.repositories.balance import RestaurantBalanceRepository
 from app.repositories.base import BaseRepository
+from app.repositories.checkpoint import BalanceCheckpointRepository
+from app.repositories.unit_of_work import UnitOfWork, column_values
+
+
+def restaurant_partition(restaurant_id, partitions: int):
+    """
+    SQL expression for the hash partition (0..partitions-1) of a restaurant.
+
+    Uses PostgreSQL's hashtext(), so every worker and retry maps a
+    restaurant to the same partition.
+    """
+    return func.abs(func.hashtext(restaurant_id).cast(BigInteger)) % partitions
 
 
 class LedgerRepository(BaseRepository[LedgerEntry]):
-    """Repository for ledger entry operations."""
+    """
+    Repository for ledger entry operations.
+
+    Every insert also updates the restaurant_balances projection in the
+    same transaction.
+    """
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(LedgerEntry, session, uow)
+        self.balance_repo = RestaurantBalanceRepository(session)
+        self.checkpoint_repo = BalanceCheckpointRepository(session)
+
+    async def create(self, obj: LedgerEntry) -> LedgerEntry:
+        """Create a ledger entry and update the balance projection."""
+        await self._apply([obj])
+        return await super().create(obj)
 
-    def __init__(self, session: AsyncSession):
-        super().__init__(LedgerEntry, session)
+    async def create_many(self, objs: List[LedgerEntry]) -> List[LedgerEntry]:
+        """Create several ledger entries and update the balance projection."""
+        await self._apply(objs)
+        return await super().create_many(objs)
+
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert ledger entry values and update the balance projection."""
+        await self.balance_repo.apply_entries(rows)
+        return await super().bulk_create(rows)
+
+    async def _apply(self, objs: List[LedgerEntry]) -> None:
+        """Update the balance projection and set each entry's position."""
+        values = [column_values(obj) for obj in objs]
+        await self.balance_repo.apply_entries(values)
+        for obj, entry in zip(objs, values):
+            obj.position = entry["position"]
 
     async def get_balance(self, restaurant_id: str, currency: str) -> int:
         """
         Calculate available balance for a restaurant in a specific currency.
 
+        Adds the entries after the restaurant's checkpoint (if any) to the
+        checkpointed balance.
+
         Args:
             restaurant_id: Restaurant identifier
             currency: Currency code
@@ -25,16 +74,14 @@ class LedgerRepository(BaseRepository[LedgerEntry]):
         Returns:
             Available balance in cents
         """
+        checkpoint = await self.checkpoint_repo.get_for_restaurant(restaurant_id, currency)
         result = await self.session.execute(
             select(func.coalesce(func.sum(LedgerEntry.amount), 0)).where(
-                and_(
-                    LedgerEntry.restaurant_id == restaurant_id,
-                    LedgerEntry.currency == currency,
-                )
+                self._tail_filter(restaurant_id, currency, checkpoint)
             )
         )
         balance = result.scalar_one()
-        return int(balance)
+        return int(balance) + (checkpoint.balance if checkpoint else 0)
 
     async def get_last_event_time(
         self, restaurant_id: str, currency: str
@@ -49,15 +96,16 @@ class LedgerRepository(BaseRepository[LedgerEntry]):
         Returns:
             Timestamp of last entry, or None if no entries exist
         """
+        checkpoint = await self.checkpoint_repo.get_for_restaurant(restaurant_id, currency)
         result = await self.session.execute(
             select(func.max(LedgerEntry.created_at)).where(
-                and_(
-                    LedgerEntry.restaurant_id == restaurant_id,
-                    LedgerEntry.currency == currency,
-                )
+                self._tail_filter(restaurant_id, currency, checkpoint)
             )
         )
-        return result.scalar_one_or_none()
+        last_event_at = result.scalar_one_or_none()
+        if last_event_at is None and checkpoint is not None:
+            return checkpoint.last_entry_at
+        return last_event_at
 
     async def get_breakdown(
         self, restaurant_id: str, currency: str
@@ -72,23 +120,282 @@ class LedgerRepository(BaseRepository[LedgerEntry]):
         Returns:
             Dictionary with breakdown by entry type
         """
+        checkpoint = await self.checkpoint_repo.get_for_restaurant(restaurant_id, currency)
+
         # Get sum grouped by entry type
         result = await self.session.execute(
             select(
                 LedgerEntry.entry_type,
                 func.sum(LedgerEntry.amount).label("total"),
             )
+            .where(self._tail_filter(restaurant_id, currency, checkpoint))
+            .group_by(LedgerEntry.entry_type)
+        )
+
+        breakdown = dict(checkpoint.totals) if checkpoint else {}
+        for row in result:
+            entry_type = row.entry_type.value
+            breakdown[entry_type] = breakdown.get(entry_type, 0) + int(row.total)
+
+        return breakdown
+
+    async def get_balance_summary(
+        self, restaurant_id: str, currency: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get available, pending, last entry time and breakdown in one query.
+
+        A single pass over the entries after the restaurant's checkpoint
+        computes per-type totals with conditional aggregation. Checkpoint
+        values and the pending amount (funds reserved for payouts, from the
+        restaurant_balances projection) are folded in as scalar subqueries
+        of the same statement.
+
+        Args:
+            restaurant_id: Restaurant identifier
+            currency: Currency code
+
+        Returns:
+            Dict with available, pending, last_event_at and breakdown, or None
+            if the restaurant has no ledger entries
+        """
+        checkpoint_filter = and_(
+            BalanceCheckpoint.restaurant_id == restaurant_id,
+            BalanceCheckpoint.currency == currency,
+        )
+        covered_position = (
+            select(BalanceCheckpoint.covered_position)
+            .where(checkpoint_filter)
+            .scalar_subquery()
+        )
+        # Same source as the balance endpoint without breakdown
+        pending = func.coalesce(
+            select(RestaurantBalance.reserved)
             .where(
+                and_(
+                    RestaurantBalance.restaurant_id == restaurant_id,
+                    RestaurantBalance.currency == currency,
+                )
+            )
+            .scalar_subquery(),
+            0,
+        )
+        type_totals = [
+            func.coalesce(
+                func.sum(case((LedgerEntry.entry_type == entry_type, LedgerEntry.amount))),
+                0,
+            ).label(entry_type.value)
+            for entry_type in LedgerEntryType
+        ]
+
+        result = await self.session.execute(
+            select(
+                func.count(LedgerEntry.id).label("entry_count"),
+                func.max(LedgerEntry.created_at).label("last_entry_at"),
+                pending.label("pending"),
+                select(BalanceCheckpoint.balance)
+                .where(checkpoint_filter)
+                .scalar_subquery()
+                .label("checkpoint_balance"),
+                select(BalanceCheckpoint.totals)
+                .where(checkpoint_filter)
+                .scalar_subquery()
+                .label("checkpoint_totals"),
+                select(BalanceCheckpoint.last_entry_at)
+                .where(checkpoint_filter)
+                .scalar_subquery()
+                .label("checkpoint_last_entry_at"),
+                *type_totals,
+            ).where(
                 and_(
                     LedgerEntry.restaurant_id == restaurant_id,
                     LedgerEntry.currency == currency,
+                    or_(
+                        covered_position.is_(None),
+                        LedgerEntry.position > covered_position,
+                    ),
                 )
             )
-            .group_by(LedgerEntry.entry_type)
         )
+        row = result.one()
+
+        if row.entry_count == 0 and row.checkpoint_balance is None:
+            return None
+
+        breakdown = dict(row.checkpoint_totals or {})
+        for entry_type in LedgerEntryType:
+            total = int(getattr(row, entry_type.value))
+            if total or entry_type.value in breakdown:
+                breakdown[entry_type.value] = breakdown.get(entry_type.value, 0) + total
+
+        return {
+            "available": sum(breakdown.values()),
+            "pending": int(row.pending),
+            "last_event_at": row.last_entry_at or row.checkpoint_last_entry_at,
+            "breakdown": breakdown,
+        }
+
+    async def get_payout_candidates(
+        self,
+        currency: str,
+        as_of_date: date,
+        min_amount: int,
+        partition: Optional[Tuple[int, int]] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find every restaurant eligible for a payout, with its breakdown.
+
+        The payout amount is the available balance from the
+        restaurant_balances projection. The breakdown only sums the entries
+        after the restaurant's payout watermark position (the period since
+        its previous payout), using the (restaurant_id, currency, position)
+        index. Positions follow commit order, so an entry committed after
+        the previous payout is always in the next period. One grouped
+        statement covers every restaurant and is anti-joined against payouts
+        already created for the date.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            min_amount: Minimum balance required (in cents)
+            partition: Optional (index, count) to only consider restaurants
+                in one hash partition of restaurant_id
+            after: Only restaurants after this restaurant_id (keyset page)
+            limit: Maximum number of restaurants to return
 
-        breakdown = {}
+        Returns:
+            One dict per eligible restaurant with restaurant_id, balance,
+            breakdown (period totals per entry type), covered_position and
+            covered_until (position and creation time of the newest entry in
+            the period, None if there is none), ordered by restaurant_id
+        """
+        conditions = self._candidate_filter(currency, as_of_date, min_amount, partition)
+        if after is not None:
+            conditions.append(RestaurantBalance.restaurant_id > after)
+
+        type_totals = [
+            func.sum(case((LedgerEntry.entry_type == entry_type, LedgerEntry.amount))).label(
+                entry_type.value
+            )
+            for entry_type in LedgerEntryType
+        ]
+
+        result = await self.session.execute(
+            select(
+                RestaurantBalance.restaurant_id,
+                RestaurantBalance.available.label("balance"),
+                func.max(LedgerEntry.position).label("covered_position"),
+                func.max(LedgerEntry.created_at).label("covered_until"),
+                *type_totals,
+            )
+            .select_from(RestaurantBalance)
+            .outerjoin(
+                PayoutWatermark,
+                and_(
+                    PayoutWatermark.restaurant_id == RestaurantBalance.restaurant_id,
+                    PayoutWatermark.currency == RestaurantBalance.currency,
+                ),
+            )
+            .outerjoin(
+                LedgerEntry,
+                and_(
+                    LedgerEntry.restaurant_id == RestaurantBalance.restaurant_id,
+                    LedgerEntry.currency == RestaurantBalance.currency,
+                    or_(
+                        PayoutWatermark.id.is_(None),
+                        LedgerEntry.position > PayoutWatermark.covered_position,
+                    ),
+                ),
+            )
+            .where(and_(*conditions))
+            # Balance columns are functionally dependent on the primary key
+            .group_by(RestaurantBalance.id, RestaurantBalance.restaurant_id)
+            .order_by(RestaurantBalance.restaurant_id)
+            .limit(limit)
+        )
+
+        candidates = []
         for row in result:
-            breakdown[row.entry_type.value] = int(row.total)
+            breakdown = {}
+            for entry_type in LedgerEntryType:
+                total = getattr(row, entry_type.value)
+                if total is not None:
+                    breakdown[entry_type.value] = int(total)
+            candidates.append(
+                {
+                    "restaurant_id": row.restaurant_id,
+                    "balance": int(row.balance),
+                    "breakdown": breakdown,
+                    "covered_position": row.covered_position,
+                    "covered_until": row.covered_until,
+                }
+            )
+        return candidates
 
-        return breakdown
+    async def get_payout_candidate_totals(
+        self, currency: str, as_of_date: date, min_amount: int
+    ) -> Tuple[int, int]:
+        """
+        Count the restaurants eligible for a payout and sum their amounts.
+
+        Only reads the restaurant_balances projection (no ledger entries),
+        with the same eligibility rules as get_payout_candidates.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            min_amount: Minimum balance required (in cents)
+
+        Returns:
+            (eligible restaurants, total amount in cents)
+        """
+        result = await self.session.execute(
+            select(
+                func.count(RestaurantBalance.id),
+                func.coalesce(func.sum(RestaurantBalance.available), 0),
+            ).where(and_(*self._candidate_filter(currency, as_of_date, min_amount)))
+        )
+        count, total = result.one()
+        return int(count), int(total)
+
+    @staticmethod
+    def _candidate_filter(
+        currency: str,
+        as_of_date: date,
+        min_amount: int,
+        partition: Optional[Tuple[int, int]] = None,
+    ) -> List[Any]:
+        """Conditions on restaurant_balances for payout eligibility."""
+        conditions = [
+            RestaurantBalance.currency == currency,
+            RestaurantBalance.available >= min_amount,
+            # No payout yet for the date
+            ~exists().where(
+                and_(
+                    Payout.restaurant_id == RestaurantBalance.restaurant_id,
+                    Payout.currency == currency,
+                    Payout.as_of_date == as_of_date,
+                )
+            ),
+        ]
+        if partition is not None:
+            index, count = partition
+            conditions.append(
+                restaurant_partition(RestaurantBalance.restaurant_id, count) == index
+            )
+        return conditions
+
+    @staticmethod
+    def _tail_filter(
+        restaurant_id: str, currency: str, checkpoint: Optional[BalanceCheckpoint]
+    ):
+        """Filter for a restaurant's entries not covered by its checkpoint."""
+        conditions = [
+            LedgerEntry.restaurant_id == restaurant_id,
+            LedgerEntry.currency == currency,
+        ]
+        if checkpoint is not None:
+            conditions.append(LedgerEntry.position > checkpoint.covered_position)
+        return and_(*conditions)
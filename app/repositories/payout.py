@@ -1,19 +1,22 @@
-from typing import Optional, List
-from datetime import date
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, List, Set, Tuple
+from datetime import date, datetime
 
-from sqlalchemy import select, and_
+from sqlalchemy import Row, insert, literal, select, update, and_, true, tuple_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.payout import Payout, PayoutStatus
+from app.models.payout_item import PayoutItem
 from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
 
 
 class PayoutRepository(BaseRepository[Payout]):
     """Repository for payout operations."""
 
-    def __init__(self, session: AsyncSession):
-        super().__init__(Payout, session)
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(Payout, session, uow)
 
     async def get_by_payout_id(self, payout_id: str) -> Optional[Payout]:
         """
@@ -32,6 +35,119 @@ class PayoutRepository(BaseRepository[Payout]):
         )
         return result.scalar_one_or_none()
 
+    async def get_status(
+        self, payout_id: str
+    ) -> Optional[Tuple[PayoutStatus, Optional[datetime]]]:
+        """
+        Get only the status and paid_at of a payout (no items loaded).
+
+        Args:
+            payout_id: Unique payout identifier
+
+        Returns:
+            (status, paid_at) if found, None otherwise
+        """
+        result = await self.session.execute(
+            select(Payout.status, Payout.paid_at).where(Payout.payout_id == payout_id)
+        )
+        row = result.one_or_none()
+        return (row.status, row.paid_at) if row is not None else None
+
+    async def insert_many_ignore_existing(self, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Insert several payouts in one statement, skipping existing ones.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING on
+        (restaurant_id, currency, as_of_date), so a concurrent run for the
+        same date cannot create a second payout.
+
+        Args:
+            rows: Column values for each payout (including id)
+
+        Returns:
+            Set of payout_ids that were actually inserted
+        """
+        if not rows:
+            return set()
+
+        stmt = (
+            self._upsert()
+            .on_conflict_do_nothing(index_elements=["restaurant_id", "currency", "as_of_date"])
+            .returning(Payout.payout_id)
+        )
+        result = await self.session.scalars(stmt, rows)
+        return set(result.all())
+
+    async def create_items(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert payout items for many payouts in one batched statement.
+
+        Args:
+            rows: Column values for each item
+
+        Returns:
+            Number of items inserted
+        """
+        if not rows:
+            return 0
+        await self.session.execute(insert(PayoutItem), rows)
+        return len(rows)
+
+    async def mark_paid_many(
+        self, payout_ids: List[str], paid_at: datetime
+    ) -> List[Row]:
+        """
+        Mark CREATED payouts as PAID in one statement.
+
+        UPDATE ... WHERE payout_id = ANY(...) AND status = 'created'
+        RETURNING: payouts that are unknown or not CREATED are left alone
+        and simply not returned.
+
+        Args:
+            payout_ids: Unique payout identifiers
+            paid_at: Payment time to record
+
+        Returns:
+            payout_id, restaurant_id, currency and amount of each payout
+            that was marked paid
+        """
+        if not payout_ids:
+            return []
+
+        result = await self.session.execute(
+            update(Payout)
+            .where(
+                and_(
+                    self._in_values(Payout.payout_id, payout_ids),
+                    Payout.status == PayoutStatus.CREATED,
+                )
+            )
+            .values(status=PayoutStatus.PAID, paid_at=paid_at)
+            .returning(Payout.payout_id, Payout.restaurant_id, Payout.currency, Payout.amount)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.all())
+
+    async def get_statuses(self, payout_ids: List[str]) -> Dict[str, PayoutStatus]:
+        """
+        Get the status of several payouts in one query.
+
+        Args:
+            payout_ids: Unique payout identifiers
+
+        Returns:
+            Status per payout_id (unknown ids are simply absent)
+        """
+        if not payout_ids:
+            return {}
+
+        result = await self.session.execute(
+            select(Payout.payout_id, Payout.status).where(
+                self._in_values(Payout.payout_id, payout_ids)
+            )
+        )
+        return {payout_id: status for payout_id, status in result.all()}
+
     async def payout_exists_for_date(
         self, restaurant_id: str, currency: str, as_of_date: date
     ) -> bool:
@@ -84,6 +200,110 @@ class PayoutRepository(BaseRepository[Payout]):
         )
         return result.scalar_one_or_none()
 
+    async def list_page(
+        self,
+        limit: int,
+        restaurant_id: Optional[str] = None,
+        currency: Optional[str] = None,
+        status: Optional[PayoutStatus] = None,
+        as_of_from: Optional[date] = None,
+        as_of_to: Optional[date] = None,
+        after: Optional[Tuple[date, uuid.UUID]] = None,
+    ) -> List[Payout]:
+        """
+        Get one page of payouts, newest as_of_date first, with their items.
+
+        Uses keyset pagination on (as_of_date, id): the page starts right
+        after the `after` key instead of skipping rows with OFFSET, so deep
+        pages cost the same as the first. Items of the whole page are loaded
+        with one extra SELECT ... IN query.
+
+        Args:
+            limit: Maximum number of payouts to return
+            restaurant_id: Only payouts of this restaurant
+            currency: Only payouts in this currency
+            status: Only payouts with this status
+            as_of_from: Only payouts on or after this date
+            as_of_to: Only payouts on or before this date
+            after: (as_of_date, id) of the last payout of the previous page
+
+        Returns:
+            Payouts ordered by (as_of_date, id) descending
+        """
+        conditions = []
+        if restaurant_id is not None:
+            conditions.append(Payout.restaurant_id == restaurant_id)
+        if currency is not None:
+            conditions.append(Payout.currency == currency)
+        if status is not None:
+            conditions.append(Payout.status == status)
+        if as_of_from is not None:
+            conditions.append(Payout.as_of_date >= as_of_from)
+        if as_of_to is not None:
+            conditions.append(Payout.as_of_date <= as_of_to)
+        if after is not None:
+            as_of_date, payout_pk = after
+            conditions.append(
+                tuple_(Payout.as_of_date, Payout.id)
+                < tuple_(
+                    literal(as_of_date, Payout.as_of_date.type),
+                    literal(payout_pk, Payout.id.type),
+                )
+            )
+
+        result = await self.session.execute(
+            select(Payout)
+            .where(and_(true(), *conditions))
+            .order_by(Payout.as_of_date.desc(), Payout.id.desc())
+            .limit(limit)
+            .options(selectinload(Payout.items))
+        )
+        return list(result.scalars().all())
+
+    async def stream_settlement_rows(
+        self, currency: str, as_of_date: date, fetch_size: int
+    ) -> AsyncIterator[Row]:
+        """
+        Stream the payouts of a date joined with their items.
+
+        Rows are read through a server-side cursor, `fetch_size` at a time,
+        so memory does not grow with the number of payouts.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            fetch_size: Rows fetched per round trip
+
+        Yields:
+            One row per payout item (one row with NULL item columns for a
+            payout without items), grouped by payout_id
+        """
+        result = await self.session.stream(
+            select(
+                Payout.payout_id,
+                Payout.restaurant_id,
+                Payout.currency,
+                Payout.as_of_date,
+                Payout.amount,
+                Payout.status,
+                Payout.created_at,
+                Payout.paid_at,
+                PayoutItem.item_type,
+                PayoutItem.amount.label("item_amount"),
+            )
+            .outerjoin(PayoutItem, PayoutItem.payout_id == Payout.id)
+            .where(
+                and_(
+                    Payout.currency == currency,
+                    Payout.as_of_date == as_of_date,
+                )
+            )
+            .order_by(Payout.payout_id)
+            .execution_options(yield_per=fetch_size)
+        )
+        async for row in result:
+            yield row
+
     async def get_restaurants_with_balance(
         self, currency: str, min_amount: int
     ) -> List[str]:
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payout_run import PayoutRun, PayoutRunStatus
+from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+
+class PayoutRunRepository(BaseRepository[PayoutRun]):
+    """Repository for payout generation runs."""
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(PayoutRun, session, uow)
+
+    async def get_by_run_id(self, run_id: str) -> Optional[PayoutRun]:
+        """
+        Get a payout run by its run_id.
+
+        Args:
+            run_id: Unique run identifier
+
+        Returns:
+            PayoutRun if found, None otherwise
+        """
+        result = await self.session.execute(
+            select(PayoutRun)
+            .where(PayoutRun.run_id == run_id)
+            # Runs are updated by workers in other sessions
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_many_by_run_ids(self, run_ids: List[str]) -> Dict[str, PayoutRun]:
+        """
+        Get several runs by run_id in one query.
+
+        Args:
+            run_ids: Unique run identifiers
+
+        Returns:
+            PayoutRun per run_id (unknown ids are simply absent)
+        """
+        if not run_ids:
+            return {}
+
+        result = await self.session.execute(
+            select(PayoutRun).where(PayoutRun.run_id.in_(run_ids))
+        )
+        return {run.run_id: run for run in result.scalars()}
+
+    async def mark_started(self, run_ids: List[str], now: datetime) -> None:
+        """
+        Move pending runs to RUNNING once a worker picks up their first chunk.
+
+        Args:
+            run_ids: Unique run identifiers
+            now: Start time to record
+        """
+        await self.session.execute(
+            update(PayoutRun)
+            .where(
+                and_(
+                    PayoutRun.run_id.in_(run_ids),
+                    PayoutRun.status == PayoutRunStatus.PENDING,
+                )
+            )
+            .values(status=PayoutRunStatus.RUNNING, started_at=now)
+        )
+
+    async def finish(self, run_id: str, status: PayoutRunStatus, now: datetime) -> None:
+        """
+        Record the final status of a running run.
+
+        Args:
+            run_id: Unique run identifier
+            status: COMPLETED or FAILED
+            now: Finish time to record
+        """
+        await self.session.execute(
+            update(PayoutRun)
+            .where(
+                and_(
+                    PayoutRun.run_id == run_id,
+                    PayoutRun.status == PayoutRunStatus.RUNNING,
+                )
+            )
+            .values(status=status, finished_at=now)
+        )
+
+    async def add_progress(
+        self,
+        run_id: str,
+        restaurants_scanned: int = 0,
+        payouts_created: int = 0,
+        partitions_completed: int = 0,
+        failures: int = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Atomically add to a run's progress counters.
+
+        Increments are applied in SQL, so concurrent partitions of the same
+        run can report progress without overwriting each other.
+
+        Args:
+            run_id: Unique run identifier
+            restaurants_scanned: Eligible restaurants found
+            payouts_created: Payouts created
+            partitions_completed: Partitions finished
+            failures: Failed partition attempts
+            error: Latest error message, if any
+        """
+        values = {
+            "restaurants_scanned": PayoutRun.restaurants_scanned + restaurants_scanned,
+            "payouts_created": PayoutRun.payouts_created + payouts_created,
+            "partitions_completed": PayoutRun.partitions_completed + partitions_completed,
+            "failures": PayoutRun.failures + failures,
+        }
+        if error is not None:
+            values["error"] = error
+
+        await self.session.execute(
+            update(PayoutRun).where(PayoutRun.run_id == run_id).values(**values)
+        )
@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payout_run import PayoutRunStatus
+from app.models.payout_run_chunk import PayoutRunChunk
+from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+
+class PayoutRunChunkRepository(BaseRepository[PayoutRunChunk]):
+    """Repository for the payout run work queue."""
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(PayoutRunChunk, session, uow)
+
+    async def create_for_run(self, run_id: str, partitions: int) -> int:
+        """
+        Enqueue one pending chunk per partition of a run.
+
+        Args:
+            run_id: Unique run identifier
+            partitions: Number of restaurant hash partitions
+
+        Returns:
+            Number of chunks created
+        """
+        return await self.bulk_create(
+            [
+                {
+                    "run_id": run_id,
+                    "partition": partition,
+                    "status": PayoutRunStatus.PENDING,
+                    "attempts": 0,
+                    "restaurants_scanned": 0,
+                    "payouts_created": 0,
+                }
+                for partition in range(partitions)
+            ]
+        )
+
+    async def claim(
+        self, worker_id: str, limit: int, lease_seconds: int, now: datetime
+    ) -> List[PayoutRunChunk]:
+        """
+        Claim pending chunks, and running chunks whose lease has expired.
+
+        Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent workers
+        never claim the same chunk and never wait on each other. The claim
+        is only durable once the caller commits.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            limit: Maximum number of chunks to claim
+            lease_seconds: How long the claim stays valid
+            now: Current time
+
+        Returns:
+            Claimed chunks, with attempts incremented
+        """
+        result = await self.session.execute(
+            select(PayoutRunChunk)
+            .where(
+                or_(
+                    PayoutRunChunk.status == PayoutRunStatus.PENDING,
+                    and_(
+                        PayoutRunChunk.status == PayoutRunStatus.RUNNING,
+                        PayoutRunChunk.lease_expires_at < now,
+                    ),
+                )
+            )
+            .order_by(PayoutRunChunk.created_at, PayoutRunChunk.partition)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .execution_options(populate_existing=True)
+        )
+        chunks = list(result.scalars().all())
+
+        for chunk in chunks:
+            chunk.status = PayoutRunStatus.RUNNING
+            chunk.attempts += 1
+            chunk.claimed_by = worker_id
+            chunk.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        await self.session.flush()
+        return chunks
+
+    async def renew(
+        self, chunk_id, worker_id: str, lease_seconds: int, now: datetime
+    ) -> bool:
+        """
+        Extend the lease of a chunk the worker is still processing.
+
+        Args:
+            chunk_id: Chunk primary key
+            worker_id: Worker that claimed the chunk
+            lease_seconds: How long the claim stays valid from now
+            now: Current time
+
+        Returns:
+            False if the worker no longer holds the chunk (lease lost)
+        """
+        result = await self.session.execute(
+            update(PayoutRunChunk)
+            .where(self._held_by(chunk_id, worker_id))
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        return result.rowcount == 1
+
+    async def complete(
+        self,
+        chunk_id,
+        worker_id: str,
+        restaurants_scanned: int,
+        payouts_created: int,
+        now: datetime,
+    ) -> bool:
+        """
+        Mark a claimed chunk as completed.
+
+        Args:
+            chunk_id: Chunk primary key
+            worker_id: Worker that claimed the chunk
+            restaurants_scanned: Eligible restaurants found
+            payouts_created: Payouts created
+            now: Current time
+
+        Returns:
+            False if the worker no longer holds the chunk (lease lost)
+        """
+        result = await self.session.execute(
+            update(PayoutRunChunk)
+            .where(self._held_by(chunk_id, worker_id))
+            .values(
+                status=PayoutRunStatus.COMPLETED,
+                restaurants_scanned=restaurants_scanned,
+                payouts_created=payouts_created,
+                lease_expires_at=None,
+                finished_at=now,
+            )
+        )
+        return result.rowcount == 1
+
+    async def release(
+        self, chunk_id, worker_id: str, error: str, final: bool, now: datetime
+    ) -> bool:
+        """
+        Give up a claimed chunk after a failed attempt.
+
+        Args:
+            chunk_id: Chunk primary key
+            worker_id: Worker that claimed the chunk
+            error: Error of the failed attempt
+            final: Mark the chunk FAILED instead of returning it to the queue
+            now: Current time
+
+        Returns:
+            False if the worker no longer holds the chunk (lease lost)
+        """
+        result = await self.session.execute(
+            update(PayoutRunChunk)
+            .where(self._held_by(chunk_id, worker_id))
+            .values(
+                status=PayoutRunStatus.FAILED if final else PayoutRunStatus.PENDING,
+                claimed_by=None,
+                lease_expires_at=None,
+                error=error,
+                finished_at=now if final else None,
+            )
+        )
+        return result.rowcount == 1
+
+    async def count_by_status(self, run_id: str) -> Dict[PayoutRunStatus, int]:
+        """
+        Count a run's chunks per status.
+
+        Args:
+            run_id: Unique run identifier
+
+        Returns:
+            Number of chunks per status (absent statuses are omitted)
+        """
+        result = await self.session.execute(
+            select(PayoutRunChunk.status, func.count(PayoutRunChunk.id))
+            .where(PayoutRunChunk.run_id == run_id)
+            .group_by(PayoutRunChunk.status)
+        )
+        return {status: count for status, count in result.all()}
+
+    @staticmethod
+    def _held_by(chunk_id, worker_id: str):
+        """Filter for a chunk still claimed by a worker."""
+        return and_(
+            PayoutRunChunk.id == chunk_id,
+            PayoutRunChunk.status == PayoutRunStatus.RUNNING,
+            PayoutRunChunk.claimed_by == worker_id,
+        )
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payout_watermark import PayoutWatermark
+from app.repositories.base import BaseRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+
+class PayoutWatermarkRepository(BaseRepository[PayoutWatermark]):
+    """Repository for per-restaurant payout watermarks."""
+
+    def __init__(self, session: AsyncSession, uow: Optional[UnitOfWork] = None):
+        super().__init__(PayoutWatermark, session, uow)
+
+    async def get_for_restaurant(
+        self, restaurant_id: str, currency: str
+    ) -> Optional[PayoutWatermark]:
+        """
+        Get the payout watermark of a restaurant.
+
+        Args:
+            restaurant_id: Restaurant identifier
+            currency: Currency code
+
+        Returns:
+            PayoutWatermark if the restaurant had a payout, None otherwise
+        """
+        result = await self.session.execute(
+            select(PayoutWatermark)
+            .where(
+                and_(
+                    PayoutWatermark.restaurant_id == restaurant_id,
+                    PayoutWatermark.currency == currency,
+                )
+            )
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def advance(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Move watermarks forward after payouts were created.
+
+        Uses one INSERT ... ON CONFLICT DO UPDATE; a watermark never moves
+        backwards.
+
+        Args:
+            rows: restaurant_id, currency, covered_until, covered_position
+                and last_payout_id for each payout
+        """
+        if not rows:
+            return
+
+        stmt = self._upsert()
+        moves_forward = stmt.excluded.covered_position > PayoutWatermark.covered_position
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["restaurant_id", "currency"],
+            set_={
+                "covered_until": case(
+                    (moves_forward, stmt.excluded.covered_until),
+                    else_=PayoutWatermark.covered_until,
+                ),
+                "covered_position": case(
+                    (moves_forward, stmt.excluded.covered_position),
+                    else_=PayoutWatermark.covered_position,
+                ),
+                "last_payout_id": case(
+                    (moves_forward, stmt.excluded.last_payout_id),
+                    else_=PayoutWatermark.last_payout_id,
+                ),
+            },
+        )
+        await self.session.execute(
+            stmt, sorted(rows, key=lambda r: (r["restaurant_id"], r["currency"]))
+        )
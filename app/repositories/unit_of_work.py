@@ -0,0 +1,79 @@
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Type
+
+from sqlalchemy import inspect, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import Base
+from app.models.base import BaseModel
+
+
+class UnitOfWork:
+    """
+    Deferred-flush unit of work for new records.
+
+    Objects registered here are buffered instead of being flushed one at a
+    time. On flush they are written as one batched INSERT per table, in
+    foreign-key dependency order. Buffered objects get their primary key up
+    front so related rows can reference them before anything is written.
+
+    Errors in buffered writes only surface at flush, so a caller that
+    isolates failures per item must flush inside that item's try block.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: Dict[Type[BaseModel], List[BaseModel]] = defaultdict(list)
+
+    def add(self, obj: BaseModel) -> BaseModel:
+        """Buffer a new object for the next flush."""
+        if obj.id is None:
+            obj.id = uuid.uuid4()
+        self._pending[type(obj)].append(obj)
+        return obj
+
+    def add_all(self, objs: List[BaseModel]) -> List[BaseModel]:
+        """Buffer several new objects for the next flush."""
+        for obj in objs:
+            self.add(obj)
+        return objs
+
+    @property
+    def pending_count(self) -> int:
+        """Number of buffered objects not yet written."""
+        return sum(len(objs) for objs in self._pending.values())
+
+    async def flush(self) -> int:
+        """
+        Write every buffered object with batched INSERTs.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        for table in Base.metadata.sorted_tables:
+            for model in [m for m in self._pending if m.__table__ is table]:
+                rows = [column_values(obj) for obj in self._pending.pop(model)]
+                await self.session.execute(insert(model), rows)
+                written += len(rows)
+        return written
+
+    async def commit(self) -> None:
+        """Flush buffered objects and commit the session."""
+        await self.flush()
+        await self.session.commit()
+
+
+def column_values(obj: BaseModel) -> Dict[str, Any]:
+    """
+    Get the column values explicitly set on an ORM object.
+
+    Unset columns are left out so database defaults still apply.
+    """
+    state = inspect(obj)
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
@@ -2,22 +2,54 @@ from app.schemas.processor import (
     EventType,
     ProcessorEventRequest,
     ProcessorEventResponse,
+    ProcessorEventStruct,
+    ProcessorEventBatchRequest,
+    ProcessorEventBatchStruct,
+    ProcessorEventBatchItem,
+    ProcessorEventBatchResponse,
+    ProcessorEventStreamItem,
+)
+from app.schemas.restaurant import (
+    RestaurantBalanceResponse,
+    RestaurantBalanceQueryRequest,
+    RestaurantBalanceQueryResponse,
 )
-from app.schemas.restaurant import RestaurantBalanceResponse
 from app.schemas.payout import (
     PayoutRunRequest,
     PayoutRunResponse,
+    PayoutRunStatusResponse,
     PayoutItemResponse,
     PayoutResponse,
+    PayoutListResponse,
+    SettlementFormat,
+    PayoutSettlementRequest,
+    PayoutSettlementResponse,
+    PayoutPreviewItem,
+    PayoutPreviewResponse,
 )
 
 __all__ = [
     "EventType",
     "ProcessorEventRequest",
     "ProcessorEventResponse",
+    "ProcessorEventStruct",
+    "ProcessorEventBatchRequest",
+    "ProcessorEventBatchStruct",
+    "ProcessorEventBatchItem",
+    "ProcessorEventBatchResponse",
+    "ProcessorEventStreamItem",
     "RestaurantBalanceResponse",
+    "RestaurantBalanceQueryRequest",
+    "RestaurantBalanceQueryResponse",
     "PayoutRunRequest",
     "PayoutRunResponse",
+    "PayoutRunStatusResponse",
     "PayoutItemResponse",
     "PayoutResponse",
+    "PayoutListResponse",
+    "SettlementFormat",
+    "PayoutSettlementRequest",
+    "PayoutSettlementResponse",
+    "PayoutPreviewItem",
+    "PayoutPreviewResponse",
 ]
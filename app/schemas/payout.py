@@ -1,9 +1,19 @@
+import enum
 from datetime import date, datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
 from app.models.payout import PayoutStatus
+from app.models.payout_run import PayoutRunStatus
+
+
+class SettlementFormat(str, enum.Enum):
+    """File format of a settlement export."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
 
 
 class PayoutRunRequest(BaseModel):
@@ -43,24 +53,124 @@ class PayoutRunRequest(BaseModel):
 class PayoutRunResponse(BaseModel):
     """Response schema for payout run."""
 
-    status: str = Field(
+    run_id: str = Field(
+        ...,
+        description="Run identifier, used to poll progress",
+    )
+
+    status: PayoutRunStatus = Field(
         ...,
         description="Job status",
     )
 
     message: str
 
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "run_id": "run_3f9c2a1b7d4e",
+                "status": "pending",
+                "message": "Payout generation started",
+            }
+        }
+
+
+class PayoutRunStatusResponse(BaseModel):
+    """Response schema for payout run progress."""
+
+    run_id: str = Field(
+        ...,
+        description="Run identifier",
+    )
+
+    currency: str = Field(
+        ...,
+        description="Currency code for payouts",
+    )
+
+    as_of: date = Field(
+        ...,
+        description="Payout date",
+    )
+
+    min_amount: int = Field(
+        ...,
+        description="Minimum amount in cents to generate payout",
+    )
+
+    status: PayoutRunStatus = Field(
+        ...,
+        description="Job status",
+    )
+
+    partitions: int = Field(
+        ...,
+        description="Number of restaurant partitions in the run",
+    )
+
+    partitions_completed: int = Field(
+        ...,
+        description="Partitions committed so far",
+    )
+
+    restaurants_scanned: int = Field(
+        ...,
+        description="Eligible restaurants found",
+    )
+
     payouts_created: int = Field(
         ...,
         description="Number of payouts created",
     )
 
+    failures: int = Field(
+        ...,
+        description="Number of failed partition attempts",
+    )
+
+    error: Optional[str] = Field(
+        default=None,
+        description="Last error, if any",
+    )
+
+    created_at: datetime = Field(
+        ...,
+        description="When the run was requested",
+    )
+
+    started_at: Optional[datetime] = Field(
+        default=None,
+        description="When a worker started the run",
+    )
+
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="When the run finished",
+    )
+
+    elapsed_seconds: Optional[float] = Field(
+        default=None,
+        description="Processing time so far (or in total, once finished)",
+    )
+
     class Config:
         json_schema_extra = {
             "example": {
-                "status": "accepted",
-                "message": "Payout generation started",
-                "payouts_created": 3,
+                "run_id": "run_3f9c2a1b7d4e",
+                "currency": "PEN",
+                "as_of": "2025-12-27",
+                "min_amount": 5000,
+                "status": "completed",
+                "partitions": 16,
+                "partitions_completed": 16,
+                "restaurants_scanned": 120,
+                "payouts_created": 118,
+                "failures": 0,
+                "error": None,
+                "created_at": "2025-12-27T18:00:00Z",
+                "started_at": "2025-12-27T18:00:00Z",
+                "finished_at": "2025-12-27T18:00:02Z",
+                "elapsed_seconds": 2.4,
             }
         }
 
@@ -110,6 +220,11 @@ class PayoutResponse(BaseModel):
         description="Payout status",
     )
 
+    as_of: date = Field(
+        ...,
+        description="Payout date",
+    )
+
     created_at: datetime = Field(
         ...,
         description="When payout was created",
@@ -134,6 +249,7 @@ class PayoutResponse(BaseModel):
                 "currency": "PEN",
                 "amount": 10800,
                 "status": "created",
+                "as_of": "2025-12-27",
                 "created_at": "2025-12-27T18:00:00Z",
                 "paid_at": None,
                 "items": [
@@ -143,3 +259,164 @@ class PayoutResponse(BaseModel):
                 ],
             }
         }
+
+
+class PayoutListResponse(BaseModel):
+    """Response schema for one page of payouts."""
+
+    payouts: List[PayoutResponse] = Field(
+        default_factory=list,
+        description="Payouts, newest as_of date first",
+    )
+
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page (None on the last page)",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "payouts": [
+                    {
+                        "payout_id": "po_0001",
+                        "restaurant_id": "res_001",
+                        "currency": "PEN",
+                        "amount": 10800,
+                        "status": "paid",
+                        "as_of": "2025-12-27",
+                        "created_at": "2025-12-27T18:00:00Z",
+                        "paid_at": "2025-12-28T10:00:00Z",
+                        "items": [{"type": "gross_sales", "amount": 10800}],
+                    }
+                ],
+                "next_cursor": "WyIyMDI1LTEyLTI3IiwiM2Y5YyJd",
+            }
+        }
+
+
+class PayoutSettlementRequest(BaseModel):
+    """Request schema for a bulk settlement import."""
+
+    payout_ids: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.PAYOUT_SETTLEMENT_MAX_IDS,
+        description="Payout identifiers confirmed as paid by the bank",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "payout_ids": ["po_0001", "po_0002", "po_9999"],
+            }
+        }
+
+
+class PayoutSettlementResponse(BaseModel):
+    """Response schema for a bulk settlement import."""
+
+    paid: int = Field(..., description="Payouts marked as paid")
+    already_paid: List[str] = Field(
+        default_factory=list,
+        description="Payouts that were already paid (left unchanged)",
+    )
+    not_payable: List[str] = Field(
+        default_factory=list,
+        description="Payouts in another status, e.g. failed (left unchanged)",
+    )
+    unknown: List[str] = Field(
+        default_factory=list,
+        description="Payout identifiers that do not exist",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "paid": 1,
+                "already_paid": ["po_0002"],
+                "not_payable": [],
+                "unknown": ["po_9999"],
+            }
+        }
+
+
+class PayoutPreviewItem(BaseModel):
+    """A payout that a run would create for one restaurant."""
+
+    restaurant_id: str = Field(
+        ...,
+        description="Restaurant identifier",
+    )
+
+    amount: int = Field(
+        ...,
+        description="Payout amount in cents",
+    )
+
+    items: List[PayoutItemResponse] = Field(
+        default_factory=list,
+        description="Breakdown since the restaurant's previous payout",
+    )
+
+
+class PayoutPreviewResponse(BaseModel):
+    """Response schema for a payout run preview."""
+
+    currency: str = Field(
+        ...,
+        description="Currency code for payouts",
+    )
+
+    as_of: date = Field(
+        ...,
+        description="Payout date",
+    )
+
+    min_amount: int = Field(
+        ...,
+        description="Minimum amount in cents to generate payout",
+    )
+
+    eligible_restaurants: int = Field(
+        ...,
+        description="Restaurants that would get a payout (all pages)",
+    )
+
+    total_amount: int = Field(
+        ...,
+        description="Total amount in cents that would be paid out (all pages)",
+    )
+
+    restaurants: List[PayoutPreviewItem] = Field(
+        default_factory=list,
+        description="Payouts of this page, ordered by restaurant_id",
+    )
+
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page (None on the last page)",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "currency": "PEN",
+                "as_of": "2025-12-27",
+                "min_amount": 5000,
+                "eligible_restaurants": 118,
+                "total_amount": 1274500,
+                "restaurants": [
+                    {
+                        "restaurant_id": "res_001",
+                        "amount": 10800,
+                        "items": [
+                            {"type": "gross_sales", "amount": 12000},
+                            {"type": "fees", "amount": -600},
+                            {"type": "refunds", "amount": -600},
+                        ],
+                    }
+                ],
+                "next_cursor": "WyJyZXNfMDAxIl0",
+            }
+        }
@@ -1,9 +1,12 @@
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Annotated, Dict, Any, List, Optional
 from enum import Enum
 
+import msgspec
 from pydantic import BaseModel, Field, field_validator
 
+from app.config import settings
+
 
 class EventType(str, Enum):
     """Valid event types from payment processor."""
@@ -93,13 +96,48 @@ class ProcessorEventRequest(BaseModel):
         }
 
 
+class ProcessorEventStruct(msgspec.Struct):
+    """
+    Lightweight ProcessorEventRequest for MessagePack request bodies.
+
+    msgspec decodes and validates MessagePack straight into this struct,
+    with the same constraints as ProcessorEventRequest, skipping the
+    generic JSON and Pydantic validation path.
+    """
+
+    event_id: Annotated[str, msgspec.Meta(min_length=1, max_length=255)]
+    event_type: EventType
+    occurred_at: datetime
+    restaurant_id: Annotated[str, msgspec.Meta(min_length=1, max_length=255)]
+    currency: Annotated[str, msgspec.Meta(min_length=3, max_length=3)]
+    amount: Annotated[int, msgspec.Meta(gt=0)]
+    fee: Annotated[int, msgspec.Meta(ge=0)]
+    metadata: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self) -> None:
+        self.currency = self.currency.upper()
+
+    def to_request(self) -> ProcessorEventRequest:
+        """Already validated: build the request model without validating again."""
+        return ProcessorEventRequest.model_construct(
+            event_id=self.event_id,
+            event_type=self.event_type,
+            occurred_at=self.occurred_at,
+            restaurant_id=self.restaurant_id,
+            currency=self.currency,
+            amount=self.amount,
+            fee=self.fee,
+            metadata=self.metadata,
+        )
+
+
 class ProcessorEventResponse(BaseModel):
     """Response schema for processor event ingestion."""
 
     event_id: str
     status: str = Field(
         ...,
-        description="Processing status: 'processed' or 'already_processed'",
+        description="Processing status: 'processed', 'already_processed' or 'accepted'",
     )
     message: str
 
@@ -111,3 +149,101 @@ class ProcessorEventResponse(BaseModel):
                 "message": "Event processed successfully",
             }
         }
+
+
+class ProcessorEventBatchRequest(BaseModel):
+    """Request schema for batch event ingestion."""
+
+    events: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.EVENT_BATCH_MAX_SIZE,
+        description=(
+            "Events in ProcessorEventRequest format. Each one is validated "
+            "individually so a malformed item does not reject the batch."
+        ),
+    )
+
+
+class ProcessorEventBatchStruct(msgspec.Struct):
+    """
+    MessagePack batch body: events are kept encoded, so each one is decoded
+    into a ProcessorEventStruct (and rejected) on its own.
+    """
+
+    events: Annotated[
+        List[msgspec.Raw],
+        msgspec.Meta(min_length=1, max_length=settings.EVENT_BATCH_MAX_SIZE),
+    ]
+
+
+class ProcessorEventBatchItem(BaseModel):
+    """Result for a single event inside a batch."""
+
+    event_id: Optional[str] = Field(
+        default=None,
+        description="Event identifier (None if it could not be read)",
+    )
+    status: str = Field(
+        ...,
+        description="Item status: 'created', 'duplicate' or 'rejected'",
+    )
+    message: str
+
+
+class ProcessorEventBatchResponse(BaseModel):
+    """Response schema for batch event ingestion."""
+
+    created: int = Field(..., description="Events processed for the first time")
+    duplicates: int = Field(..., description="Events already processed or repeated")
+    rejected: int = Field(..., description="Events that failed validation")
+    results: List[ProcessorEventBatchItem] = Field(
+        ...,
+        description="Per-event results, in request order",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "created": 1,
+                "duplicates": 1,
+                "rejected": 0,
+                "results": [
+                    {
+                        "event_id": "evt_000123",
+                        "status": "created",
+                        "message": "Event processed successfully",
+                    },
+                    {
+                        "event_id": "evt_000100",
+                        "status": "duplicate",
+                        "message": "Event already processed",
+                    },
+                ],
+            }
+        }
+
+
+class ProcessorEventStreamItem(BaseModel):
+    """Result for one line of a streamed NDJSON ingestion."""
+
+    line: int = Field(..., description="Line number in the request body (1-based)")
+    event_id: Optional[str] = Field(
+        default=None,
+        description="Event identifier (None if it could not be read)",
+    )
+    status: str = Field(
+        ...,
+        description="Item status: 'created', 'duplicate', 'rejected' or 'failed'",
+    )
+    message: str
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "line": 1,
+                "event_id": "evt_000123",
+                "status": "created",
+                "message": "Event processed successfully",
+            }
+        }
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.config import settings
 
 
 class RestaurantBalanceResponse(BaseModel):
@@ -32,6 +34,11 @@ class RestaurantBalanceResponse(BaseModel):
         description="Timestamp of last processed event",
     )
 
+    breakdown: Optional[Dict[str, int]] = Field(
+        default=None,
+        description="Totals per ledger entry type (only when requested)",
+    )
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -40,5 +47,54 @@ class RestaurantBalanceResponse(BaseModel):
                 "available": 10800,
                 "pending": 0,
                 "last_event_at": "2025-12-20T15:10:00Z",
+                "breakdown": None,
+            }
+        }
+
+
+class RestaurantBalanceQueryRequest(BaseModel):
+    """Request schema for querying many restaurant balances at once."""
+
+    restaurant_ids: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BALANCE_QUERY_MAX_RESTAURANTS,
+        description="Restaurant identifiers",
+        examples=[["res_001", "res_002"]],
+    )
+
+    currencies: Optional[List[str]] = Field(
+        default=None,
+        description="Currency codes to include (all currencies if omitted)",
+        examples=[["PEN", "USD"]],
+    )
+
+    @field_validator("currencies")
+    @classmethod
+    def currencies_uppercase(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """Ensure currencies are uppercase."""
+        return [c.upper() for c in v] if v else v
+
+
+class RestaurantBalanceQueryResponse(BaseModel):
+    """Response schema for multi-restaurant balance queries."""
+
+    balances: List[RestaurantBalanceResponse] = Field(
+        ...,
+        description="One entry per restaurant and currency with transactions",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "balances": [
+                    {
+                        "restaurant_id": "res_001",
+                        "currency": "PEN",
+                        "available": 10800,
+                        "pending": 0,
+                        "last_event_at": "2025-12-20T15:10:00Z",
+                    }
+                ]
             }
         }
@@ -1,9 +1,20 @@
+from app.services.balance_checkpointer import BalanceCheckpointer
+from app.services.event_dispatcher import EventDispatcher
 from app.services.event_processor import EventProcessorService
+from app.services.event_spool import EventSpool
 from app.services.ledger import LedgerService
 from app.services.payout_generator import PayoutGeneratorService
+from app.services.payout_runner import PayoutRunService, PayoutRunWorker
+from app.services.settlement_export import SettlementExportService
 
 __all__ = [
+    "BalanceCheckpointer",
+    "EventDispatcher",
     "EventProcessorService",
+    "EventSpool",
     "LedgerService",
     "PayoutGeneratorService",
+    "PayoutRunService",
+    "PayoutRunWorker",
+    "SettlementExportService",
 ]
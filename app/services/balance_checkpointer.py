@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.repositories.checkpoint import BalanceCheckpointRepository
+
+logger = get_logger(__name__)
+
+
+class BalanceCheckpointer:
+    """
+    Background task that compacts the active ledger tail into checkpoints.
+
+    Each run folds entries older than `lag_seconds` into the per-restaurant
+    checkpoints, keeping balance and breakdown queries bounded. The lag only
+    keeps recent entries in the active tail; correctness does not depend on
+    it, as checkpoints advance by commit-ordered ledger positions.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int,
+        lag_seconds: int,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
+        self.interval_seconds = interval_seconds
+        self.lag_seconds = lag_seconds
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Run a single compaction in its own transaction.
+
+        Returns:
+            Number of checkpoints created or advanced
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lag_seconds)
+        async with self.session_factory() as session:
+            advanced = await BalanceCheckpointRepository(session).compact(cutoff)
+            await session.commit()
+
+        logger.info(
+            "Balance checkpoints compacted",
+            extra={"cutoff": cutoff.isoformat(), "checkpoints_advanced": advanced},
+        )
+        return advanced
+
+    async def _run_forever(self) -> None:
+        """Compact periodically until cancelled."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Balance checkpoint compaction failed", extra={"error": str(e)})
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Cancel the background loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
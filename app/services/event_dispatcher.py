@@ -0,0 +1,182 @@
+import asyncio
+import zlib
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.schemas.processor import ProcessorEventRequest
+from app.services.event_processor import PERMANENT_ERRORS, EventProcessorService
+
+logger = get_logger(__name__)
+
+QueuedEvent = Tuple[ProcessorEventRequest, asyncio.Future]
+
+
+class EventDispatcher:
+    """
+    In-process dispatcher applying events through per-restaurant shards.
+
+    restaurant_id is hashed to one of `shards` bounded asyncio queues, each
+    consumed by a single worker. A worker takes everything waiting on its
+    queue (up to `batch_size` events) and applies it in one transaction with
+    EventProcessorService.process_events_batch. Events of a restaurant are
+    therefore applied in arrival order, restaurants on different shards are
+    applied in parallel, and a hot restaurant's balance row is only updated
+    by one worker. A full queue makes submitters wait (backpressure). A
+    micro-batch that hits an event the database rejects is applied again
+    one event at a time, so only that event's submitter gets the error.
+    """
+
+    def __init__(
+        self,
+        shards: int = settings.EVENT_DISPATCH_SHARDS,
+        queue_size: int = settings.EVENT_DISPATCH_QUEUE_SIZE,
+        batch_size: int = settings.EVENT_DISPATCH_BATCH_SIZE,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
+        self.shards = shards
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self.batches = 0
+        self.events = 0
+        self.failures = 0
+
+    def shard_for(self, restaurant_id: str) -> int:
+        """Shard of a restaurant (stable across processes and restarts)."""
+        return zlib.crc32(restaurant_id.encode()) % self.shards
+
+    async def submit(self, event: ProcessorEventRequest) -> Tuple[bool, str]:
+        """
+        Queue an event on its restaurant's shard and wait until it is applied.
+
+        Args:
+            event: Validated event
+
+        Returns:
+            Tuple of (is_new_event, message), as EventProcessorService.process_event
+
+        Raises:
+            RuntimeError: If the dispatcher is not running
+        """
+        if not self._tasks:
+            raise RuntimeError("Event dispatcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[self.shard_for(event.restaurant_id)].put((event, future))
+        return await future
+
+    async def _run_shard(self, shard: int) -> None:
+        """Apply the events of one shard, a micro-batch per transaction."""
+        queue = self._queues[shard]
+        while True:
+            batch: List[QueuedEvent] = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._apply(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error(
+                    "Event dispatch batch failed",
+                    extra={"shard": shard, "events": len(batch), "error": str(e)},
+                )
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _apply(self, batch: List[QueuedEvent]) -> None:
+        """
+        Process a micro-batch in one transaction and resolve its futures.
+
+        Falls back to one transaction per event if the batch hits an event
+        the database rejects permanently (as the event spool does).
+
+        Raises:
+            Exception: Any other database error (fails the remaining futures)
+        """
+        try:
+            async with self.session_factory() as session:
+                results = await EventProcessorService(session).process_events_batch(
+                    [event for event, _ in batch]
+                )
+                await session.commit()
+        except PERMANENT_ERRORS:
+            await self._apply_each(batch)
+            return
+
+        self.batches += 1
+        self.events += len(batch)
+        for (_, future), (_, is_new, message) in zip(batch, results):
+            if not future.done():
+                future.set_result((is_new, message))
+
+    async def _apply_each(self, batch: List[QueuedEvent]) -> None:
+        """Process a micro-batch one event per transaction, failing only rejected events."""
+        for event, future in batch:
+            try:
+                async with self.session_factory() as session:
+                    result = await EventProcessorService(session).process_event(event)
+                    await session.commit()
+            except PERMANENT_ERRORS as e:
+                self.failures += 1
+                logger.warning(
+                    "Dispatched event rejected",
+                    extra={"event_id": event.event_id, "error": str(e.orig)},
+                )
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            self.events += 1
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Queue depths and batch counters."""
+        return {
+            "shards": self.shards,
+            "queue_depths": [queue.qsize() for queue in self._queues],
+            "batches": self.batches,
+            "events": self.events,
+            "failures": self.failures,
+        }
+
+    def start(self) -> None:
+        """Create the shard queues and start one worker per shard."""
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.shards)]
+        self._tasks = [
+            asyncio.create_task(self._run_shard(shard)) for shard in range(self.shards)
+        ]
+
+    async def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Apply the events already queued, then stop the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Event dispatcher stopped with queued events")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Shared by the API and the application lifespan
+event_dispatcher = EventDispatcher()
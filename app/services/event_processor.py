@@ -1,32 +1,74 @@
 from datetime import datetime
-from typing import Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.cache import invalidate_on_commit
+from app.core.event_filter import event_id_filter, remember_on_commit
 from app.core.logging import get_logger
-from app.models.processor_event import ProcessorEvent
 from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.payout import PayoutStatus
 from app.repositories.event import ProcessorEventRepository
 from app.repositories.ledger import LedgerRepository
 from app.repositories.payout import PayoutRepository
+from app.repositories.unit_of_work import UnitOfWork
 from app.schemas.processor import ProcessorEventRequest, EventType
 
 logger = get_logger(__name__)
 
+# Database errors caused by the event itself; retrying cannot fix them
+PERMANENT_ERRORS = (DataError, IntegrityError)
+
+
+class PayoutSettlementResult(NamedTuple):
+    """Outcome of a bulk payout settlement."""
+
+    paid: List[str]
+    already_paid: List[str]
+    not_payable: List[str]
+    unknown: List[str]
+
 
 class EventProcessorService:
     """
     Service for processing payment processor events.
 
     Handles event ingestion with idempotency and ledger entry creation.
+    Ledger entries are buffered in a unit of work and written together.
     """
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.uow = UnitOfWork(session)
         self.event_repo = ProcessorEventRepository(session)
-        self.ledger_repo = LedgerRepository(session)
+        self.ledger_repo = LedgerRepository(session, self.uow)
         self.payout_repo = PayoutRepository(session)
 
+    async def is_known_duplicate(self, event_id: str) -> bool:
+        """
+        Fast-path idempotency check against the in-memory event-id filter.
+
+        Answers from memory for recently seen event_ids and only queries the
+        database to confirm a Bloom filter hit. False does not mean the
+        event is new: the idempotent insert still decides.
+
+        Args:
+            event_id: Unique event identifier
+
+        Returns:
+            True if the event is known to be processed already
+        """
+        if not settings.EVENT_ID_FILTER_ENABLED:
+            return False
+        return await event_id_filter.is_duplicate(event_id, self.event_repo.event_exists)
+
+    def _remember_on_commit(self, event_ids: List[str]) -> None:
+        """Add stored event_ids to the event-id filter once the transaction commits."""
+        if settings.EVENT_ID_FILTER_ENABLED:
+            remember_on_commit(self.session, event_ids)
+
     async def process_event(
         self, event_data: ProcessorEventRequest
     ) -> Tuple[bool, str]:
@@ -39,34 +81,18 @@ class EventProcessorService:
         Returns:
             Tuple of (is_new_event, message)
         """
-        # Check for idempotency
-        existing_event = await self.event_repo.get_by_event_id(event_data.event_id)
-        if existing_event:
+        # Idempotent insert: the unique constraint on event_id decides
+        is_new = await self.event_repo.insert_if_absent(
+            self._event_row(event_data, datetime.utcnow())
+        )
+        self._remember_on_commit([event_data.event_id])
+        if not is_new:
             logger.info(
                 "Duplicate event detected",
-                extra={
-                    "event_id": event_data.event_id,
-                    "processed_at": existing_event.processed_at.isoformat()
-                    if existing_event.processed_at
-                    else None,
-                },
+                extra={"event_id": event_data.event_id},
             )
             return False, "Event already processed"
 
-        # Create processor event record
-        processor_event = ProcessorEvent(
-            event_id=event_data.event_id,
-            event_type=event_data.event_type.value,
-            occurred_at=event_data.occurred_at,
-            restaurant_id=event_data.restaurant_id,
-            currency=event_data.currency,
-            amount=event_data.amount,
-            fee=event_data.fee,
-            event_metadata=event_data.metadata,
-            processed_at=datetime.utcnow(),
-        )
-        await self.event_repo.create(processor_event)
-
         # Create ledger entries based on event type
         if event_data.event_type == EventType.CHARGE_SUCCEEDED:
             await self._handle_charge_succeeded(event_data)
@@ -75,6 +101,9 @@ class EventProcessorService:
         elif event_data.event_type == EventType.PAYOUT_PAID:
             await self._handle_payout_paid(event_data)
 
+        # Write all ledger entries for this event in one batched INSERT
+        await self.uow.flush()
+
         logger.info(
             "Event processed successfully",
             extra={
@@ -86,40 +115,177 @@ class EventProcessorService:
 
         return True, "Event processed successfully"
 
-    async def _handle_charge_succeeded(
-        self, event_data: ProcessorEventRequest
-    ) -> None:
+    async def process_events_batch(
+        self, events: List[ProcessorEventRequest]
+    ) -> List[Tuple[str, bool, str]]:
         """
-        Handle charge_succeeded event.
+        Process a batch of payment processor events in set-based form.
+
+        Events are deduplicated inside the batch, inserted with one
+        multi-row idempotent INSERT, and their ledger entries are written
+        with one batched INSERT. Everything runs in the caller's transaction.
+
+        Args:
+            events: Events in the order they were received
+
+        Returns:
+            One (event_id, is_new_event, message) tuple per input event
+        """
+        unique_events: Dict[str, ProcessorEventRequest] = {}
+        for event_data in events:
+            unique_events.setdefault(event_data.event_id, event_data)
+
+        processed_at = datetime.utcnow()
+        inserted_ids = await self.event_repo.insert_many_ignore_duplicates(
+            [self._event_row(e, processed_at) for e in unique_events.values()]
+        )
+        new_events = [e for e in unique_events.values() if e.event_id in inserted_ids]
+        self._remember_on_commit(list(unique_events))
+
+        # Mark every payout referenced by payout_paid events at once
+        payout_ids = {
+            e.event_id: self._get_payout_id(e)
+            for e in new_events
+            if e.event_type == EventType.PAYOUT_PAID
+        }
+        requested = list(dict.fromkeys(p for p in payout_ids.values() if p))
+        releases = await self._mark_payouts_paid(requested)
+        released = set(releases)
+        statuses = await self.payout_repo.get_statuses(
+            [payout_id for payout_id in requested if payout_id not in released]
+        )
+
+        entries: List[Dict[str, Any]] = []
+        for event_data in new_events:
+            if event_data.event_type == EventType.CHARGE_SUCCEEDED:
+                entries.extend(self._build_charge_entries(event_data))
+            elif event_data.event_type == EventType.REFUND_SUCCEEDED:
+                entries.extend(self._build_refund_entries(event_data))
+            elif event_data.event_type == EventType.PAYOUT_PAID:
+                payout_id = payout_ids[event_data.event_id]
+                # Only the first event for a payout takes its release entry
+                release = releases.pop(payout_id, None) if payout_id else None
+                if release is not None:
+                    entries.append(release)
+                    continue
+                status = PayoutStatus.PAID if payout_id in released else statuses.get(payout_id)
+                self._log_payout_not_released(event_data, payout_id, status)
+
+        await self.ledger_repo.bulk_create(entries)
+
+        results: List[Tuple[str, bool, str]] = []
+        seen: set = set()
+        for event_data in events:
+            if event_data.event_id in seen:
+                results.append((event_data.event_id, False, "Duplicate event in batch"))
+                continue
+            seen.add(event_data.event_id)
+            if event_data.event_id in inserted_ids:
+                results.append((event_data.event_id, True, "Event processed successfully"))
+            else:
+                results.append((event_data.event_id, False, "Event already processed"))
+
+        logger.info(
+            "Event batch processed",
+            extra={
+                "received": len(events),
+                "events_created": len(new_events),
+                "ledger_entries": len(entries),
+            },
+        )
+
+        return results
+
+    @staticmethod
+    def _event_row(
+        event_data: ProcessorEventRequest, processed_at: datetime
+    ) -> Dict[str, Any]:
+        """Map an incoming event to processor_events column values."""
+        return {
+            "event_id": event_data.event_id,
+            "event_type": event_data.event_type.value,
+            "occurred_at": event_data.occurred_at,
+            "restaurant_id": event_data.restaurant_id,
+            "currency": event_data.currency,
+            "amount": event_data.amount,
+            "fee": event_data.fee,
+            "event_metadata": event_data.metadata,
+            "processed_at": processed_at,
+        }
+
+    @staticmethod
+    def _build_charge_entries(
+        event_data: ProcessorEventRequest,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build ledger entry values for a charge_succeeded event.
 
-        Creates two ledger entries:
         1. CHARGE: +amount (money in)
         2. FEE: -fee (processor fee deduction)
         """
         # Credit: Money in from charge
-        charge_entry = LedgerEntry(
-            restaurant_id=event_data.restaurant_id,
-            currency=event_data.currency,
-            entry_type=LedgerEntryType.CHARGE,
-            amount=event_data.amount,
-            reference_type="processor_event",
-            reference_id=event_data.event_id,
-            entry_metadata=event_data.metadata,
-        )
-        await self.ledger_repo.create(charge_entry)
+        entries = [
+            {
+                "restaurant_id": event_data.restaurant_id,
+                "currency": event_data.currency,
+                "entry_type": LedgerEntryType.CHARGE,
+                "amount": event_data.amount,
+                "reference_type": "processor_event",
+                "reference_id": event_data.event_id,
+                "entry_metadata": event_data.metadata,
+            }
+        ]
 
         # Debit: Fee deduction
         if event_data.fee > 0:
-            fee_entry = LedgerEntry(
-                restaurant_id=event_data.restaurant_id,
-                currency=event_data.currency,
-                entry_type=LedgerEntryType.FEE,
-                amount=-event_data.fee,  # Negative for deduction
-                reference_type="processor_event",
-                reference_id=event_data.event_id,
-                entry_metadata={"fee_for": event_data.event_id},
+            entries.append(
+                {
+                    "restaurant_id": event_data.restaurant_id,
+                    "currency": event_data.currency,
+                    "entry_type": LedgerEntryType.FEE,
+                    "amount": -event_data.fee,  # Negative for deduction
+                    "reference_type": "processor_event",
+                    "reference_id": event_data.event_id,
+                    "entry_metadata": {"fee_for": event_data.event_id},
+                }
             )
-            await self.ledger_repo.create(fee_entry)
+
+        return entries
+
+    @staticmethod
+    def _build_refund_entries(
+        event_data: ProcessorEventRequest,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build ledger entry values for a refund_succeeded event.
+
+        - REFUND: -amount (money out)
+
+        Note: Fee is NOT refunded (business decision).
+        """
+        return [
+            {
+                "restaurant_id": event_data.restaurant_id,
+                "currency": event_data.currency,
+                "entry_type": LedgerEntryType.REFUND,
+                "amount": -event_data.amount,  # Negative for money out
+                "reference_type": "processor_event",
+                "reference_id": event_data.event_id,
+                "entry_metadata": event_data.metadata,
+            }
+        ]
+
+    async def _handle_charge_succeeded(
+        self, event_data: ProcessorEventRequest
+    ) -> None:
+        """
+        Handle charge_succeeded event.
+
+        Creates CHARGE and FEE ledger entries.
+        """
+        await self.ledger_repo.create_many(
+            [LedgerEntry(**entry) for entry in self._build_charge_entries(event_data)]
+        )
 
     async def _handle_refund_succeeded(
         self, event_data: ProcessorEventRequest
@@ -127,21 +293,11 @@ class EventProcessorService:
         """
         Handle refund_succeeded event.
 
-        Creates ledger entry:
-        - REFUND: -amount (money out)
-
-        Note: Fee is NOT refunded (business decision).
+        Creates a REFUND ledger entry.
         """
-        refund_entry = LedgerEntry(
-            restaurant_id=event_data.restaurant_id,
-            currency=event_data.currency,
-            entry_type=LedgerEntryType.REFUND,
-            amount=-event_data.amount,  # Negative for money out
-            reference_type="processor_event",
-            reference_id=event_data.event_id,
-            entry_metadata=event_data.metadata,
+        await self.ledger_repo.create_many(
+            [LedgerEntry(**entry) for entry in self._build_refund_entries(event_data)]
         )
-        await self.ledger_repo.create(refund_entry)
 
     async def _handle_payout_paid(self, event_data: ProcessorEventRequest) -> None:
         """
@@ -149,41 +305,147 @@ class EventProcessorService:
 
         Updates payout status and creates PAYOUT_RELEASE ledger entry.
         """
-        # Get payout_id from metadata
+        payout_id = self._get_payout_id(event_data)
+        if not payout_id:
+            return
+
+        releases = await self._mark_payouts_paid([payout_id])
+        if payout_id in releases:
+            await self.ledger_repo.create(LedgerEntry(**releases[payout_id]))
+            return
+
+        statuses = await self.payout_repo.get_statuses([payout_id])
+        self._log_payout_not_released(event_data, payout_id, statuses.get(payout_id))
+
+    @staticmethod
+    def _get_payout_id(event_data: ProcessorEventRequest) -> Optional[str]:
+        """Get payout_id from a payout_paid event's metadata."""
         payout_id = event_data.metadata.get("payout_id") if event_data.metadata else None
         if not payout_id:
             logger.warning(
                 "payout_paid event missing payout_id in metadata",
                 extra={"event_id": event_data.event_id},
             )
-            return
+        return payout_id
 
-        # Find the payout
-        payout = await self.payout_repo.get_by_payout_id(payout_id)
-        if not payout:
+    @staticmethod
+    def _log_payout_not_released(
+        event_data: ProcessorEventRequest,
+        payout_id: Optional[str],
+        status: Optional[PayoutStatus],
+    ) -> None:
+        """Log a payout_paid event whose payout was not marked paid."""
+        if not payout_id:
+            return
+        if status is None:
             logger.warning(
                 "Payout not found for payout_paid event",
                 extra={"event_id": event_data.event_id, "payout_id": payout_id},
             )
-            return
+        else:
+            logger.info(
+                "Payout not payable, release skipped",
+                extra={"payout_id": payout_id, "status": status.value},
+            )
+
+    async def settle_payouts(self, payout_ids: List[str]) -> PayoutSettlementResult:
+        """
+        Mark many payouts as paid at once, e.g. from a bank settlement file.
+
+        Only CREATED payouts are marked, with one UPDATE ... RETURNING; their
+        PAYOUT_RELEASE entries are written with one batched INSERT. Runs in
+        the caller's transaction.
 
-        # Update payout status to PAID
-        payout.status = "paid"
-        payout.paid_at = datetime.utcnow()
-
-        # Create PAYOUT_RELEASE ledger entry
-        release_entry = LedgerEntry(
-            restaurant_id=payout.restaurant_id,
-            currency=payout.currency,
-            entry_type=LedgerEntryType.PAYOUT_RELEASE,
-            amount=-payout.amount,  # Negative for money out
-            reference_type="payout",
-            reference_id=payout_id,
-            entry_metadata={"payout_id": payout_id},
+        Args:
+            payout_ids: Payout identifiers confirmed as paid (duplicates
+                are ignored)
+
+        Returns:
+            PayoutSettlementResult with the ids marked paid and the ids
+            that were skipped, by reason
+        """
+        requested = list(dict.fromkeys(payout_ids))
+
+        releases = await self._mark_payouts_paid(requested)
+        await self.ledger_repo.bulk_create(list(releases.values()))
+
+        paid = set(releases)
+        statuses = await self.payout_repo.get_statuses(
+            [payout_id for payout_id in requested if payout_id not in paid]
+        )
+        result = PayoutSettlementResult(
+            paid=[payout_id for payout_id in requested if payout_id in paid],
+            already_paid=[
+                payout_id
+                for payout_id, status in statuses.items()
+                if status == PayoutStatus.PAID
+            ],
+            not_payable=[
+                payout_id
+                for payout_id, status in statuses.items()
+                if status != PayoutStatus.PAID
+            ],
+            unknown=[
+                payout_id
+                for payout_id in requested
+                if payout_id not in paid and payout_id not in statuses
+            ],
         )
-        await self.ledger_repo.create(release_entry)
 
         logger.info(
-            "Payout marked as paid",
-            extra={"payout_id": payout_id, "amount": payout.amount},
+            "Payout settlement imported",
+            extra={
+                "received": len(payout_ids),
+                "paid": len(result.paid),
+                "already_paid": len(result.already_paid),
+                "not_payable": len(result.not_payable),
+                "unknown": len(result.unknown),
+            },
         )
+
+        return result
+
+    async def _mark_payouts_paid(self, payout_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Mark CREATED payouts as PAID and build their PAYOUT_RELEASE entries.
+
+        Release entries are built only from the rows returned by
+        mark_paid_many, whose UPDATE matches CREATED payouts only, so a
+        webhook and a settlement import racing on one payout release it
+        once. Cached copies of the payouts are evicted when the transaction
+        commits.
+
+        Args:
+            payout_ids: Unique payout identifiers
+
+        Returns:
+            Values for the release entry (not yet persisted) per payout_id
+            marked paid
+        """
+        rows = await self.payout_repo.mark_paid_many(payout_ids, datetime.utcnow())
+        releases: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            invalidate_on_commit(self.session, "payout", row.payout_id)
+            logger.info(
+                "Payout marked as paid",
+                extra={"payout_id": row.payout_id, "amount": row.amount},
+            )
+            releases[row.payout_id] = self._release_entry(
+                row.payout_id, row.restaurant_id, row.currency, row.amount
+            )
+        return releases
+
+    @staticmethod
+    def _release_entry(
+        payout_id: str, restaurant_id: str, currency: str, amount: int
+    ) -> Dict[str, Any]:
+        """Build the PAYOUT_RELEASE ledger entry values of a paid payout."""
+        return {
+            "restaurant_id": restaurant_id,
+            "currency": currency,
+            "entry_type": LedgerEntryType.PAYOUT_RELEASE,
+            "amount": -amount,  # Negative for money out
+            "reference_type": "payout",
+            "reference_id": payout_id,
+            "entry_metadata": {"payout_id": payout_id},
+        }
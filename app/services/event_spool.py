@@ -0,0 +1,429 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.schemas.processor import ProcessorEventRequest
+from app.services.event_processor import PERMANENT_ERRORS, EventProcessorService
+
+logger = get_logger(__name__)
+
+# Window over which the drain rate is measured
+DRAIN_RATE_WINDOW_SECONDS = 60.0
+
+# Spooled lines that can never be applied, with the reason
+REJECTED_FILE = "rejected.ndjson"
+
+
+class SpoolPosition(NamedTuple):
+    """Byte position in the spool: segment sequence number and offset."""
+
+    segment: int
+    offset: int
+
+
+class EventSpool:
+    """
+    Durable local spool for ingested processor events.
+
+    POST /v1/processor/events appends validated events to append-only
+    segment files and answers 202 once they are fsync'd; appends arriving
+    within EVENT_SPOOL_FSYNC_INTERVAL_MS share one write and fsync. A drain
+    loop applies spooled events to the database in batches through
+    EventProcessorService, in spool order (so per-restaurant order is
+    kept), and only then moves the drain offset forward. After a crash or
+    restart everything past the offset is applied again; the event_id
+    unique constraint makes that replay idempotent. Lines that fail
+    permanently (invalid event, or rejected by the database) are moved to
+    rejected.ndjson so they never block the spool; other errors (database
+    unavailable) keep the offset and are retried.
+
+    The directory is locked, so each process needs its own spool directory.
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.EVENT_SPOOL_DIR,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        fsync_interval_ms: int = settings.EVENT_SPOOL_FSYNC_INTERVAL_MS,
+        segment_bytes: int = settings.EVENT_SPOOL_SEGMENT_BYTES,
+        batch_size: int = settings.EVENT_SPOOL_DRAIN_BATCH_SIZE,
+        poll_seconds: float = settings.EVENT_SPOOL_DRAIN_POLL_SECONDS,
+    ):
+        self.directory = directory
+        self.session_factory = session_factory
+        self.fsync_interval = fsync_interval_ms / 1000
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+
+        self._lock_fd: Optional[int] = None
+        self._segment_fd: Optional[int] = None
+        # End of the data known to be on disk; the drain never reads past it
+        self._durable = SpoolPosition(1, 0)
+        self._drained = SpoolPosition(1, 0)
+
+        self._pending: List[Tuple[bytes, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.depth = 0
+        self.appended = 0
+        self.drained = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._drain_history: Deque[Tuple[float, int]] = deque()
+
+    def open(self) -> None:
+        """
+        Lock the spool directory and recover its state from disk.
+
+        A partial last line (crash during a write, never acknowledged) is
+        truncated. Events past the drain offset count towards the depth
+        and are applied again by the drain loop.
+        """
+        if self._segment_fd is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_fd = os.open(self._path("LOCK"), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            raise RuntimeError(f"Event spool {self.directory} is used by another process")
+
+        segments = self._segments() or [1]
+        last = segments[-1]
+        size = self._truncate_partial_line(last)
+        self._segment_fd = os.open(
+            self._segment_path(last), os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o644
+        )
+        self._durable = SpoolPosition(last, size)
+        self._drained = self._load_offset() or SpoolPosition(segments[0], 0)
+        self.depth = self._count_lines(self._drained)
+
+        logger.info(
+            "Event spool opened",
+            extra={"directory": self.directory, "depth": self.depth, "segments": len(segments)},
+        )
+
+    def close(self) -> None:
+        """Close the active segment and release the directory lock."""
+        if self._segment_fd is not None:
+            os.close(self._segment_fd)
+            self._segment_fd = None
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def append(self, event: ProcessorEventRequest) -> None:
+        """
+        Append an event and wait until it is fsync'd.
+
+        Args:
+            event: Validated event
+
+        Raises:
+            OSError: If the spool cannot be written (the event is not accepted)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((event.model_dump_json().encode() + b"\n", future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_interval())
+        await future
+
+    async def _flush_after_interval(self) -> None:
+        """Write and fsync every append received during the interval at once."""
+        await asyncio.sleep(self.fsync_interval)
+        self._flush_task = None
+        pending, self._pending = self._pending, []
+
+        async with self._write_lock:
+            try:
+                self._durable = await asyncio.to_thread(
+                    self._write, b"".join(line for line, _ in pending)
+                )
+            except Exception as e:
+                logger.error("Event spool write failed", extra={"error": str(e)})
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        self.appended += len(pending)
+        self.depth += len(pending)
+        for _, future in pending:
+            if not future.done():
+                future.set_result(None)
+        self._wakeup.set()
+
+    def _write(self, data: bytes) -> SpoolPosition:
+        """Append to the active segment, fsync, and rotate it once full."""
+        segment, size = self._durable
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._segment_fd, view):]
+            os.fsync(self._segment_fd)
+        except OSError:
+            # Drop a partial write so later appends start on a clean line
+            os.ftruncate(self._segment_fd, size)
+            raise
+        size += len(data)
+
+        if size >= self.segment_bytes:
+            os.close(self._segment_fd)
+            segment, size = segment + 1, 0
+            self._segment_fd = os.open(
+                self._segment_path(segment), os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o644
+            )
+            self._fsync_directory()
+        return SpoolPosition(segment, size)
+
+    async def drain_once(self) -> int:
+        """
+        Apply the next batch of spooled events to the database.
+
+        Lines are validated one by one. Lines that fail permanently are
+        written to the rejected file before the offset moves past them.
+
+        Returns:
+            Number of spooled lines consumed, applied or rejected (0 if the
+            spool is empty)
+        """
+        lines, end = await asyncio.to_thread(self._read_batch, self._drained, self._durable)
+
+        events: List[Tuple[bytes, ProcessorEventRequest]] = []
+        rejected: List[Tuple[bytes, str]] = []
+        for line in lines:
+            try:
+                events.append((line, ProcessorEventRequest.model_validate_json(line)))
+            except ValidationError as e:
+                rejected.append((line, str(e)))
+        if events:
+            rejected.extend(await self._apply(events))
+        if rejected:
+            await asyncio.to_thread(self._write_rejected, rejected)
+            logger.warning("Spooled events rejected", extra={"count": len(rejected)})
+
+        if end != self._drained:
+            await asyncio.to_thread(self._save_offset, end)
+            self._drained = end
+
+        self.drained += len(lines) - len(rejected)
+        self.rejected += len(rejected)
+        self.depth -= len(lines)
+        if lines:
+            self._drain_history.append((time.monotonic(), len(lines)))
+        return len(lines)
+
+    async def _apply(
+        self, events: List[Tuple[bytes, ProcessorEventRequest]]
+    ) -> List[Tuple[bytes, str]]:
+        """
+        Apply events in one batch, or one by one if the batch hits a bad event.
+
+        Returns:
+            The lines the database rejected permanently, with the error
+
+        Raises:
+            Exception: Any other database error (the batch is retried later)
+        """
+        try:
+            async with self.session_factory() as session:
+                await EventProcessorService(session).process_events_batch(
+                    [event for _, event in events]
+                )
+                await session.commit()
+            return []
+        except PERMANENT_ERRORS:
+            pass
+
+        rejected: List[Tuple[bytes, str]] = []
+        for line, event in events:
+            try:
+                async with self.session_factory() as session:
+                    await EventProcessorService(session).process_event(event)
+                    await session.commit()
+            except PERMANENT_ERRORS as e:
+                rejected.append((line, str(e.orig)))
+        return rejected
+
+    def _write_rejected(self, rejected: List[Tuple[bytes, str]]) -> None:
+        """Append rejected lines with their errors to the rejected file, durably."""
+        with open(self._path(REJECTED_FILE), "ab") as f:
+            for line, error in rejected:
+                record = {"line": line.decode(errors="replace").rstrip("\n"), "error": error}
+                f.write(json.dumps(record).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_batch(
+        self, start: SpoolPosition, durable: SpoolPosition
+    ) -> Tuple[List[bytes], SpoolPosition]:
+        """Read up to batch_size complete lines from start, never past durable."""
+        lines: List[bytes] = []
+        segment, offset = start
+        while len(lines) < self.batch_size and (segment, offset) < tuple(durable):
+            limit = durable.offset if segment == durable.segment else None
+            with open(self._segment_path(segment), "rb") as f:
+                f.seek(offset)
+                while len(lines) < self.batch_size and (limit is None or offset < limit):
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                    offset += len(line)
+            if limit is None and len(lines) < self.batch_size:
+                # Older segment fully read: continue with the next one
+                segment, offset = segment + 1, 0
+            else:
+                break
+        return lines, SpoolPosition(segment, offset)
+
+    def _save_offset(self, position: SpoolPosition) -> None:
+        """Persist the drain offset atomically and delete drained segments."""
+        tmp_path = self._path("offset.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"segment": position.segment, "offset": position.offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path("offset"))
+        self._fsync_directory()
+
+        for segment in self._segments():
+            if segment < position.segment:
+                os.remove(self._segment_path(segment))
+
+    def _load_offset(self) -> Optional[SpoolPosition]:
+        """Read the persisted drain offset, if any."""
+        try:
+            with open(self._path("offset")) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return SpoolPosition(data["segment"], data["offset"])
+
+    def _count_lines(self, start: SpoolPosition) -> int:
+        """Count spooled events from a position to the end of the spool."""
+        count = 0
+        for segment in self._segments():
+            if segment < start.segment:
+                continue
+            with open(self._segment_path(segment), "rb") as f:
+                if segment == start.segment:
+                    f.seek(start.offset)
+                count += sum(1 for _ in f)
+        return count
+
+    def _truncate_partial_line(self, segment: int) -> int:
+        """Drop an unterminated last line from a segment and return its size."""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb+") as f:
+            data = f.read()
+            size = data.rfind(b"\n") + 1
+            if size < len(data):
+                logger.warning(
+                    "Truncating partial event spool record",
+                    extra={"segment": segment, "bytes": len(data) - size},
+                )
+                f.truncate(size)
+                os.fsync(f.fileno())
+        return size
+
+    def _segments(self) -> List[int]:
+        """Sequence numbers of the segment files, oldest first."""
+        return sorted(
+            int(name.split(".")[0])
+            for name in os.listdir(self.directory)
+            if name.endswith(".spool")
+        )
+
+    def _segment_path(self, segment: int) -> str:
+        return self._path(f"{segment:012d}.spool")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _fsync_directory(self) -> None:
+        """Make file creations, renames and deletions in the spool durable."""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def stats(self) -> dict:
+        """Spool depth, counters and drain rate (lines/second)."""
+        cutoff = time.monotonic() - DRAIN_RATE_WINDOW_SECONDS
+        while self._drain_history and self._drain_history[0][0] < cutoff:
+            self._drain_history.popleft()
+        return {
+            "depth": self.depth,
+            "appended": self.appended,
+            "drained": self.drained,
+            "rejected": self.rejected,
+            "drain_rate_per_second": round(
+                sum(count for _, count in self._drain_history) / DRAIN_RATE_WINDOW_SECONDS, 2
+            ),
+            "last_error": self.last_error,
+        }
+
+    async def _run_forever(self) -> None:
+        """Drain batches; when the spool is empty, wait for appends or the next poll."""
+        while True:
+            try:
+                drained = await self.drain_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database unavailable: keep the events and retry later
+                self.last_error = str(e)
+                logger.error("Event spool drain failed", extra={"error": str(e)})
+                drained = 0
+            if drained < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """Open the spool and start the drain loop, replaying unapplied events."""
+        self.open()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Stop the drain loop; events not applied yet stay in the spool."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await self._flush_task
+        self.close()
+
+
+# Shared by the API and the application lifespan
+event_spool = EventSpool()
@@ -0,0 +1,187 @@
+import json
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.schemas.processor import ProcessorEventRequest, ProcessorEventStreamItem
+from app.services.event_processor import EventProcessorService
+
+logger = get_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# A parsed line: its result if rejected, else (line number, event) to apply
+ParsedLine = Union[ProcessorEventStreamItem, Tuple[int, ProcessorEventRequest]]
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """One-line summary of a validation error: "field: message; ..."."""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+class EventStreamIngestionService:
+    """
+    Applies an NDJSON stream of processor events in micro-batches.
+
+    Lines are split off the request body as chunks arrive and validated one
+    by one. Every `batch_size` lines, the valid events are applied in one
+    transaction with EventProcessorService.process_events_batch and the
+    results of those lines are yielded as NDJSON, in line order. Only one
+    batch and one partial line (at most `max_line_bytes`) are held in
+    memory, and the body is read only as fast as results are sent, so a
+    stream can carry any number of events. Each batch runs in a session of
+    its own, since the stream outlives the request's session.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = settings.EVENT_STREAM_BATCH_SIZE,
+        max_line_bytes: int = settings.EVENT_STREAM_MAX_LINE_BYTES,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.lines = 0
+        self.created = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.failed = 0
+
+    async def ingest(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Apply the events of an NDJSON body and stream back per-line results.
+
+        Args:
+            chunks: Request body chunks, split anywhere
+
+        Yields:
+            NDJSON ProcessorEventStreamItem lines, one per non-blank input
+            line, a micro-batch at a time
+        """
+        pending: List[ParsedLine] = []
+        async for line_number, line in self._split_lines(chunks):
+            pending.append(self._parse(line_number, line))
+            if len(pending) >= self.batch_size:
+                yield await self._apply(pending)
+                pending = []
+        if pending:
+            yield await self._apply(pending)
+
+        logger.info(
+            "Event stream ingested",
+            extra={
+                "lines": self.lines,
+                "events_created": self.created,
+                "duplicates": self.duplicates,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            },
+        )
+
+    async def _split_lines(
+        self, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+        """Yield (line number, line) for non-blank lines; None for an oversized line."""
+        buffer = bytearray()
+        oversized = False
+        async for chunk in chunks:
+            buffer += chunk
+            start = 0
+            while (end := buffer.find(b"\n", start)) != -1:
+                self.lines += 1
+                line = bytes(buffer[start:end])
+                start = end + 1
+                if oversized or len(line) > self.max_line_bytes:
+                    oversized = False
+                    yield self.lines, None
+                elif line.strip():
+                    yield self.lines, line
+            del buffer[:start]
+
+            if len(buffer) > self.max_line_bytes:
+                # Drop the rest of the line as it arrives
+                oversized = True
+                buffer.clear()
+
+        if oversized or buffer.strip():
+            self.lines += 1
+            yield self.lines, None if oversized else bytes(buffer)
+
+    def _parse(self, line_number: int, line: Optional[bytes]) -> ParsedLine:
+        """Validate a line into an event, or into its rejection."""
+        if line is None:
+            return self._rejected(
+                line_number, None, f"Line exceeds {self.max_line_bytes} bytes"
+            )
+        try:
+            raw_event = json.loads(line)
+        except ValueError as e:
+            return self._rejected(line_number, None, f"Invalid JSON: {e}")
+        if not isinstance(raw_event, dict):
+            return self._rejected(line_number, None, "Line is not a JSON object")
+
+        try:
+            return line_number, ProcessorEventRequest.model_validate(raw_event)
+        except ValidationError as e:
+            event_id = raw_event.get("event_id")
+            return self._rejected(
+                line_number,
+                event_id if isinstance(event_id, str) else None,
+                format_validation_error(e),
+            )
+
+    def _rejected(
+        self, line_number: int, event_id: Optional[str], message: str
+    ) -> ProcessorEventStreamItem:
+        self.rejected += 1
+        return ProcessorEventStreamItem(
+            line=line_number, event_id=event_id, status="rejected", message=message
+        )
+
+    async def _apply(self, pending: List[ParsedLine]) -> bytes:
+        """Apply the valid events of a micro-batch; return its results as NDJSON."""
+        valid = [item for item in pending if isinstance(item, tuple)]
+        try:
+            async with self.session_factory() as session:
+                processed = await EventProcessorService(session).process_events_batch(
+                    [event for _, event in valid]
+                )
+                await session.commit()
+        except Exception as e:
+            # The batch is rolled back; its lines are reported so they can be resent
+            logger.error(
+                "Event stream batch failed",
+                extra={"events": len(valid), "error": str(e)},
+            )
+            self.failed += len(valid)
+            processed = [
+                (event.event_id, None, f"Batch failed: {e}") for _, event in valid
+            ]
+
+        results = iter(processed)
+        out = bytearray()
+        for item in pending:
+            if isinstance(item, tuple):
+                line_number = item[0]
+                event_id, is_new, message = next(results)
+                if is_new is None:
+                    item_status = "failed"
+                elif is_new:
+                    item_status = "created"
+                    self.created += 1
+                else:
+                    item_status = "duplicate"
+                    self.duplicates += 1
+                item = ProcessorEventStreamItem(
+                    line=line_number, event_id=event_id, status=item_status, message=message
+                )
+            out += item.model_dump_json().encode()
+            out += b"\n"
+        return bytes(out)
@@ -1,29 +1,49 @@
-from typing import Optional
-from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import balance_cache
+from app.repositories.balance import RestaurantBalanceRepository
 from app.repositories.ledger import LedgerRepository
 from app.schemas.restaurant import RestaurantBalanceResponse
 from app.core.exceptions import RestaurantNotFoundError
 
 
+class CachedBalance(NamedTuple):
+    """Balance cache entry: the response plus the projection's entry_count."""
+
+    version: int
+    response: RestaurantBalanceResponse
+
+
 class LedgerService:
     """Service for ledger operations and balance calculations."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
         self.ledger_repo = LedgerRepository(session)
+        self.balance_repo = RestaurantBalanceRepository(session)
+        # Balances already looked up by this (request-scoped) service
+        self._balances: Dict[Tuple[str, str], CachedBalance] = {}
 
     async def get_restaurant_balance(
-        self, restaurant_id: str, currency: str = "PEN"
+        self,
+        restaurant_id: str,
+        currency: str = "PEN",
+        include_breakdown: bool = False,
     ) -> RestaurantBalanceResponse:
         """
         Get balance for a restaurant.
 
+        Without breakdown this is served from the in-process balance cache,
+        falling back to a single-row lookup on the materialized projection.
+        With breakdown, one aggregate query over the ledger
+        returns every field at once.
+
         Args:
             restaurant_id: Restaurant identifier
             currency: Currency code (defaults to PEN)
+            include_breakdown: Also return totals per ledger entry type
 
         Returns:
             RestaurantBalanceResponse with balance details
@@ -31,25 +51,103 @@ class LedgerService:
         Raises:
             RestaurantNotFoundError: If restaurant has no transactions
         """
-        # Calculate available balance
-        available = await self.ledger_repo.get_balance(restaurant_id, currency)
+        if include_breakdown:
+            summary = await self.ledger_repo.get_balance_summary(restaurant_id, currency)
+            if summary is None:
+                raise RestaurantNotFoundError(restaurant_id)
 
-        # Get last event timestamp
-        last_event_at = await self.ledger_repo.get_last_event_time(
-            restaurant_id, currency
-        )
+            return RestaurantBalanceResponse(
+                restaurant_id=restaurant_id,
+                currency=currency,
+                **summary,
+            )
 
-        # If no transactions found, restaurant doesn't exist
-        if available == 0 and last_event_at is None:
+        cached = await self._get_cached_balance(restaurant_id, currency)
+        if cached is None:
             raise RestaurantNotFoundError(restaurant_id)
+        return cached.response
+
+    async def get_balance_version(
+        self, restaurant_id: str, currency: str = "PEN"
+    ) -> Optional[int]:
+        """
+        Get a version number for a restaurant's balance.
+
+        The projection's entry_count grows with every ledger entry, so it
+        changes whenever available, pending or the breakdown can change.
+        Served from the balance cache when possible.
+
+        Args:
+            restaurant_id: Restaurant identifier
+            currency: Currency code (defaults to PEN)
+
+        Returns:
+            Version number, or None if the restaurant has no transactions
+        """
+        cached = await self._get_cached_balance(restaurant_id, currency)
+        return cached.version if cached is not None else None
+
+    async def _get_cached_balance(
+        self, restaurant_id: str, currency: str
+    ) -> Optional[CachedBalance]:
+        """Get a balance from the cache, loading it from the projection on a miss."""
+        key = (restaurant_id, currency)
+        if key in self._balances:
+            return self._balances[key]
+
+        cached = balance_cache.get(key)
+        if cached is not None:
+            self._balances[key] = cached
+            return cached
+
+        # Single-row lookup on the materialized projection
+        generation = balance_cache.generation()
+        balance = await self.balance_repo.get_for_restaurant(restaurant_id, currency)
+
+        # If no transactions found, restaurant doesn't exist
+        if balance is None:
+            return None
 
-        return RestaurantBalanceResponse(
-            restaurant_id=restaurant_id,
-            currency=currency,
-            available=available,
-            pending=0,  # Not implemented yet (bonus feature)
-            last_event_at=last_event_at,
+        cached = CachedBalance(
+            version=balance.entry_count,
+            response=RestaurantBalanceResponse(
+                restaurant_id=restaurant_id,
+                currency=currency,
+                available=balance.available,
+                pending=balance.reserved,
+                last_event_at=balance.last_entry_at,
+            ),
         )
+        balance_cache.set(key, cached, generation=generation)
+        self._balances[key] = cached
+        return cached
+
+    async def get_restaurant_balances(
+        self, restaurant_ids: List[str], currencies: Optional[List[str]] = None
+    ) -> List[RestaurantBalanceResponse]:
+        """
+        Get balances for many restaurants and currencies at once.
+
+        Args:
+            restaurant_ids: Restaurant identifiers
+            currencies: Currency codes to include (all if None)
+
+        Returns:
+            One RestaurantBalanceResponse per (restaurant, currency) with
+            transactions. Unknown restaurants are omitted.
+        """
+        balances = await self.balance_repo.get_many(restaurant_ids, currencies)
+
+        return [
+            RestaurantBalanceResponse(
+                restaurant_id=balance.restaurant_id,
+                currency=balance.currency,
+                available=balance.available,
+                pending=balance.reserved,
+                last_event_at=balance.last_entry_at,
+            )
+            for balance in balances
+        ]
 
     async def get_ledger_breakdown(
         self, restaurant_id: str, currency: str
@@ -1,29 +1,65 @@
+import math
 from datetime import date
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import uuid
 
-from sqlalchemy import select, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import payout_cache
 from app.core.logging import get_logger
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.payout import Payout, PayoutStatus
-from app.models.payout_item import PayoutItem
-from app.models.ledger_entry import LedgerEntry
+from app.models.ledger_entry import LedgerEntryType
 from app.repositories.payout import PayoutRepository
 from app.repositories.ledger import LedgerRepository
-from app.schemas.payout import PayoutResponse, PayoutItemResponse
-from app.core.exceptions import PayoutNotFoundError
+from app.repositories.payout_watermark import PayoutWatermarkRepository
+from app.schemas.payout import (
+    PayoutItemResponse,
+    PayoutListResponse,
+    PayoutPreviewItem,
+    PayoutPreviewResponse,
+    PayoutResponse,
+)
+from app.core.exceptions import InvalidCursorError, PayoutNotFoundError
 
 logger = get_logger(__name__)
 
+# Ledger entry type -> payout item type
+PAYOUT_ITEM_TYPES = {
+    LedgerEntryType.CHARGE.value: "gross_sales",
+    LedgerEntryType.FEE.value: "fees",
+    LedgerEntryType.REFUND.value: "refunds",
+}
+
+
+class CachedPayout(NamedTuple):
+    """Payout cache entry: the serialized PayoutResponse and its version."""
+
+    version: str
+    body: bytes
+
+
+class PayoutGenerationResult(NamedTuple):
+    """Outcome of a payout generation."""
+
+    restaurants_scanned: int
+    payouts_created: int
+
 
 class PayoutGeneratorService:
-    """Service for generating and managing payouts."""
+    """
+    Service for generating and managing payouts.
+
+    A run is set-based: eligible restaurants are found with one aggregate
+    query, and payouts, items and reserve entries are written with one
+    batched INSERT per table.
+    """
 
     def __init__(self, session: AsyncSession):
         self.session = session
         self.payout_repo = PayoutRepository(session)
         self.ledger_repo = LedgerRepository(session)
+        self.watermark_repo = PayoutWatermarkRepository(session)
 
     async def generate_payouts(
         self, currency: str, as_of_date: date, min_amount: int
@@ -39,166 +75,279 @@ class PayoutGeneratorService:
         Returns:
             Number of payouts created
         """
-        # Get all unique restaurant IDs with ledger entries in this currency
-        result = await self.session.execute(
-            select(distinct(LedgerEntry.restaurant_id)).where(
-                LedgerEntry.currency == currency
-            )
-        )
-        restaurant_ids = [row[0] for row in result.all()]
+        result = await self.generate(currency, as_of_date, min_amount)
+        return result.payouts_created
+
+    async def generate(
+        self,
+        currency: str,
+        as_of_date: date,
+        min_amount: int,
+        partition: Optional[Tuple[int, int]] = None,
+    ) -> PayoutGenerationResult:
+        """
+        Generate payouts for all eligible restaurants.
 
-        payouts_created = 0
+        Set-based: one aggregate query finds eligible restaurants and their
+        breakdowns, then payouts, payout items and PAYOUT_RESERVE entries
+        are written with one multi-row INSERT each.
 
-        for restaurant_id in restaurant_ids:
-            # Check if payout already exists
-            exists = await self.payout_repo.payout_exists_for_date(
-                restaurant_id, currency, as_of_date
-            )
-            if exists:
-                logger.info(
-                    "Payout already exists, skipping",
-                    extra={
-                        "restaurant_id": restaurant_id,
-                        "as_of_date": as_of_date.isoformat(),
-                    },
-                )
-                continue
-
-            # Get balance
-            balance = await self.ledger_repo.get_balance(restaurant_id, currency)
-
-            # Check if meets minimum
-            if balance < min_amount:
-                logger.debug(
-                    "Restaurant balance below minimum, skipping",
-                    extra={
-                        "restaurant_id": restaurant_id,
-                        "balance": balance,
-                        "min_amount": min_amount,
-                    },
-                )
-                continue
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            min_amount: Minimum balance required (in cents)
+            partition: Optional (index, count) hash partition of restaurants
+                to restrict the run to
 
-            # Create payout
-            try:
-                await self._create_payout(
-                    restaurant_id, currency, balance, as_of_date
-                )
-                payouts_created += 1
-            except Exception as e:
-                logger.error(
-                    "Failed to create payout",
-                    extra={
-                        "restaurant_id": restaurant_id,
-                        "error": str(e),
-                    },
-                )
-                continue
+        Returns:
+            Number of eligible restaurants found and payouts created
+        """
+        candidates = await self.ledger_repo.get_payout_candidates(
+            currency, as_of_date, min_amount, partition
+        )
+        payouts_created = await self._create_payouts(candidates, currency, as_of_date)
 
         logger.info(
             "Payout generation completed",
             extra={
                 "currency": currency,
                 "as_of_date": as_of_date.isoformat(),
+                "partition": f"{partition[0]}/{partition[1]}" if partition else None,
+                "restaurants_eligible": len(candidates),
                 "payouts_created": payouts_created,
             },
         )
 
-        return payouts_created
+        return PayoutGenerationResult(
+            restaurants_scanned=len(candidates),
+            payouts_created=payouts_created,
+        )
 
-    async def _create_payout(
-        self, restaurant_id: str, currency: str, amount: int, as_of_date: date
-    ) -> Payout:
+    async def _create_payouts(
+        self, candidates: List[Dict], currency: str, as_of_date: date
+    ) -> int:
         """
-        Create a payout with breakdown items.
+        Create payouts with breakdown items and reserve entries in bulk.
+
+        Payouts that already exist for the date (e.g. created by a concurrent
+        run) are skipped by the unique constraint, together with their items
+        and reserves.
 
         Args:
-            restaurant_id: Restaurant identifier
+            candidates: Eligible restaurants from get_payout_candidates
             currency: Currency code
-            amount: Payout amount in cents
             as_of_date: Payout date
 
         Returns:
-            Created Payout
+            Number of payouts created
         """
-        # Generate unique payout_id
-        payout_id = f"po_{uuid.uuid4().hex[:12]}"
-
-        # Get ledger breakdown
-        breakdown = await self.ledger_repo.get_breakdown(restaurant_id, currency)
-
-        # Create payout
-        payout = Payout(
-            payout_id=payout_id,
-            restaurant_id=restaurant_id,
-            currency=currency,
-            amount=amount,
-            status=PayoutStatus.CREATED,
-            as_of_date=as_of_date,
+        payouts = [
+            {
+                "id": uuid.uuid4(),
+                "payout_id": f"po_{uuid.uuid4().hex[:12]}",
+                "restaurant_id": candidate["restaurant_id"],
+                "currency": currency,
+                "amount": candidate["balance"],
+                "status": PayoutStatus.CREATED,
+                "as_of_date": as_of_date,
+                "breakdown": candidate["breakdown"],
+                "covered_position": candidate["covered_position"],
+                "covered_until": candidate["covered_until"],
+            }
+            for candidate in candidates
+        ]
+        inserted = await self.payout_repo.insert_many_ignore_existing(
+            [
+                {
+                    k: v
+                    for k, v in p.items()
+                    if k not in ("breakdown", "covered_position", "covered_until")
+                }
+                for p in payouts
+            ]
         )
-        await self.payout_repo.create(payout)
-
-        # Create payout items from breakdown
-        items_to_create = []
-
-        # Charges (gross sales)
-        if "charge" in breakdown:
-            items_to_create.append(
-                PayoutItem(
-                    payout_id=payout.id,
-                    item_type="gross_sales",
-                    amount=breakdown["charge"],
+        payouts = [p for p in payouts if p["payout_id"] in inserted]
+
+        items = []
+        reserves = []
+        for payout in payouts:
+            for item_type, amount in self._breakdown_items(payout["breakdown"]):
+                items.append(
+                    {"payout_id": payout["id"], "item_type": item_type, "amount": amount}
                 )
-            )
 
-        # Fees
-        if "fee" in breakdown:
-            items_to_create.append(
-                PayoutItem(
-                    payout_id=payout.id,
-                    item_type="fees",
-                    amount=breakdown["fee"],
-                )
+            reserves.append(
+                {
+                    "restaurant_id": payout["restaurant_id"],
+                    "currency": currency,
+                    "entry_type": LedgerEntryType.PAYOUT_RESERVE,
+                    "amount": -payout["amount"],  # Negative to lock funds
+                    "reference_type": "payout",
+                    "reference_id": payout["payout_id"],
+                    "entry_metadata": {"as_of_date": as_of_date.isoformat()},
+                }
             )
 
-        # Refunds
-        if "refund" in breakdown:
-            items_to_create.append(
-                PayoutItem(
-                    payout_id=payout.id,
-                    item_type="refunds",
-                    amount=breakdown["refund"],
-                )
-            )
+        await self.payout_repo.create_items(items)
+        await self.ledger_repo.bulk_create(reserves)
+
+        # The next payout's breakdown starts after the newest entry covered here
+        await self.watermark_repo.advance(
+            [
+                {
+                    "restaurant_id": payout["restaurant_id"],
+                    "currency": currency,
+                    "covered_until": payout["covered_until"],
+                    "covered_position": payout["covered_position"],
+                    "last_payout_id": payout["payout_id"],
+                }
+                for payout in payouts
+                if payout["covered_position"] is not None
+            ]
+        )
 
-        # Add items to session
-        for item in items_to_create:
-            self.session.add(item)
+        return len(payouts)
 
-        # Create PAYOUT_RESERVE ledger entry
-        from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+    async def preview_payouts(
+        self,
+        currency: str,
+        as_of_date: date,
+        min_amount: int,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> PayoutPreviewResponse:
+        """
+        Show what a payout run would create, without writing anything.
 
-        reserve_entry = LedgerEntry(
-            restaurant_id=restaurant_id,
-            currency=currency,
-            entry_type=LedgerEntryType.PAYOUT_RESERVE,
-            amount=-amount,  # Negative to lock funds
-            reference_type="payout",
-            reference_id=payout_id,
-            entry_metadata={"as_of_date": as_of_date.isoformat()},
+        Uses the same aggregate query as a run, one page of restaurants at
+        a time (keyset on restaurant_id), plus a projection-only query for
+        the totals. The caller should run it in a read-only transaction.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            min_amount: Minimum balance required (in cents)
+            limit: Page size
+            cursor: next_cursor of the previous page, if any
+
+        Returns:
+            PayoutPreviewResponse with totals and one page of payouts
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor, 1)[0] if cursor is not None else None
+
+        eligible, total = await self.ledger_repo.get_payout_candidate_totals(
+            currency, as_of_date, min_amount
+        )
+        # One extra row tells whether there is a next page
+        candidates = await self.ledger_repo.get_payout_candidates(
+            currency, as_of_date, min_amount, after=after, limit=limit + 1
         )
-        await self.ledger_repo.create(reserve_entry)
 
-        logger.info(
-            "Payout created",
-            extra={
-                "payout_id": payout_id,
-                "restaurant_id": restaurant_id,
-                "amount": amount,
-            },
+        next_cursor = None
+        if len(candidates) > limit:
+            candidates = candidates[:limit]
+            next_cursor = encode_cursor(candidates[-1]["restaurant_id"])
+
+        return PayoutPreviewResponse(
+            currency=currency,
+            as_of=as_of_date,
+            min_amount=min_amount,
+            eligible_restaurants=eligible,
+            total_amount=total,
+            restaurants=[
+                PayoutPreviewItem(
+                    restaurant_id=candidate["restaurant_id"],
+                    amount=candidate["balance"],
+                    items=[
+                        PayoutItemResponse(type=item_type, amount=amount)
+                        for item_type, amount in self._breakdown_items(candidate["breakdown"])
+                    ],
+                )
+                for candidate in candidates
+            ],
+            next_cursor=next_cursor,
         )
 
-        return payout
+    @staticmethod
+    def _breakdown_items(breakdown: Dict[str, int]) -> List[Tuple[str, int]]:
+        """Payout items from a ledger breakdown: gross sales, fees, refunds."""
+        return [
+            (item_type, breakdown[entry_type])
+            for entry_type, item_type in PAYOUT_ITEM_TYPES.items()
+            if entry_type in breakdown
+        ]
+
+    async def get_payout_version(self, payout_id: str) -> Optional[str]:
+        """
+        Get a version token for a payout without loading its items.
+
+        Items and amount never change after creation; only status and
+        paid_at do.
+
+        Args:
+            payout_id: Unique payout identifier
+
+        Returns:
+            Version token, or None if the payout does not exist
+        """
+        status = await self.payout_repo.get_status(payout_id)
+        if status is None:
+            return None
+        payout_status, paid_at = status
+        return f"{payout_status.value}:{paid_at.isoformat() if paid_at else ''}"
+
+    @staticmethod
+    def get_cached_payout(payout_id: str) -> Optional[CachedPayout]:
+        """
+        Get a payout from the payout cache, without touching the database.
+
+        Args:
+            payout_id: Unique payout identifier
+
+        Returns:
+            CachedPayout, or None if not cached
+        """
+        return payout_cache.get(payout_id)
+
+    async def get_payout_json(self, payout_id: str) -> CachedPayout:
+        """
+        Get payout details serialized as JSON, through the payout cache.
+
+        PAID payouts never change, so they stay cached until evicted (LRU).
+        Other payouts are cached for PAYOUT_CACHE_TTL_SECONDS and evicted
+        when a transaction marking them paid commits; a read that raced that
+        commit is not cached.
+
+        Args:
+            payout_id: Unique payout identifier
+
+        Returns:
+            CachedPayout with the PayoutResponse JSON and its version
+
+        Raises:
+            PayoutNotFoundError: If payout not found
+        """
+        cached = payout_cache.get(payout_id)
+        if cached is not None:
+            return cached
+
+        generation = payout_cache.generation()
+        payout = await self.get_payout(payout_id)
+        paid_at = payout.paid_at.isoformat() if payout.paid_at else ""
+        cached = CachedPayout(
+            version=f"{payout.status.value}:{paid_at}",
+            body=payout.model_dump_json().encode(),
+        )
+        payout_cache.set(
+            payout_id,
+            cached,
+            ttl_seconds=math.inf if payout.status == PayoutStatus.PAID else None,
+            generation=generation,
+        )
+        return cached
 
     async def get_payout(self, payout_id: str) -> PayoutResponse:
         """
@@ -217,22 +366,80 @@ class PayoutGeneratorService:
         if not payout:
             raise PayoutNotFoundError(payout_id)
 
-        # Convert items to response format
-        items = [
-            PayoutItemResponse(
-                type=item.item_type,
-                amount=item.amount,
-            )
-            for item in payout.items
-        ]
+        return self._to_response(payout)
+
+    async def list_payouts(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        restaurant_id: Optional[str] = None,
+        currency: Optional[str] = None,
+        status: Optional[PayoutStatus] = None,
+        as_of_from: Optional[date] = None,
+        as_of_to: Optional[date] = None,
+    ) -> PayoutListResponse:
+        """
+        List payouts page by page, with their breakdown items.
+
+        Args:
+            limit: Page size
+            cursor: next_cursor of the previous page, if any
+            restaurant_id: Only payouts of this restaurant
+            currency: Only payouts in this currency
+            status: Only payouts with this status
+            as_of_from: Only payouts on or after this date
+            as_of_to: Only payouts on or before this date
+
+        Returns:
+            PayoutListResponse with the page and the cursor of the next one
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        after = None
+        if cursor is not None:
+            as_of, payout_pk = decode_cursor(cursor, 2)
+            try:
+                after = (date.fromisoformat(as_of), uuid.UUID(payout_pk))
+            except ValueError as e:
+                raise InvalidCursorError(cursor) from e
+
+        # One extra row tells whether there is a next page
+        payouts = await self.payout_repo.list_page(
+            limit + 1,
+            restaurant_id=restaurant_id,
+            currency=currency,
+            status=status,
+            as_of_from=as_of_from,
+            as_of_to=as_of_to,
+            after=after,
+        )
+
+        next_cursor = None
+        if len(payouts) > limit:
+            payouts = payouts[:limit]
+            last = payouts[-1]
+            next_cursor = encode_cursor(last.as_of_date.isoformat(), last.id)
+
+        return PayoutListResponse(
+            payouts=[self._to_response(payout) for payout in payouts],
+            next_cursor=next_cursor,
+        )
 
+    @staticmethod
+    def _to_response(payout: Payout) -> PayoutResponse:
+        """Convert a payout (with items loaded) to its response schema."""
         return PayoutResponse(
             payout_id=payout.payout_id,
             restaurant_id=payout.restaurant_id,
             currency=payout.currency,
             amount=payout.amount,
             status=payout.status,
+            as_of=payout.as_of_date,
             created_at=payout.created_at,
             paid_at=payout.paid_at,
-            items=items,
+            items=[
+                PayoutItemResponse(type=item.item_type, amount=item.amount)
+                for item in payout.items
+            ],
         )
@@ -0,0 +1,370 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import date, datetime, timezone
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import PayoutRunNotFoundError
+from app.core.logging import get_logger
+from app.models.payout_run import PayoutRun, PayoutRunStatus
+from app.repositories.payout_run import PayoutRunRepository
+from app.repositories.payout_run_chunk import PayoutRunChunkRepository
+from app.schemas.payout import PayoutRunStatusResponse
+from app.services.payout_generator import PayoutGeneratorService
+
+logger = get_logger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PayoutRunService:
+    """Service for creating payout runs and reporting their progress."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.run_repo = PayoutRunRepository(session)
+        self.chunk_repo = PayoutRunChunkRepository(session)
+
+    async def create_run(
+        self,
+        currency: str,
+        as_of_date: date,
+        min_amount: int,
+        partitions: int = settings.PAYOUT_RUN_PARTITIONS,
+    ) -> PayoutRun:
+        """
+        Record a pending payout run and enqueue one chunk per partition.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            min_amount: Minimum balance required (in cents)
+            partitions: Number of restaurant hash partitions
+
+        Returns:
+            Created PayoutRun
+        """
+        run = PayoutRun(
+            run_id=f"run_{uuid.uuid4().hex[:12]}",
+            currency=currency,
+            as_of_date=as_of_date,
+            min_amount=min_amount,
+            status=PayoutRunStatus.PENDING,
+            partitions=partitions,
+            partitions_completed=0,
+            restaurants_scanned=0,
+            payouts_created=0,
+            failures=0,
+        )
+        await self.run_repo.create(run)
+        await self.chunk_repo.create_for_run(run.run_id, partitions)
+        return run
+
+    async def get_run(self, run_id: str) -> PayoutRunStatusResponse:
+        """
+        Get the progress of a payout run.
+
+        Args:
+            run_id: Unique run identifier
+
+        Returns:
+            PayoutRunStatusResponse with counters and timings
+
+        Raises:
+            PayoutRunNotFoundError: If run not found
+        """
+        run = await self.run_repo.get_by_run_id(run_id)
+        if run is None:
+            raise PayoutRunNotFoundError(run_id)
+
+        elapsed = None
+        if run.started_at is not None:
+            end = run.finished_at or _utcnow()
+            if run.started_at.tzinfo is None:
+                # SQLite returns naive UTC timestamps
+                end = end.replace(tzinfo=None)
+            elapsed = (end - run.started_at).total_seconds()
+
+        return PayoutRunStatusResponse(
+            run_id=run.run_id,
+            currency=run.currency,
+            as_of=run.as_of_date,
+            min_amount=run.min_amount,
+            status=run.status,
+            partitions=run.partitions,
+            partitions_completed=run.partitions_completed,
+            restaurants_scanned=run.restaurants_scanned,
+            payouts_created=run.payouts_created,
+            failures=run.failures,
+            error=run.error,
+            created_at=run.created_at,
+            started_at=run.started_at,
+            finished_at=run.finished_at,
+            elapsed_seconds=elapsed,
+        )
+
+
+class ClaimedChunk(NamedTuple):
+    """A chunk claimed by this worker, with the parameters of its run."""
+
+    chunk_id: uuid.UUID
+    run_id: str
+    partition: int
+    partitions: int
+    attempts: int
+    currency: str
+    as_of_date: date
+    min_amount: int
+
+
+class PayoutRunWorker:
+    """
+    Executes payout runs from the payout_run_chunks work queue.
+
+    Every app instance runs a worker. Chunks (one restaurant hash partition
+    of a run each) are claimed with SELECT ... FOR UPDATE SKIP LOCKED under a
+    lease, so instances share a run without coordination; a crashed worker's
+    chunks are claimed again once their lease expires. While a chunk is
+    processed its lease is renewed every third of PAYOUT_RUN_LEASE_SECONDS,
+    so a slow chunk is not reclaimed by another worker. Each chunk commits its
+    payouts together with its completion and the run's progress counters,
+    in sessions owned by the worker (never the request's session). The
+    uq_payout_restaurant_currency_date constraint keeps a reclaimed chunk
+    from creating a second payout.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.PAYOUT_RUN_CONCURRENCY,
+        retries: int = settings.PAYOUT_RUN_PARTITION_RETRIES,
+        lease_seconds: int = settings.PAYOUT_RUN_LEASE_SECONDS,
+        poll_seconds: float = settings.PAYOUT_RUN_POLL_SECONDS,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """Wake the worker loop, e.g. after a run was enqueued."""
+        self._wakeup.set()
+
+    async def run_pending(self) -> int:
+        """
+        Claim and process chunks until none are left to claim.
+
+        Returns:
+            Number of chunks processed
+        """
+        processed = 0
+        while True:
+            chunks = await self._claim()
+            if not chunks:
+                return processed
+            await asyncio.gather(*(self._process(chunk) for chunk in chunks))
+            processed += len(chunks)
+
+    async def _claim(self) -> List[ClaimedChunk]:
+        """Claim up to `concurrency` chunks in a short transaction of its own."""
+        now = _utcnow()
+        async with self.session_factory() as session:
+            chunk_repo = PayoutRunChunkRepository(session)
+            run_repo = PayoutRunRepository(session)
+
+            chunks = await chunk_repo.claim(
+                self.worker_id, self.concurrency, self.lease_seconds, now
+            )
+            runs = await run_repo.get_many_by_run_ids(list({c.run_id for c in chunks}))
+            await run_repo.mark_started(list(runs), now)
+
+            claimed = []
+            for chunk in chunks:
+                if chunk.attempts > self.retries + 1:
+                    # Lease expired on its last attempt (e.g. worker crashed)
+                    await self._give_up(session, chunk.id, chunk.run_id, "lease expired", True)
+                    continue
+                run = runs[chunk.run_id]
+                claimed.append(
+                    ClaimedChunk(
+                        chunk_id=chunk.id,
+                        run_id=chunk.run_id,
+                        partition=chunk.partition,
+                        partitions=run.partitions,
+                        attempts=chunk.attempts,
+                        currency=run.currency,
+                        as_of_date=run.as_of_date,
+                        min_amount=run.min_amount,
+                    )
+                )
+            await session.commit()
+        return claimed
+
+    async def _process(self, chunk: ClaimedChunk) -> None:
+        """Process one chunk, renewing its lease in the background meanwhile."""
+        heartbeat = asyncio.create_task(self._keep_lease(chunk))
+        try:
+            await self._generate(chunk)
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+
+    async def _keep_lease(self, chunk: ClaimedChunk) -> None:
+        """Renew a chunk's lease until cancelled or the lease is lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as session:
+                    held = await PayoutRunChunkRepository(session).renew(
+                        chunk.chunk_id, self.worker_id, self.lease_seconds, _utcnow()
+                    )
+                    await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Try again at the next interval; the lease is still valid
+                logger.warning(
+                    "Payout run chunk lease renewal failed",
+                    extra={
+                        "run_id": chunk.run_id,
+                        "partition": chunk.partition,
+                        "error": str(e),
+                    },
+                )
+                continue
+            if not held:
+                return
+
+    async def _generate(self, chunk: ClaimedChunk) -> None:
+        """Generate the payouts of one chunk, or give it back on failure."""
+        try:
+            async with self.session_factory() as session:
+                result = await PayoutGeneratorService(session).generate(
+                    chunk.currency,
+                    chunk.as_of_date,
+                    chunk.min_amount,
+                    partition=(chunk.partition, chunk.partitions),
+                )
+                held = await PayoutRunChunkRepository(session).complete(
+                    chunk.chunk_id,
+                    self.worker_id,
+                    result.restaurants_scanned,
+                    result.payouts_created,
+                    _utcnow(),
+                )
+                if not held:
+                    # Another worker reclaimed the chunk after our lease expired
+                    await session.rollback()
+                    logger.warning(
+                        "Payout run chunk lease lost",
+                        extra={"run_id": chunk.run_id, "partition": chunk.partition},
+                    )
+                    return
+                await PayoutRunRepository(session).add_progress(
+                    chunk.run_id,
+                    restaurants_scanned=result.restaurants_scanned,
+                    payouts_created=result.payouts_created,
+                    partitions_completed=1,
+                )
+                await self._finish_run_if_done(session, chunk.run_id)
+                await session.commit()
+        except Exception as e:
+            logger.error(
+                "Payout run partition failed",
+                extra={
+                    "run_id": chunk.run_id,
+                    "partition": chunk.partition,
+                    "attempt": chunk.attempts,
+                    "error": str(e),
+                },
+            )
+            async with self.session_factory() as session:
+                await self._give_up(
+                    session,
+                    chunk.chunk_id,
+                    chunk.run_id,
+                    f"partition {chunk.partition}: {e}",
+                    final=chunk.attempts > self.retries,
+                )
+                await session.commit()
+
+    async def _give_up(
+        self, session: AsyncSession, chunk_id, run_id: str, error: str, final: bool
+    ) -> None:
+        """Return a chunk to the queue (or fail it) and count the failure."""
+        held = await PayoutRunChunkRepository(session).release(
+            chunk_id, self.worker_id, error, final, _utcnow()
+        )
+        if not held:
+            return
+        await PayoutRunRepository(session).add_progress(run_id, failures=1, error=error)
+        if final:
+            await self._finish_run_if_done(session, run_id)
+
+    @staticmethod
+    async def _finish_run_if_done(session: AsyncSession, run_id: str) -> None:
+        """
+        Finish the run once none of its chunks are pending or running.
+
+        Callers update the run row first (add_progress), which locks it, so
+        workers finishing the last chunks of a run check one at a time.
+        """
+        counts = await PayoutRunChunkRepository(session).count_by_status(run_id)
+        if counts.get(PayoutRunStatus.PENDING) or counts.get(PayoutRunStatus.RUNNING):
+            return
+        status = (
+            PayoutRunStatus.FAILED
+            if counts.get(PayoutRunStatus.FAILED)
+            else PayoutRunStatus.COMPLETED
+        )
+        await PayoutRunRepository(session).finish(run_id, status, _utcnow())
+        logger.info("Payout run finished", extra={"run_id": run_id, "status": status.value})
+
+    async def _run_forever(self) -> None:
+        """Process chunks, then wait for a notification or the next poll."""
+        while True:
+            try:
+                await self.run_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Payout run worker failed", extra={"error": str(e)})
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the background loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Cancel the background loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Shared by the API and the application lifespan
+payout_run_worker = PayoutRunWorker()
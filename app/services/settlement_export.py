@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.repositories.payout import PayoutRepository
+from app.schemas.payout import SettlementFormat
+from app.services.payout_generator import PAYOUT_ITEM_TYPES
+
+logger = get_logger(__name__)
+
+PAYOUT_COLUMNS = [
+    "payout_id",
+    "restaurant_id",
+    "currency",
+    "as_of",
+    "amount",
+    "status",
+    "created_at",
+    "paid_at",
+]
+
+# One CSV column per payout item type
+ITEM_COLUMNS = list(PAYOUT_ITEM_TYPES.values())
+
+MEDIA_TYPES = {
+    SettlementFormat.CSV: "text/csv",
+    SettlementFormat.NDJSON: "application/x-ndjson",
+}
+
+
+class SettlementExportService:
+    """
+    Streams the settlement file of a payout date.
+
+    Payouts and their items are read through a server-side cursor and
+    written out in chunks of about SETTLEMENT_EXPORT_CHUNK_BYTES, so memory
+    stays flat regardless of the number of payouts. The export runs in a
+    session of its own, since it outlives the request's session.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        fetch_size: int = settings.SETTLEMENT_EXPORT_FETCH_SIZE,
+        chunk_bytes: int = settings.SETTLEMENT_EXPORT_CHUNK_BYTES,
+    ):
+        self.session_factory = session_factory
+        self.fetch_size = fetch_size
+        self.chunk_bytes = chunk_bytes
+
+    @staticmethod
+    def filename(
+        currency: str, as_of_date: date, fmt: SettlementFormat, compress: bool
+    ) -> str:
+        """Download filename of a settlement file."""
+        name = f"settlement_{currency}_{as_of_date.isoformat()}.{fmt.value}"
+        return f"{name}.gz" if compress else name
+
+    async def stream(
+        self,
+        currency: str,
+        as_of_date: date,
+        fmt: SettlementFormat,
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the settlement file of a payout date.
+
+        Args:
+            currency: Currency code
+            as_of_date: Payout date
+            fmt: CSV (one row per payout, one column per item type) or
+                NDJSON (one object per payout with its items)
+            compress: Gzip the stream
+
+        Yields:
+            Chunks of the (optionally gzipped) file
+        """
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+        buffer = io.StringIO()
+        writer = self._writer(buffer, fmt)
+        payouts = 0
+
+        def drain() -> bytes:
+            data = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(data) if compressor else data
+
+        async with self.session_factory() as session:
+            records = PayoutRepository(session).stream_settlement_rows(
+                currency, as_of_date, self.fetch_size
+            )
+            async for payout in self._group_items(records):
+                writer(payout)
+                payouts += 1
+                if buffer.tell() >= self.chunk_bytes:
+                    chunk = drain()
+                    if chunk:
+                        yield chunk
+
+        chunk = drain()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+
+        logger.info(
+            "Settlement exported",
+            extra={
+                "currency": currency,
+                "as_of": as_of_date.isoformat(),
+                "format": fmt.value,
+                "payouts": payouts,
+            },
+        )
+
+    @staticmethod
+    async def _group_items(rows: AsyncIterator[Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Fold consecutive (payout, item) rows into one record per payout."""
+        current: Optional[Dict[str, Any]] = None
+        async for row in rows:
+            if current is None or current["payout_id"] != row.payout_id:
+                if current is not None:
+                    yield current
+                current = {
+                    "payout_id": row.payout_id,
+                    "restaurant_id": row.restaurant_id,
+                    "currency": row.currency,
+                    "as_of": row.as_of_date.isoformat(),
+                    "amount": row.amount,
+                    "status": row.status.value,
+                    "created_at": row.created_at.isoformat(),
+                    "paid_at": row.paid_at.isoformat() if row.paid_at else None,
+                    "items": [],
+                }
+            if row.item_type is not None:
+                current["items"].append({"type": row.item_type, "amount": row.item_amount})
+        if current is not None:
+            yield current
+
+    @staticmethod
+    def _writer(buffer: io.StringIO, fmt: SettlementFormat):
+        """Return a function writing one payout record to the buffer."""
+        if fmt == SettlementFormat.NDJSON:
+
+            def write_json(payout: Dict[str, Any]) -> None:
+                buffer.write(json.dumps(payout, separators=(",", ":")))
+                buffer.write("\n")
+
+            return write_json
+
+        csv_writer = csv.writer(buffer)
+        csv_writer.writerow(PAYOUT_COLUMNS + ITEM_COLUMNS)
+
+        def write_csv(payout: Dict[str, Any]) -> None:
+            totals = {item["type"]: item["amount"] for item in payout["items"]}
+            csv_writer.writerow(
+                [payout[column] for column in PAYOUT_COLUMNS]
+                + [totals.get(column, 0) for column in ITEM_COLUMNS]
+            )
+
+        return write_csv
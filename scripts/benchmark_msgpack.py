@@ -0,0 +1,137 @@
+"""
+MessagePack vs JSON benchmark for Mesa 24/7 Backend Challenge.
+
+Times what the processor endpoints do with a body before any database work:
+decoding and validating the request, and encoding the response. The JSON
+path is json.loads plus Pydantic validation (as FastAPI does); the
+MessagePack path decodes straight into msgspec structs, then builds the
+request model the services take without validating it again ("struct
+only" leaves that last step out).
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_msgpack.py
+    PYTHONPATH=. python scripts/benchmark_msgpack.py --batch-size 1000 --repeat 5
+"""
+import argparse
+import json
+import timeit
+from typing import Callable, List, Tuple
+
+import msgspec
+
+from app.api.msgpack import decode_event
+from app.schemas.processor import (
+    ProcessorEventBatchItem,
+    ProcessorEventBatchRequest,
+    ProcessorEventBatchResponse,
+    ProcessorEventBatchStruct,
+    ProcessorEventRequest,
+    ProcessorEventStruct,
+)
+
+
+def make_event(n: int) -> dict:
+    """A charge event shaped like the ones in events/events.jsonl."""
+    return {
+        "event_id": f"evt_{n:06d}",
+        "event_type": "charge_succeeded",
+        "occurred_at": "2025-12-20T15:10:00Z",
+        "restaurant_id": f"res_{n % 50:03d}",
+        "currency": "PEN",
+        "amount": 12000 + n,
+        "fee": 600,
+        "metadata": {"reservation_id": f"rsv_{n}", "payment_id": f"pay_{n}"},
+    }
+
+
+def json_batch(body: bytes) -> List[ProcessorEventRequest]:
+    batch = ProcessorEventBatchRequest.model_validate(json.loads(body))
+    return [ProcessorEventRequest.model_validate(event) for event in batch.events]
+
+
+BATCH_DECODER = msgspec.msgpack.Decoder(ProcessorEventBatchStruct)
+
+
+def msgpack_batch(body: bytes) -> List[ProcessorEventRequest]:
+    batch = BATCH_DECODER.decode(body)
+    return [decode_event(event) for event in batch.events]
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Best time of one call, in microseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main(batch_size: int, repeat: int) -> None:
+    event = make_event(1)
+    events = [make_event(n) for n in range(batch_size)]
+    batch_response = ProcessorEventBatchResponse(
+        created=batch_size,
+        duplicates=0,
+        rejected=0,
+        results=[
+            ProcessorEventBatchItem(
+                event_id=e["event_id"], status="created", message="Event processed successfully"
+            )
+            for e in events
+        ],
+    )
+
+    single_json, single_msgpack = json.dumps(event).encode(), msgspec.msgpack.encode(event)
+    struct_decoder = msgspec.msgpack.Decoder(ProcessorEventStruct)
+    batch_json = json.dumps({"events": events}).encode()
+    batch_msgpack = msgspec.msgpack.encode({"events": events})
+
+    cases: List[Tuple[str, int, int, Callable[[], object], Callable[[], object]]] = [
+        (
+            "decode single event",
+            len(single_json),
+            len(single_msgpack),
+            lambda: ProcessorEventRequest.model_validate(json.loads(single_json)),
+            lambda: decode_event(single_msgpack),
+        ),
+        (
+            "decode single event (struct only)",
+            len(single_json),
+            len(single_msgpack),
+            lambda: ProcessorEventRequest.model_validate(json.loads(single_json)),
+            lambda: struct_decoder.decode(single_msgpack),
+        ),
+        (
+            f"decode batch of {batch_size}",
+            len(batch_json),
+            len(batch_msgpack),
+            lambda: json_batch(batch_json),
+            lambda: msgpack_batch(batch_msgpack),
+        ),
+        (
+            f"encode batch response of {batch_size}",
+            len(batch_response.model_dump_json()),
+            len(msgspec.msgpack.encode(batch_response.model_dump())),
+            lambda: json.dumps(batch_response.model_dump()).encode(),
+            lambda: msgspec.msgpack.encode(batch_response.model_dump()),
+        ),
+    ]
+
+    print("=" * 80)
+    print("Mesa 24/7 MessagePack vs JSON Benchmark")
+    print("=" * 80)
+    print(f"{'case':34s} {'JSON us':>10s} {'msgpack us':>11s} {'speedup':>8s} {'bytes':>15s}")
+    print("-" * 80)
+    for name, json_bytes, msgpack_bytes, json_func, msgpack_func in cases:
+        json_us = measure(json_func, repeat)
+        msgpack_us = measure(msgpack_func, repeat)
+        print(
+            f"{name:34s} {json_us:10.1f} {msgpack_us:11.1f} {json_us / msgpack_us:7.1f}x "
+            f"{json_bytes:7d}/{msgpack_bytes:<7d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.batch_size, args.repeat)
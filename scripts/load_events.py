@@ -2,9 +2,14 @@
 Event loader script for Mesa 24/7 Backend Challenge.
 
 Loads events from events.jsonl file and sends them to the API.
+
+Usage:
+    python scripts/load_events.py           # one request per event
+    python scripts/load_events.py --stream  # whole file over POST /v1/processor/events:stream
 """
 import asyncio
 import json
+import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -48,6 +53,29 @@ async def send_event(client: httpx.AsyncClient, event: Dict[str, Any]) -> Dict[s
         }
 
 
+async def stream_events(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+    """Send the events file as one NDJSON stream and read back per-line results."""
+
+    async def body():
+        with open(EVENTS_FILE, "rb") as f:
+            while chunk := f.read(65536):
+                yield chunk
+
+    results = []
+    async with client.stream(
+        "POST",
+        f"{API_BASE_URL}/v1/processor/events:stream",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=None,
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line:
+                results.append(json.loads(line))
+    return results
+
+
 async def main():
     """Main function to load and send all events."""
     print("=" * 80)
@@ -76,6 +104,20 @@ async def main():
             print("Make sure the API is running: uvicorn app.main:app --reload")
             return
 
+        if "--stream" in sys.argv:
+            print("\nStreaming events...")
+            results = await stream_events(client)
+            print("\n" + "=" * 80)
+            print("SUMMARY")
+            print("=" * 80)
+            for item_status in ("created", "duplicate", "rejected", "failed"):
+                count = sum(1 for r in results if r["status"] == item_status)
+                print(f"{item_status.capitalize() + ':':16s} {count}")
+            for r in results:
+                if r["status"] in ("rejected", "failed"):
+                    print(f"  - line {r['line']} ({r['event_id']}): {r['message']}")
+            return
+
         print("\nProcessing events...")
         results = []
         for i, event in enumerate(events, 1):
@@ -0,0 +1,64 @@
+"""
+Balance projection rebuild script for Mesa 24/7 Backend Challenge.
+
+Recomputes the restaurant_balances table from ledger_entries and checks it
+against the ledger.
+
+Usage:
+    python scripts/rebuild_balances.py            # Rebuild, then verify
+    python scripts/rebuild_balances.py --check    # Only verify, no writes
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.balance import RestaurantBalanceRepository
+
+
+async def main(check_only: bool) -> int:
+    """Rebuild (unless check_only) and verify the balance projection."""
+    print("=" * 80)
+    print("Mesa 24/7 Balance Projection Rebuild")
+    print("=" * 80)
+
+    async with AsyncSessionLocal() as session:
+        repo = RestaurantBalanceRepository(session)
+
+        if not check_only:
+            # Lock out concurrent ledger writers while the table is rebuilt
+            if session.bind.dialect.name == "postgresql":
+                await session.execute(
+                    text("LOCK TABLE ledger_entries IN SHARE MODE")
+                )
+            rows = await repo.rebuild()
+            print(f"\nRebuilt {rows} balance rows from ledger_entries")
+
+        mismatches = await repo.find_mismatches()
+
+        if mismatches:
+            await session.rollback()
+            print(f"\nFound {len(mismatches)} mismatching balances:")
+            for m in mismatches:
+                print(
+                    f"  - {m['restaurant_id']} {m['currency']}: "
+                    f"expected={m['expected']} stored={m['stored']}"
+                )
+            return 1
+
+        await session.commit()
+        print("\nBalance projection matches the ledger")
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild restaurant balances")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only compare the projection with the ledger",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check)))
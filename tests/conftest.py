@@ -2,6 +2,9 @@
 Pytest configuration and fixtures for Mesa 24/7 Backend Challenge tests.
 """
 import asyncio
+import sqlite3
+import uuid
+import zlib
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -12,7 +15,11 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.api.deps import get_db, get_session_factory
+from app.core.cache import clear_all_caches
+from app.core.database import Base
+from app.core.event_filter import event_id_filter
+from app.services.payout_runner import payout_run_worker
 
 
 # Test database URL (uses in-memory SQLite for speed)
@@ -36,6 +43,15 @@ def register_custom_functions(dbapi_conn, connection_record):
     # Register uuid4 function
     dbapi_conn.create_function("uuid4", 0, lambda: str(uuid.uuid4()))
 
+    # Stand-in for PostgreSQL's hashtext() (signed 32-bit hash)
+    dbapi_conn.create_function(
+        "hashtext", 1, lambda value: zlib.crc32(value.encode()) - (1 << 31)
+    )
+
+
+# UUID columns are rendered as String(36) in SQLite, so bind UUIDs as text
+sqlite3.register_adapter(uuid.UUID, str)
+
 
 # Create test session factory
 TestSessionLocal = async_sessionmaker(
@@ -47,6 +63,31 @@ TestSessionLocal = async_sessionmaker(
 )
 
 
+def charge_event(
+    event_id: str, restaurant_id: str, amount: int = 10000, currency: str = "PEN"
+) -> dict:
+    """Build a charge_succeeded processor event payload with a 500 fee."""
+    return {
+        "event_id": event_id,
+        "event_type": "charge_succeeded",
+        "occurred_at": "2025-12-30T10:00:00Z",
+        "restaurant_id": restaurant_id,
+        "currency": currency,
+        "amount": amount,
+        "fee": 500,
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator:
+    """Start every test with empty in-process caches."""
+    clear_all_caches()
+    event_id_filter.clear()
+    yield
+    clear_all_caches()
+    event_id_filter.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create an instance of the default event loop for the test session."""
@@ -102,11 +143,22 @@ async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
 
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        # Commit like app.api.deps.get_db so commit hooks (cache eviction) run
         yield test_db
+        await test_db.commit()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
+    # Background payout runs open their own sessions on the test database
+    # (one at a time: the in-memory database has a single shared connection)
+    session_factory = payout_run_worker.session_factory
+    concurrency = payout_run_worker.concurrency
+    payout_run_worker.session_factory = TestSessionLocal
+    payout_run_worker.concurrency = 1
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
 
+    payout_run_worker.session_factory = session_factory
+    payout_run_worker.concurrency = concurrency
     app.dependency_overrides.clear()
@@ -0,0 +1,457 @@
+"""
+Tests for payout generation and retrieval endpoints.
+"""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.cache import payout_cache
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.payout import Payout
+from app.services.payout_generator import PayoutGeneratorService
+from app.services.payout_runner import payout_run_worker
+
+
+async def _charge(client: AsyncClient, event_id: str, restaurant_id: str, amount: int) -> None:
+    await client.post(
+        "/v1/processor/events",
+        json={
+            "event_id": event_id,
+            "event_type": "charge_succeeded",
+            "occurred_at": "2025-12-30T10:00:00Z",
+            "restaurant_id": restaurant_id,
+            "currency": "PEN",
+            "amount": amount,
+            "fee": 500,
+        },
+    )
+
+
+async def _run_payouts(client: AsyncClient, run: dict) -> dict:
+    """Start a payout run, wait for the worker and return its progress."""
+    response = await client.post("/v1/payouts/run", json=run)
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+    await payout_run_worker.run_pending()
+
+    progress = await client.get(f"/v1/payouts/runs/{response.json()['run_id']}")
+    assert progress.status_code == 200
+    return progress.json()
+
+
+@pytest.mark.asyncio
+async def test_run_creates_payouts_for_eligible_restaurants(client: AsyncClient):
+    """Test that only restaurants above min_amount get a payout."""
+    await _charge(client, "evt_payout_001", "res_payout_001", 20000)
+    await _charge(client, "evt_payout_002", "res_payout_002", 1000)
+
+    run = await _run_payouts(
+        client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+    )
+
+    assert run["status"] == "completed"
+    assert run["restaurants_scanned"] == 1
+    assert run["payouts_created"] == 1
+    assert run["failures"] == 0
+    assert run["elapsed_seconds"] >= 0
+
+    # Funds are reserved for the payout
+    balance = await client.get("/v1/restaurants/res_payout_001/balance?currency=PEN")
+    assert balance.json()["available"] == 0
+    assert balance.json()["pending"] == 19500
+
+
+@pytest.mark.asyncio
+async def test_run_is_idempotent_per_date(client: AsyncClient):
+    """Test that a second run for the same date creates nothing."""
+    await _charge(client, "evt_payout_003", "res_payout_003", 20000)
+    run = {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+
+    first = await _run_payouts(client, run)
+    await _charge(client, "evt_payout_004", "res_payout_003", 20000)
+    second = await _run_payouts(client, run)
+
+    assert first["payouts_created"] == 1
+    assert second["payouts_created"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_retries_failed_partition(client: AsyncClient, monkeypatch):
+    """Test that a failed partition is retried on its own and counted."""
+    for i in range(3):
+        await _charge(client, f"evt_payout_part_{i}", f"res_payout_part_{i}", 20000)
+
+    generate = PayoutGeneratorService.generate
+    failed = []
+
+    async def flaky_generate(self, *args, **kwargs):
+        if not failed:
+            failed.append(kwargs["partition"])
+            raise RuntimeError("connection reset")
+        return await generate(self, *args, **kwargs)
+
+    monkeypatch.setattr(PayoutGeneratorService, "generate", flaky_generate)
+
+    run = await _run_payouts(
+        client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+    )
+
+    assert run["status"] == "completed"
+    assert run["payouts_created"] == 3
+    assert run["failures"] == 1
+    assert run["partitions_completed"] == run["partitions"]
+    assert "connection reset" in run["error"]
+
+
+@pytest.mark.asyncio
+async def test_run_creates_breakdown_items(client: AsyncClient, test_db):
+    """Test that payout items mirror the restaurant's ledger breakdown."""
+    await _charge(client, "evt_payout_items_001", "res_payout_items", 20000)
+    await client.post(
+        "/v1/processor/events",
+        json={
+            "event_id": "evt_payout_items_002",
+            "event_type": "refund_succeeded",
+            "occurred_at": "2025-12-30T11:00:00Z",
+            "restaurant_id": "res_payout_items",
+            "currency": "PEN",
+            "amount": 3000,
+            "fee": 0,
+        },
+    )
+    await _run_payouts(
+        client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+    )
+    payout_id = (await test_db.execute(select(Payout.payout_id))).scalar_one()
+
+    payout = (await client.get(f"/v1/payouts/{payout_id}")).json()
+
+    assert payout["amount"] == 16500
+    assert {item["type"]: item["amount"] for item in payout["items"]} == {
+        "gross_sales": 20000,
+        "fees": -500,
+        "refunds": -3000,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_payout_not_found(client: AsyncClient):
+    """Test retrieving an unknown payout."""
+    response = await client.get("/v1/payouts/po_missing")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "PAYOUT_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_get_payout_run_not_found(client: AsyncClient):
+    """Test retrieving an unknown payout run."""
+    response = await client.get("/v1/payouts/runs/run_missing")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "PAYOUT_RUN_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_get_payout_etag_changes_when_paid(client: AsyncClient, test_db):
+    """Test 304 for an unchanged payout and a new ETag once it is paid."""
+    await _charge(client, "evt_payout_etag_001", "res_payout_etag", 20000)
+    await _run_payouts(
+        client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+    )
+    payout_id = (await test_db.execute(select(Payout.payout_id))).scalar_one()
+
+    first = await client.get(f"/v1/payouts/{payout_id}")
+    etag = first.headers["etag"]
+    unchanged = await client.get(f"/v1/payouts/{payout_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    await client.post(
+        "/v1/processor/events",
+        json={
+            "event_id": "evt_payout_etag_paid",
+            "event_type": "payout_paid",
+            "occurred_at": "2026-01-01T10:00:00Z",
+            "restaurant_id": "res_payout_etag",
+            "currency": "PEN",
+            "amount": 19500,
+            "fee": 0,
+            "metadata": {"payout_id": payout_id},
+        },
+    )
+
+    paid = await client.get(f"/v1/payouts/{payout_id}", headers={"If-None-Match": etag})
+    assert paid.status_code == 200
+    assert paid.json()["status"] == "paid"
+    assert paid.headers["etag"] != etag
+
+
+def _payout_paid(event_id: str, restaurant_id: str, payout_id: str) -> dict:
+    return {
+        "event_id": event_id,
+        "event_type": "payout_paid",
+        "occurred_at": "2026-01-01T10:00:00Z",
+        "restaurant_id": restaurant_id,
+        "currency": "PEN",
+        "amount": 19500,
+        "fee": 0,
+        "metadata": {"payout_id": payout_id},
+    }
+
+
+@pytest.mark.asyncio
+async def test_payout_paid_releases_a_payout_once(client: AsyncClient, test_db):
+    """Test that repeated payout_paid events for one payout release it once."""
+    await _charge(client, "evt_paid_once_001", "res_paid_once", 20000)
+    await _run_payouts(client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000})
+    payout_id = (await test_db.execute(select(Payout.payout_id))).scalar_one()
+
+    batch = await client.post(
+        "/v1/processor/events:batch",
+        json={
+            "events": [
+                _payout_paid("evt_paid_once_a", "res_paid_once", payout_id),
+                _payout_paid("evt_paid_once_b", "res_paid_once", payout_id),
+            ]
+        },
+    )
+    assert batch.status_code == 200
+    single = await client.post(
+        "/v1/processor/events", json=_payout_paid("evt_paid_once_c", "res_paid_once", payout_id)
+    )
+    assert single.status_code == 201
+
+    releases = await test_db.execute(
+        select(LedgerEntry).where(LedgerEntry.entry_type == LedgerEntryType.PAYOUT_RELEASE)
+    )
+    assert len(releases.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_payout_paid_after_settlement_does_not_release_again(
+    client: AsyncClient, test_db
+):
+    """Test that a payout_paid event racing a settlement import releases the payout once."""
+    await _charge(client, "evt_paid_race_001", "res_paid_race", 20000)
+    await _run_payouts(client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000})
+    # Loaded before the settlement: the session keeps this stale CREATED copy
+    payout = (await test_db.execute(select(Payout))).scalar_one()
+
+    settled = await client.post(
+        "/v1/payouts/settlements:import", json={"payout_ids": [payout.payout_id]}
+    )
+    assert settled.json()["paid"] == 1
+    paid = await client.post(
+        "/v1/processor/events",
+        json=_payout_paid("evt_paid_race_a", "res_paid_race", payout.payout_id),
+    )
+    assert paid.status_code == 201
+
+    releases = await test_db.execute(
+        select(LedgerEntry).where(LedgerEntry.entry_type == LedgerEntryType.PAYOUT_RELEASE)
+    )
+    assert len(releases.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_payouts_pages_with_cursor(client: AsyncClient):
+    """Test filtered payout listing with keyset pagination."""
+    for n in range(3):
+        await _charge(client, f"evt_list_00{n}", f"res_list_00{n}", 10000)
+    await _run_payouts(client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000})
+
+    first = await client.get("/v1/payouts?currency=PEN&limit=2")
+    assert first.status_code == 200
+    assert len(first.json()["payouts"]) == 2
+    assert first.json()["next_cursor"] is not None
+
+    second = await client.get(
+        "/v1/payouts", params={"currency": "PEN", "limit": 2, "cursor": first.json()["next_cursor"]}
+    )
+    assert len(second.json()["payouts"]) == 1
+    assert second.json()["next_cursor"] is None
+
+    listed = [p["payout_id"] for p in first.json()["payouts"] + second.json()["payouts"]]
+    assert len(set(listed)) == 3
+    assert {i["type"] for i in second.json()["payouts"][0]["items"]} == {"gross_sales", "fees"}
+
+    filtered = await client.get(
+        "/v1/payouts?restaurant_id=res_list_001&status=created&as_of_from=2025-12-31"
+    )
+    assert [p["restaurant_id"] for p in filtered.json()["payouts"]] == ["res_list_001"]
+    assert filtered.json()["payouts"][0]["as_of"] == "2025-12-31"
+
+    empty = await client.get("/v1/payouts?as_of_to=2025-12-30")
+    assert empty.json() == {"payouts": [], "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_list_payouts_rejects_invalid_cursor(client: AsyncClient):
+    """Test that a malformed cursor is a 400."""
+    response = await client.get("/v1/payouts?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+    # Well-formed JSON with values that are not strings: [1, 2]
+    response = await client.get("/v1/payouts?cursor=WzEsIDJd")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.mark.asyncio
+async def test_export_settlement_csv_and_ndjson(client: AsyncClient):
+    """Test streaming the settlement file of a date in both formats, gzipped or not."""
+    await _charge(client, "evt_export_001", "res_export_001", 20000)
+    await _charge(client, "evt_export_002", "res_export_002", 10000)
+    await _run_payouts(client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000})
+
+    response = await client.get("/v1/payouts/export?currency=PEN&as_of=2025-12-31")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(
+        (r["restaurant_id"], r["amount"], r["gross_sales"], r["fees"], r["refunds"])
+        for r in rows
+    ) == [
+        ("res_export_001", "19500", "20000", "-500", "0"),
+        ("res_export_002", "9500", "10000", "-500", "0"),
+    ]
+
+    response = await client.get(
+        "/v1/payouts/export?currency=PEN&as_of=2025-12-31&format=ndjson&compress=true"
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'settlement_PEN_2025-12-31.ndjson.gz' in response.headers["content-disposition"]
+    payouts = [json.loads(line) for line in gzip.decompress(response.content).splitlines()]
+    assert sorted(p["amount"] for p in payouts) == [9500, 19500]
+    assert all(len(p["items"]) == 2 for p in payouts)
+
+    empty = await client.get("/v1/payouts/export?currency=USD&as_of=2025-12-31")
+    assert empty.text.splitlines() == [
+        "payout_id,restaurant_id,currency,as_of,amount,status,created_at,paid_at,"
+        "gross_sales,fees,refunds"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_settlement_marks_payouts_paid(client: AsyncClient, test_db):
+    """Test bulk settlement: paid, already paid and unknown payout ids."""
+    await _charge(client, "evt_settle_001", "res_settle_001", 20000)
+    await _charge(client, "evt_settle_002", "res_settle_002", 10000)
+    await _run_payouts(client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000})
+    payout_ids = (
+        await test_db.execute(select(Payout.payout_id).order_by(Payout.restaurant_id))
+    ).scalars().all()
+
+    first = await client.post(
+        "/v1/payouts/settlements:import", json={"payout_ids": [payout_ids[0]]}
+    )
+    assert first.status_code == 200
+    assert first.json() == {"paid": 1, "already_paid": [], "not_payable": [], "unknown": []}
+
+    second = await client.post(
+        "/v1/payouts/settlements:import",
+        json={"payout_ids": [payout_ids[0], payout_ids[1], payout_ids[1], "po_missing"]},
+    )
+    assert second.json() == {
+        "paid": 1,
+        "already_paid": [payout_ids[0]],
+        "not_payable": [],
+        "unknown": ["po_missing"],
+    }
+
+    payout = await client.get(f"/v1/payouts/{payout_ids[1]}")
+    assert payout.json()["status"] == "paid"
+    assert payout.json()["paid_at"] is not None
+
+    # The reserve is no longer pending once the payout is paid
+    balance = await client.get("/v1/restaurants/res_settle_002/balance?currency=PEN")
+    assert balance.json()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_payout_served_from_cache_until_paid(client: AsyncClient, test_db):
+    """Test that payout details are cached and evicted when the payout is paid."""
+    await _charge(client, "evt_payout_cache_001", "res_payout_cache", 20000)
+    await _run_payouts(
+        client, {"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000}
+    )
+    payout_id = (await test_db.execute(select(Payout.payout_id))).scalar_one()
+
+    first = await client.get(f"/v1/payouts/{payout_id}")
+    hits = payout_cache.hits
+    second = await client.get(f"/v1/payouts/{payout_id}")
+    assert payout_cache.hits == hits + 1
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+
+    await client.post(
+        "/v1/payouts/settlements:import", json={"payout_ids": [payout_id]}
+    )
+    paid = await client.get(f"/v1/payouts/{payout_id}")
+    assert paid.json()["status"] == "paid"
+    assert paid.json()["items"] == first.json()["items"]
+
+    # Paid payouts never change: cached without expiry
+    assert payout_cache.get(payout_id).version.startswith("paid:")
+
+
+@pytest.mark.asyncio
+async def test_preview_pages_without_creating_payouts(client: AsyncClient, test_db):
+    """Test that the preview reports eligible payouts page by page and writes nothing."""
+    for n in range(3):
+        await _charge(client, f"evt_preview_00{n}", f"res_preview_00{n}", 10000 * (n + 1))
+    await _charge(client, "evt_preview_small", "res_preview_small", 1000)
+
+    first = await client.get(
+        "/v1/payouts/preview?currency=pen&as_of=2025-12-31&min_amount=5000&limit=2"
+    )
+    assert first.status_code == 200
+    body = first.json()
+    assert body["eligible_restaurants"] == 3
+    assert body["total_amount"] == 9500 + 19500 + 29500
+    assert [r["restaurant_id"] for r in body["restaurants"]] == [
+        "res_preview_000",
+        "res_preview_001",
+    ]
+    assert body["restaurants"][0] == {
+        "restaurant_id": "res_preview_000",
+        "amount": 9500,
+        "items": [{"type": "gross_sales", "amount": 10000}, {"type": "fees", "amount": -500}],
+    }
+
+    second = await client.get(
+        "/v1/payouts/preview",
+        params={
+            "currency": "PEN",
+            "as_of": "2025-12-31",
+            "min_amount": 5000,
+            "limit": 2,
+            "cursor": body["next_cursor"],
+        },
+    )
+    assert [r["restaurant_id"] for r in second.json()["restaurants"]] == ["res_preview_002"]
+    assert second.json()["next_cursor"] is None
+
+    assert (await test_db.execute(select(Payout))).first() is None
+
+
+@pytest.mark.asyncio
+async def test_preview_rejects_invalid_cursor(client: AsyncClient):
+    """Test that a cursor whose value is not a restaurant_id string is a 400."""
+    # Well-formed JSON with a value that is not a string: [1]
+    response = await client.get(
+        "/v1/payouts/preview?currency=PEN&as_of=2025-12-31&min_amount=5000&cursor=WzFd"
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
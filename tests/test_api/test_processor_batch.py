@@ -0,0 +1,84 @@
+"""
+Tests for batch processor event ingestion endpoint.
+"""
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import charge_event
+
+RESTAURANT_ID = "res_batch_001"
+
+
+@pytest.mark.asyncio
+async def test_batch_creates_events_and_ledger_entries(client: AsyncClient):
+    """Test that a batch creates every event and updates balances."""
+    events = [
+        charge_event("evt_batch_001", RESTAURANT_ID),
+        charge_event("evt_batch_002", RESTAURANT_ID),
+        {
+            "event_id": "evt_batch_003",
+            "event_type": "refund_succeeded",
+            "occurred_at": "2025-12-30T11:00:00Z",
+            "restaurant_id": "res_batch_001",
+            "currency": "PEN",
+            "amount": 2000,
+            "fee": 0,
+        },
+    ]
+
+    response = await client.post("/v1/processor/events:batch", json={"events": events})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert [r["status"] for r in data["results"]] == ["created"] * 3
+
+    balance = await client.get("/v1/restaurants/res_batch_001/balance?currency=PEN")
+    # 2 * (10000 - 500) - 2000 = 17000
+    assert balance.json()["available"] == 17000
+
+
+@pytest.mark.asyncio
+async def test_batch_dedupes_within_batch_and_against_existing(client: AsyncClient):
+    """Test in-batch duplicates and previously processed events."""
+    existing = charge_event("evt_batch_existing", RESTAURANT_ID)
+    await client.post("/v1/processor/events", json=existing)
+
+    events = [
+        charge_event("evt_batch_new", RESTAURANT_ID),
+        charge_event("evt_batch_new", RESTAURANT_ID),
+        charge_event("evt_batch_existing", RESTAURANT_ID),
+    ]
+    response = await client.post("/v1/processor/events:batch", json={"events": events})
+
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "duplicate", "duplicate"]
+    assert data["created"] == 1
+    assert data["duplicates"] == 2
+
+    balance = await client.get("/v1/restaurants/res_batch_001/balance?currency=PEN")
+    assert balance.json()["available"] == 19000
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_items_only(client: AsyncClient):
+    """Test that an invalid item is rejected without failing the batch."""
+    invalid = charge_event("evt_batch_invalid", RESTAURANT_ID)
+    invalid["amount"] = -100
+
+    response = await client.post(
+        "/v1/processor/events:batch",
+        json={"events": [invalid, charge_event("evt_batch_valid", RESTAURANT_ID), 42]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["event_id"] == "evt_batch_invalid"
+    assert results[0]["status"] == "rejected"
+    assert "amount" in results[0]["message"]
+    assert results[1]["status"] == "created"
+    assert results[2] == {
+        "event_id": None,
+        "status": "rejected",
+        "message": "Event is not a JSON object",
+    }
@@ -0,0 +1,74 @@
+"""
+Tests for MessagePack request and response bodies on the processor endpoints.
+"""
+import msgspec
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import charge_event
+
+MSGPACK = "application/msgpack"
+RESTAURANT_ID = "res_msgpack_001"
+
+
+@pytest.mark.asyncio
+async def test_msgpack_event_with_msgpack_response(client: AsyncClient):
+    """Test a MessagePack body, answered in MessagePack when accepted."""
+    body = msgspec.msgpack.encode(charge_event("evt_msgpack_001", RESTAURANT_ID, currency="pen"))
+    headers = {"Content-Type": MSGPACK, "Accept": f"{MSGPACK}, application/json;q=0.5"}
+
+    first = await client.post("/v1/processor/events", content=body, headers=headers)
+    second = await client.post("/v1/processor/events", content=body, headers=headers)
+
+    assert first.status_code == 201
+    assert first.headers["content-type"] == MSGPACK
+    assert msgspec.msgpack.decode(first.content)["status"] == "processed"
+    assert second.status_code == 200
+    assert msgspec.msgpack.decode(second.content)["status"] == "already_processed"
+
+    # Same event as JSON; currency was normalized like the JSON path does
+    balance = await client.get("/v1/restaurants/res_msgpack_001/balance?currency=PEN")
+    assert balance.json()["available"] == 9500
+
+
+@pytest.mark.asyncio
+async def test_invalid_msgpack_event_is_rejected(client: AsyncClient):
+    """Test 422 for a MessagePack event failing validation, 415 for other types."""
+    invalid = await client.post(
+        "/v1/processor/events",
+        content=msgspec.msgpack.encode(
+            charge_event("evt_msgpack_bad", RESTAURANT_ID, amount=-1, currency="pen")
+        ),
+        headers={"Content-Type": MSGPACK},
+    )
+    unsupported = await client.post(
+        "/v1/processor/events", content=b"evt", headers={"Content-Type": "text/plain"}
+    )
+
+    assert invalid.status_code == 422
+    assert "$.amount" in invalid.json()["detail"][0]["msg"]
+    assert unsupported.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_msgpack_batch_rejects_items_individually(client: AsyncClient):
+    """Test that an invalid MessagePack item does not reject the batch."""
+    body = msgspec.msgpack.encode(
+        {
+            "events": [
+                charge_event("evt_msgpack_batch_001", RESTAURANT_ID, currency="pen"),
+                {**charge_event("evt_msgpack_batch_002", RESTAURANT_ID, currency="pen"), "fee": -5},
+                charge_event("evt_msgpack_batch_001", RESTAURANT_ID, currency="pen"),
+            ]
+        }
+    )
+
+    response = await client.post(
+        "/v1/processor/events:batch", content=body, headers={"Content-Type": MSGPACK}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "rejected", "duplicate"]
+    assert data["results"][1]["event_id"] == "evt_msgpack_batch_002"
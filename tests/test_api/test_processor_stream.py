@@ -0,0 +1,90 @@
+"""
+Tests for streaming NDJSON processor event ingestion.
+"""
+import json
+from typing import AsyncIterator, List
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.event_stream import EventStreamIngestionService
+from tests.conftest import TestSessionLocal, charge_event
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+RESTAURANT_ID = "res_stream_001"
+
+
+async def _chunks(body: bytes, size: int) -> AsyncIterator[bytes]:
+    """Split a body at arbitrary byte offsets, mid-line included."""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _ndjson(lines: List[object]) -> bytes:
+    return b"".join(
+        (line if isinstance(line, bytes) else json.dumps(line).encode()) + b"\n"
+        for line in lines
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_returns_one_result_per_line(client: AsyncClient):
+    """Test created, duplicate and rejected lines, in line order."""
+    body = _ndjson([
+        charge_event("evt_stream_001", RESTAURANT_ID),
+        b"",
+        charge_event("evt_stream_002", RESTAURANT_ID, 5000),
+        b"{not json",
+        {**charge_event("evt_stream_003", RESTAURANT_ID), "amount": -1},
+        charge_event("evt_stream_001", RESTAURANT_ID),
+    ])
+
+    response = await client.post(
+        "/v1/processor/events:stream", content=_chunks(body, 7), headers=NDJSON
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["line"], r["status"]) for r in results] == [
+        (1, "created"),
+        (3, "created"),
+        (4, "rejected"),
+        (5, "rejected"),
+        (6, "duplicate"),
+    ]
+    assert results[3]["event_id"] == "evt_stream_003"
+    assert results[3]["message"].startswith("amount")
+
+    balance = await client.get("/v1/restaurants/res_stream_001/balance?currency=PEN")
+    assert balance.json()["available"] == 14000
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_other_content_types(client: AsyncClient):
+    """Test that a non-NDJSON body is refused with 415."""
+    response = await client.post(
+        "/v1/processor/events:stream", json=charge_event("evt_stream_json", RESTAURANT_ID)
+    )
+
+    assert response.status_code == 415
+    assert response.json()["error"]["code"] == "UNSUPPORTED_MEDIA_TYPE"
+
+
+@pytest.mark.asyncio
+async def test_stream_is_applied_in_micro_batches(client: AsyncClient):
+    """Test that results are yielded per batch and oversized lines are dropped."""
+    service = EventStreamIngestionService(TestSessionLocal, batch_size=2, max_line_bytes=512)
+    body = _ndjson([
+        charge_event("evt_micro_001", RESTAURANT_ID),
+        {**charge_event("evt_micro_002", RESTAURANT_ID), "metadata": {"note": "x" * 1000}},
+        charge_event("evt_micro_003", RESTAURANT_ID),
+    ])
+
+    batches = [batch async for batch in service.ingest(_chunks(body, 64))]
+
+    assert len(batches) == 2
+    results = [json.loads(line) for batch in batches for line in batch.splitlines()]
+    assert [r["status"] for r in results] == ["created", "rejected", "created"]
+    assert results[1]["message"] == "Line exceeds 512 bytes"
+    assert (service.created, service.rejected) == (2, 1)
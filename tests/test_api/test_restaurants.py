@@ -4,6 +4,9 @@ Tests for restaurant balance endpoint.
 import pytest
 from httpx import AsyncClient
 
+from app.core.cache import balance_cache
+from app.services.payout_runner import payout_run_worker
+
 
 @pytest.mark.asyncio
 async def test_get_balance_after_charge(client: AsyncClient):
@@ -78,3 +81,169 @@ async def test_get_balance_restaurant_not_found(client: AsyncClient):
     data = response.json()
     assert "error" in data
     assert data["error"]["code"] == "RESTAURANT_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_get_balance_with_breakdown_and_pending(client: AsyncClient):
+    """Test breakdown and pending amount for a restaurant with a payout."""
+    restaurant_id = "res_balance_003"
+    await client.post(
+        "/v1/processor/events",
+        json={
+            "event_id": "evt_balance_breakdown",
+            "event_type": "charge_succeeded",
+            "occurred_at": "2025-12-30T10:00:00Z",
+            "restaurant_id": restaurant_id,
+            "currency": "PEN",
+            "amount": 20000,
+            "fee": 1000,
+        },
+    )
+    await client.post(
+        "/v1/payouts/run",
+        json={"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000},
+    )
+    await payout_run_worker.run_pending()
+
+    response = await client.get(
+        f"/v1/restaurants/{restaurant_id}/balance?currency=PEN&include_breakdown=true"
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["available"] == 0
+    assert data["pending"] == 19000
+    assert data["last_event_at"] is not None
+    assert data["breakdown"] == {"charge": 20000, "fee": -1000, "payout_reserve": -19000}
+
+
+@pytest.mark.asyncio
+async def test_pending_is_the_same_with_and_without_breakdown(client: AsyncClient):
+    """Test that both balance paths report the projection's reserved funds."""
+    restaurant_id = "res_balance_pending"
+    url = f"/v1/restaurants/{restaurant_id}/balance?currency=PEN"
+    await client.post(
+        "/v1/processor/events",
+        json={
+            "event_id": "evt_balance_pending",
+            "event_type": "charge_succeeded",
+            "occurred_at": "2025-12-30T10:00:00Z",
+            "restaurant_id": restaurant_id,
+            "currency": "PEN",
+            "amount": 20000,
+            "fee": 1000,
+        },
+    )
+    await client.post(
+        "/v1/payouts/run",
+        json={"currency": "PEN", "as_of": "2025-12-31", "min_amount": 5000},
+    )
+    await payout_run_worker.run_pending()
+
+    plain = await client.get(url)
+    with_breakdown = await client.get(f"{url}&include_breakdown=true")
+
+    assert plain.json()["pending"] == 19000
+    assert with_breakdown.json()["pending"] == plain.json()["pending"]
+
+
+@pytest.mark.asyncio
+async def test_query_balances_for_many_restaurants(client: AsyncClient):
+    """Test the multi-restaurant, multi-currency balance query."""
+    for event_id, restaurant_id, currency in [
+        ("evt_multi_001", "res_multi_001", "PEN"),
+        ("evt_multi_002", "res_multi_001", "USD"),
+        ("evt_multi_003", "res_multi_002", "PEN"),
+    ]:
+        await client.post(
+            "/v1/processor/events",
+            json={
+                "event_id": event_id,
+                "event_type": "charge_succeeded",
+                "occurred_at": "2025-12-30T10:00:00Z",
+                "restaurant_id": restaurant_id,
+                "currency": currency,
+                "amount": 10000,
+                "fee": 500,
+            },
+        )
+
+    response = await client.post(
+        "/v1/restaurants/balances:query",
+        json={"restaurant_ids": ["res_multi_001", "res_multi_002", "res_unknown"]},
+    )
+
+    assert response.status_code == 200
+    balances = response.json()["balances"]
+    assert [(b["restaurant_id"], b["currency"]) for b in balances] == [
+        ("res_multi_001", "PEN"),
+        ("res_multi_001", "USD"),
+        ("res_multi_002", "PEN"),
+    ]
+    assert all(b["available"] == 9500 for b in balances)
+
+    filtered = await client.post(
+        "/v1/restaurants/balances:query",
+        json={"restaurant_ids": ["res_multi_001"], "currencies": ["usd"]},
+    )
+    assert [b["currency"] for b in filtered.json()["balances"]] == ["USD"]
+
+
+@pytest.mark.asyncio
+async def test_balance_cache_invalidated_on_new_event(client: AsyncClient):
+    """Test that cached balances are evicted when new ledger rows commit."""
+    event = {
+        "event_id": "evt_cache_001",
+        "event_type": "charge_succeeded",
+        "occurred_at": "2025-12-30T10:00:00Z",
+        "restaurant_id": "res_cache_001",
+        "currency": "PEN",
+        "amount": 10000,
+        "fee": 500,
+    }
+    await client.post("/v1/processor/events", json=event)
+
+    url = "/v1/restaurants/res_cache_001/balance?currency=PEN"
+    hits_before = balance_cache.stats()["hits"]
+    assert (await client.get(url)).json()["available"] == 9500
+    assert (await client.get(url)).json()["available"] == 9500
+    assert balance_cache.stats()["hits"] == hits_before + 1
+
+    await client.post("/v1/processor/events", json={**event, "event_id": "evt_cache_002"})
+
+    assert (await client.get(url)).json()["available"] == 19000
+
+
+@pytest.mark.asyncio
+async def test_balance_etag_not_modified(client: AsyncClient):
+    """Test that an unchanged balance answers 304 to If-None-Match."""
+    event = {
+        "event_id": "evt_etag_001",
+        "event_type": "charge_succeeded",
+        "occurred_at": "2025-12-30T10:00:00Z",
+        "restaurant_id": "res_etag_001",
+        "currency": "PEN",
+        "amount": 10000,
+        "fee": 500,
+    }
+    await client.post("/v1/processor/events", json=event)
+
+    url = "/v1/restaurants/res_etag_001/balance?currency=PEN"
+    first = await client.get(url)
+    etag = first.headers["etag"]
+
+    unchanged = await client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+    assert unchanged.content == b""
+
+    # The breakdown is a different representation
+    breakdown = await client.get(f"{url}&include_breakdown=true", headers={"If-None-Match": etag})
+    assert breakdown.status_code == 200
+
+    await client.post("/v1/processor/events", json={**event, "event_id": "evt_etag_002"})
+
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["available"] == 19000
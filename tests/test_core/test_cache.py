@@ -0,0 +1,69 @@
+"""
+Tests for the in-process TTL/LRU cache.
+"""
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    """Test that the least recently used key is evicted when full."""
+    cache: TTLCache[int] = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """Test that expired entries are treated as misses."""
+    clock = FakeClock()
+    cache: TTLCache[int] = TTLCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_drops_values_read_before_an_invalidation():
+    """Test that a fill racing an invalidation does not cache the stale value."""
+    cache: TTLCache[int] = TTLCache(max_size=10, ttl_seconds=60)
+    generation = cache.generation()  # reader takes its token, then SELECTs
+    cache.invalidate("a")  # writer commits
+
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
+    assert cache.stats()["stale_sets"] == 1
+
+    # Other keys, and reads after the invalidation, are cached
+    cache.set("b", 2, generation=generation)
+    cache.set("a", 3, generation=cache.generation())
+    assert cache.get("b") == 2
+    assert cache.get("a") == 3
+
+
+def test_forgotten_invalidations_still_drop_older_fills():
+    """Test that invalidations beyond max_size are covered by the floor."""
+    cache: TTLCache[int] = TTLCache(max_size=1, ttl_seconds=60)
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.invalidate("b")  # "a" is no longer tracked per key
+
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
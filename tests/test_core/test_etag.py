@@ -0,0 +1,23 @@
+"""
+Tests for ETag helpers.
+"""
+from app.core.etag import etag_matches, make_etag
+
+
+def test_make_etag_is_stable_and_quoted():
+    """Test that the same version gives the same quoted ETag."""
+    etag = make_etag("balance", 3, False)
+
+    assert etag == make_etag("balance", 3, False)
+    assert etag != make_etag("balance", 4, False)
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches_lists_weak_tags_and_wildcard():
+    """Test If-None-Match parsing."""
+    etag = make_etag("payout", "paid:2026-01-01T00:00:00")
+
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
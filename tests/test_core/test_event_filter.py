@@ -0,0 +1,110 @@
+"""
+Tests for the in-memory event-id filter.
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.event_filter import (
+    BLOOM_MAX_SLICES,
+    EventIdFilter,
+    Membership,
+    ScalableBloomFilter,
+    event_id_filter,
+    remember_on_commit,
+)
+from app.repositories.event import ProcessorEventRepository
+from tests.conftest import charge_event
+
+RESTAURANT_ID = "res_filter_001"
+
+
+def test_scalable_bloom_filter_grows_without_false_negatives():
+    """Test that keys past the initial capacity land in new slices."""
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    keys = [f"evt_bloom_{n}" for n in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert bloom.stats()["slices"] > 1
+    false_positives = sum(f"evt_other_{n}" in bloom for n in range(10000))
+    assert false_positives < 200  # About 1% expected
+
+
+def test_scalable_bloom_filter_memory_stops_growing():
+    """Test that slices are rotated at a fixed size once the slice cap is reached."""
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    # Slices of 100, 200, 400 and 800 keys, then 800-key slices replace the smaller ones
+    for n in range(4000):
+        bloom.add(f"evt_bloom_{n}")
+    capped = bloom.stats()
+    for n in range(4000, 20000):
+        bloom.add(f"evt_bloom_{n}")
+
+    assert capped["slices"] == BLOOM_MAX_SLICES
+    assert bloom.stats()["slices"] == BLOOM_MAX_SLICES
+    assert bloom.stats()["bytes"] == capped["bytes"]
+    assert "evt_bloom_19999" in bloom
+
+
+def test_lru_hit_is_definite_and_evicted_ids_fall_back_to_bloom():
+    """Test that ids evicted from the LRU set are still probable hits."""
+    event_filter = EventIdFilter(lru_size=2, bloom_capacity=100, error_rate=0.001)
+    for event_id in ("evt_a", "evt_b", "evt_c"):
+        event_filter.add(event_id)
+
+    assert event_filter.check("evt_c") is Membership.SEEN
+    assert event_filter.check("evt_a") is Membership.MAYBE
+    assert event_filter.check("evt_unknown") is Membership.UNSEEN
+
+
+@pytest.mark.asyncio
+async def test_ids_are_remembered_only_after_commit(test_db: AsyncSession):
+    """Test that a rolled back transaction leaves the filter unchanged."""
+    repo = ProcessorEventRepository(test_db)
+    await repo.event_exists("evt_rolled_back")
+    remember_on_commit(test_db, ["evt_rolled_back"])
+    await test_db.rollback()
+    await repo.event_exists("evt_committed")
+    remember_on_commit(test_db, ["evt_committed"])
+    await test_db.commit()
+
+    assert event_id_filter.check("evt_rolled_back") is Membership.UNSEEN
+    assert event_id_filter.check("evt_committed") is Membership.SEEN
+
+
+@pytest.mark.asyncio
+async def test_duplicate_is_answered_without_the_database(client: AsyncClient, monkeypatch):
+    """Test that a retried delivery never reaches the idempotent insert."""
+    event = charge_event("evt_filter_001", RESTAURANT_ID)
+    first = await client.post("/v1/processor/events", json=event)
+    assert first.status_code == 201
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("database queried for a known duplicate")
+
+    monkeypatch.setattr(ProcessorEventRepository, "insert_if_absent", fail)
+    monkeypatch.setattr(ProcessorEventRepository, "event_exists", fail)
+
+    response = await client.post("/v1/processor/events", json=event)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "already_processed"
+    assert event_id_filter.stats()["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_warm_load_from_stored_events(client: AsyncClient, test_db: AsyncSession):
+    """Test that stored event_ids are loaded, most recent into the LRU set."""
+    for n in range(3):
+        event = charge_event(f"evt_warm_00{n}", RESTAURANT_ID)
+        await client.post("/v1/processor/events", json=event)
+
+    warm = EventIdFilter(lru_size=10, bloom_capacity=100, error_rate=0.001)
+    loaded = await warm.warm_load(
+        ProcessorEventRepository(test_db).stream_recent_event_ids(limit=10)
+    )
+
+    assert loaded == 3
+    assert all(warm.check(f"evt_warm_00{n}") is Membership.SEEN for n in range(3))
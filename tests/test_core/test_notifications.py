@@ -0,0 +1,63 @@
+"""
+Tests for cross-worker cache invalidation payloads.
+"""
+import json
+
+from app.core.cache import balance_cache
+from app.core.notifications import (
+    MAX_PAYLOAD_BYTES,
+    apply_invalidation_payload,
+    encode_invalidations,
+)
+
+
+def test_payload_round_trip_evicts_tuple_keys():
+    """Test that tuple keys survive JSON encoding and are evicted on receipt."""
+    balance_cache.set(("rest_001", "PEN"), "cached")
+    balance_cache.set(("rest_002", "PEN"), "cached")
+
+    payloads = encode_invalidations(
+        [("balance", ("rest_001", "PEN")), ("balance", ("rest_001", "PEN"))]
+    )
+
+    assert len(payloads) == 1
+    assert json.loads(payloads[0]) == {"cache": "balance", "keys": [["rest_001", "PEN"]]}
+    assert apply_invalidation_payload(payloads[0]) == 1
+    assert balance_cache.get(("rest_001", "PEN")) is None
+    assert balance_cache.get(("rest_002", "PEN")) == "cached"
+
+
+def test_large_invalidations_are_split():
+    """Test that payloads stay under the NOTIFY size limit."""
+    invalidations = [("balance", (f"restaurant_{i:06d}", "PEN")) for i in range(1000)]
+
+    payloads = encode_invalidations(invalidations)
+
+    assert len(payloads) > 1
+    assert all(len(p.encode()) <= MAX_PAYLOAD_BYTES for p in payloads)
+    assert sum(len(json.loads(p)["keys"]) for p in payloads) == 1000
+    # Chunks are filled up to the limit
+    assert all(len(p.encode()) > MAX_PAYLOAD_BYTES - 30 for p in payloads[:-1])
+
+
+def test_duplicate_keys_are_sent_once_in_order():
+    """Test that repeated invalidations of a key collapse into one."""
+    invalidations = [
+        ("balance", ("rest_002", "PEN")),
+        ("payout", "po_1"),
+        ("balance", ("rest_001", "PEN")),
+        ("balance", ("rest_002", "PEN")),
+    ]
+
+    payloads = [json.loads(p) for p in encode_invalidations(invalidations)]
+
+    assert payloads == [
+        {"cache": "balance", "keys": [["rest_002", "PEN"], ["rest_001", "PEN"]]},
+        {"cache": "payout", "keys": ["po_1"]},
+    ]
+
+
+def test_unknown_cache_is_ignored():
+    """Test that payloads for caches this worker does not have are ignored."""
+    payload = json.dumps({"cache": "missing", "keys": ["po_1"]})
+    assert apply_invalidation_payload(payload) == 0
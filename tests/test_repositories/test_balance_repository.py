@@ -0,0 +1,73 @@
+"""
+Tests for the materialized restaurant balance projection.
+"""
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.restaurant_balance import RestaurantBalance
+from app.repositories.balance import RestaurantBalanceRepository
+from app.repositories.ledger import LedgerRepository
+
+
+def _entry(entry_type: LedgerEntryType, amount: int) -> LedgerEntry:
+    return LedgerEntry(
+        restaurant_id="res_proj_001",
+        currency="PEN",
+        entry_type=entry_type,
+        amount=amount,
+        reference_type="test",
+        reference_id="ref_001",
+    )
+
+
+@pytest.mark.asyncio
+async def test_ledger_writes_update_projection(test_db: AsyncSession):
+    """Test that every ledger insert path keeps the projection in sync."""
+    ledger_repo = LedgerRepository(test_db)
+    balance_repo = RestaurantBalanceRepository(test_db)
+
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 10000))
+    await ledger_repo.create_many(
+        [_entry(LedgerEntryType.FEE, -500), _entry(LedgerEntryType.PAYOUT_RESERVE, -9500)]
+    )
+
+    balance = await balance_repo.get_for_restaurant("res_proj_001", "PEN")
+    assert balance.available == 0
+    assert balance.reserved == 9500
+    assert balance.entry_count == 3
+    assert balance.last_entry_at is not None
+    assert await balance_repo.find_mismatches() == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_repairs_drift(test_db: AsyncSession):
+    """Test that a drifted projection is detected and rebuilt from the ledger."""
+    ledger_repo = LedgerRepository(test_db)
+    balance_repo = RestaurantBalanceRepository(test_db)
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 10000))
+
+    await test_db.execute(update(RestaurantBalance).values(available=1))
+    mismatches = await balance_repo.find_mismatches()
+    assert len(mismatches) == 1
+    assert mismatches[0]["expected"]["available"] == 10000
+
+    assert await balance_repo.rebuild() == 1
+    assert await balance_repo.find_mismatches() == []
+
+
+@pytest.mark.asyncio
+async def test_position_drift_is_a_mismatch(test_db: AsyncSession):
+    """Test that a drifted last_position is reported even when the amounts match."""
+    ledger_repo = LedgerRepository(test_db)
+    balance_repo = RestaurantBalanceRepository(test_db)
+    await ledger_repo.create_many(
+        [_entry(LedgerEntryType.CHARGE, 10000), _entry(LedgerEntryType.FEE, -500)]
+    )
+
+    await test_db.execute(update(RestaurantBalance).values(last_position=1))
+    mismatches = await balance_repo.find_mismatches()
+    assert len(mismatches) == 1
+    assert mismatches[0]["expected"]["last_position"] == 2
+    assert mismatches[0]["stored"]["last_position"] == 1
@@ -0,0 +1,135 @@
+"""
+Tests for balance checkpoints and tail summation.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.repositories.checkpoint import BalanceCheckpointRepository
+from app.repositories.ledger import LedgerRepository
+
+
+def _entry(
+    entry_type: LedgerEntryType, amount: int, created_at: Optional[datetime] = None
+) -> LedgerEntry:
+    entry = LedgerEntry(
+        restaurant_id="res_cp_001",
+        currency="PEN",
+        entry_type=entry_type,
+        amount=amount,
+        reference_type="test",
+        reference_id="ref_cp",
+    )
+    if created_at is not None:
+        entry.created_at = created_at
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_balance_combines_checkpoint_and_tail(test_db: AsyncSession):
+    """Test that queries add the tail after the checkpoint to its totals."""
+    ledger_repo = LedgerRepository(test_db)
+    checkpoint_repo = BalanceCheckpointRepository(test_db)
+    now = datetime.utcnow()
+
+    await ledger_repo.create_many(
+        [_entry(LedgerEntryType.CHARGE, 10000), _entry(LedgerEntryType.FEE, -500)]
+    )
+    assert await checkpoint_repo.compact(now + timedelta(hours=1)) == 1
+
+    # Entry after the high-water mark stays in the tail
+    await ledger_repo.create(
+        _entry(LedgerEntryType.CHARGE, 2000, created_at=now + timedelta(hours=2))
+    )
+
+    assert await ledger_repo.get_balance("res_cp_001", "PEN") == 11500
+    assert await ledger_repo.get_breakdown("res_cp_001", "PEN") == {
+        "charge": 12000,
+        "fee": -500,
+    }
+    assert await ledger_repo.get_last_event_time("res_cp_001", "PEN") is not None
+
+
+@pytest.mark.asyncio
+async def test_compact_advances_existing_checkpoint(test_db: AsyncSession):
+    """Test that a second compaction merges only the new entries."""
+    ledger_repo = LedgerRepository(test_db)
+    checkpoint_repo = BalanceCheckpointRepository(test_db)
+    now = datetime.utcnow()
+
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 10000))
+    await checkpoint_repo.compact(now + timedelta(hours=1))
+    await ledger_repo.create(
+        _entry(LedgerEntryType.REFUND, -3000, created_at=now + timedelta(hours=2))
+    )
+
+    assert await checkpoint_repo.compact(now + timedelta(hours=3)) == 1
+    assert await checkpoint_repo.compact(now + timedelta(hours=3)) == 0
+
+    checkpoint = await checkpoint_repo.get_for_restaurant("res_cp_001", "PEN")
+    assert checkpoint.balance == 7000
+    assert checkpoint.totals == {"charge": 10000, "refund": -3000}
+    assert checkpoint.entry_count == 2
+    assert await ledger_repo.get_balance("res_cp_001", "PEN") == 7000
+
+
+@pytest.mark.asyncio
+async def test_payout_candidates_include_checkpointed_restaurants(test_db: AsyncSession):
+    """Test the set-based eligibility query across checkpoint and tail."""
+    ledger_repo = LedgerRepository(test_db)
+    checkpoint_repo = BalanceCheckpointRepository(test_db)
+    now = datetime.utcnow()
+
+    # Fully covered by the checkpoint, no tail entries
+    await ledger_repo.create_many(
+        [_entry(LedgerEntryType.CHARGE, 10000), _entry(LedgerEntryType.FEE, -500)]
+    )
+    await checkpoint_repo.compact(now + timedelta(hours=1))
+
+    # Below the minimum
+    small = _entry(LedgerEntryType.CHARGE, 100)
+    small.restaurant_id = "res_cp_002"
+    await ledger_repo.create(small)
+
+    candidates = await ledger_repo.get_payout_candidates(
+        "PEN", now.date(), min_amount=5000
+    )
+
+    assert [
+        {k: v for k, v in c.items() if k not in ("covered_position", "covered_until")}
+        for c in candidates
+    ] == [
+        {
+            "restaurant_id": "res_cp_001",
+            "balance": 9500,
+            "breakdown": {"charge": 10000, "fee": -500},
+        }
+    ]
+    assert candidates[0]["covered_position"] == 2
+    assert candidates[0]["covered_until"] is not None
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_entries_that_commit_after_the_cutoff(test_db: AsyncSession):
+    """Test that an entry with an old created_at written after compaction is not lost."""
+    ledger_repo = LedgerRepository(test_db)
+    checkpoint_repo = BalanceCheckpointRepository(test_db)
+    now = datetime.utcnow()
+
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 10000, now - timedelta(hours=2)))
+    assert await checkpoint_repo.compact(now - timedelta(hours=1)) == 1
+
+    # Long-running transaction: started (created_at) before the cutoff, committed after
+    await ledger_repo.create(
+        _entry(LedgerEntryType.CHARGE, 4000, created_at=now - timedelta(hours=3))
+    )
+    assert await ledger_repo.get_balance("res_cp_001", "PEN") == 14000
+
+    assert await checkpoint_repo.compact(now - timedelta(hours=1)) == 1
+    checkpoint = await checkpoint_repo.get_for_restaurant("res_cp_001", "PEN")
+    assert checkpoint.balance == 14000
+    assert checkpoint.covered_position == 2
+    assert await ledger_repo.get_balance("res_cp_001", "PEN") == 14000
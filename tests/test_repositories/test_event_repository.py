@@ -0,0 +1,45 @@
+"""
+Tests for processor event repository idempotent inserts.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.event import ProcessorEventRepository
+
+
+def _event_row(event_id: str) -> dict:
+    return {
+        "event_id": event_id,
+        "event_type": "charge_succeeded",
+        "occurred_at": datetime(2025, 12, 30, 10, 0, tzinfo=timezone.utc),
+        "restaurant_id": "res_repo_001",
+        "currency": "PEN",
+        "amount": 10000,
+        "fee": 500,
+        "processed_at": datetime(2025, 12, 30, 10, 0, 1, tzinfo=timezone.utc),
+    }
+
+
+@pytest.mark.asyncio
+async def test_insert_if_absent_is_idempotent(test_db: AsyncSession):
+    """Test that the second insert of an event_id is a no-op."""
+    repo = ProcessorEventRepository(test_db)
+
+    assert await repo.insert_if_absent(_event_row("evt_repo_001")) is True
+    assert await repo.insert_if_absent(_event_row("evt_repo_001")) is False
+    assert await repo.event_exists("evt_repo_001")
+
+
+@pytest.mark.asyncio
+async def test_insert_many_ignore_duplicates_returns_new_ids(test_db: AsyncSession):
+    """Test that only newly inserted event_ids are returned."""
+    repo = ProcessorEventRepository(test_db)
+    await repo.insert_if_absent(_event_row("evt_repo_existing"))
+
+    inserted = await repo.insert_many_ignore_duplicates(
+        [_event_row("evt_repo_existing"), _event_row("evt_repo_new")]
+    )
+
+    assert inserted == {"evt_repo_new"}
@@ -0,0 +1,51 @@
+"""
+Tests for the payout run work queue.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payout_run import PayoutRunStatus
+from app.repositories.payout_run_chunk import PayoutRunChunkRepository
+
+
+@pytest.mark.asyncio
+async def test_claim_respects_and_reclaims_expired_leases(test_db: AsyncSession):
+    """Test that claimed chunks are skipped until their lease expires."""
+    repo = PayoutRunChunkRepository(test_db)
+    now = datetime.now(timezone.utc)
+    await repo.create_for_run("run_queue_001", partitions=2)
+
+    first = await repo.claim("worker_a", limit=1, lease_seconds=60, now=now)
+    second = await repo.claim("worker_b", limit=5, lease_seconds=600, now=now)
+
+    assert [c.partition for c in first] == [0]
+    assert [c.partition for c in second] == [1]
+    assert await repo.claim("worker_c", limit=5, lease_seconds=60, now=now) == []
+
+    # worker_a crashed: its chunk is claimed again after the lease expires
+    later = now + timedelta(seconds=61)
+    reclaimed = await repo.claim("worker_c", limit=5, lease_seconds=60, now=later)
+
+    assert [(c.partition, c.attempts) for c in reclaimed] == [(0, 2)]
+    assert not await repo.complete(first[0].id, "worker_a", 0, 0, later)
+    assert await repo.complete(first[0].id, "worker_c", 3, 3, later)
+    assert await repo.count_by_status("run_queue_001") == {
+        PayoutRunStatus.COMPLETED: 1,
+        PayoutRunStatus.RUNNING: 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_renew_extends_only_a_held_lease(test_db: AsyncSession):
+    """Test that a renewed chunk is not reclaimed, and a lost lease cannot be renewed."""
+    repo = PayoutRunChunkRepository(test_db)
+    now = datetime.now(timezone.utc)
+    await repo.create_for_run("run_queue_002", partitions=1)
+    [chunk] = await repo.claim("worker_a", limit=1, lease_seconds=60, now=now)
+
+    assert await repo.renew(chunk.id, "worker_a", 60, now + timedelta(seconds=50))
+    later = now + timedelta(seconds=61)
+    assert await repo.claim("worker_b", limit=1, lease_seconds=60, now=later) == []
+    assert not await repo.renew(chunk.id, "worker_b", 60, now)
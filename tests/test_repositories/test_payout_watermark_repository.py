@@ -0,0 +1,114 @@
+"""
+Tests for incremental payout breakdowns driven by payout watermarks.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.models.payout import Payout
+from app.models.payout_item import PayoutItem
+from app.repositories.ledger import LedgerRepository
+from app.repositories.payout_watermark import PayoutWatermarkRepository
+from app.services.payout_generator import PayoutGeneratorService
+
+
+def _entry(entry_type: LedgerEntryType, amount: int, created_at: datetime) -> LedgerEntry:
+    entry = LedgerEntry(
+        restaurant_id="res_wm_001",
+        currency="PEN",
+        entry_type=entry_type,
+        amount=amount,
+        reference_type="test",
+        reference_id="ref_wm",
+    )
+    entry.created_at = created_at
+    return entry
+
+
+async def _items(session: AsyncSession, as_of_date) -> dict:
+    result = await session.execute(
+        select(PayoutItem.item_type, PayoutItem.amount)
+        .join(Payout, Payout.id == PayoutItem.payout_id)
+        .where(Payout.as_of_date == as_of_date)
+    )
+    return {item_type: amount for item_type, amount in result.all()}
+
+
+@pytest.mark.asyncio
+async def test_second_payout_breakdown_covers_only_new_entries(test_db: AsyncSession):
+    """Test that the watermark limits the breakdown to the period since the last payout."""
+    ledger_repo = LedgerRepository(test_db)
+    generator = PayoutGeneratorService(test_db)
+    now = datetime.utcnow()
+    first_day = now.date()
+    second_day = first_day + timedelta(days=1)
+
+    await ledger_repo.create_many(
+        [
+            _entry(LedgerEntryType.CHARGE, 10000, now - timedelta(hours=3)),
+            _entry(LedgerEntryType.FEE, -500, now - timedelta(hours=2)),
+        ]
+    )
+    assert (await generator.generate("PEN", first_day, 5000)).payouts_created == 1
+
+    watermark = await PayoutWatermarkRepository(test_db).get_for_restaurant(
+        "res_wm_001", "PEN"
+    )
+    assert watermark.covered_until == now - timedelta(hours=2)
+    assert watermark.covered_position == 2
+
+    await ledger_repo.create(
+        _entry(LedgerEntryType.CHARGE, 8000, now + timedelta(hours=1))
+    )
+    assert (await generator.generate("PEN", second_day, 5000)).payouts_created == 1
+
+    assert await _items(test_db, first_day) == {"gross_sales": 10000, "fees": -500}
+    assert (await _items(test_db, second_day))["gross_sales"] == 8000
+
+
+@pytest.mark.asyncio
+async def test_entry_committed_after_a_payout_is_in_the_next_breakdown(
+    test_db: AsyncSession,
+):
+    """Test that an entry with an older created_at than the watermark is not skipped."""
+    ledger_repo = LedgerRepository(test_db)
+    generator = PayoutGeneratorService(test_db)
+    now = datetime.utcnow()
+    first_day = now.date()
+    second_day = first_day + timedelta(days=1)
+
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 10000, now - timedelta(hours=1)))
+    assert (await generator.generate("PEN", first_day, 5000)).payouts_created == 1
+
+    # Long-running transaction: started before the payout, committed after it
+    await ledger_repo.create(_entry(LedgerEntryType.CHARGE, 7000, now - timedelta(hours=2)))
+    assert (await generator.generate("PEN", second_day, 5000)).payouts_created == 1
+
+    assert (await _items(test_db, second_day))["gross_sales"] == 7000
+
+
+@pytest.mark.asyncio
+async def test_watermark_never_moves_backwards(test_db: AsyncSession):
+    """Test that an older payout leaves the whole watermark, payout id included, alone."""
+    repo = PayoutWatermarkRepository(test_db)
+    covered_until = datetime(2025, 12, 31)
+
+    def _row(position: int, payout_id: str) -> dict:
+        return {
+            "restaurant_id": "res_wm_back",
+            "currency": "PEN",
+            "covered_until": covered_until + timedelta(days=position),
+            "covered_position": position,
+            "last_payout_id": payout_id,
+        }
+
+    await repo.advance([_row(5, "po_newer")])
+    await repo.advance([_row(3, "po_older")])
+    watermark = await repo.get_for_restaurant("res_wm_back", "PEN")
+
+    assert watermark.covered_position == 5
+    assert watermark.covered_until == covered_until + timedelta(days=5)
+    assert watermark.last_payout_id == "po_newer"
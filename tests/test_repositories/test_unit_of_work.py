@@ -0,0 +1,48 @@
+"""
+Tests for the deferred-flush unit of work.
+"""
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ledger_entry import LedgerEntry, LedgerEntryType
+from app.repositories.ledger import LedgerRepository
+from app.repositories.unit_of_work import UnitOfWork
+
+
+def _entry(amount: int) -> LedgerEntry:
+    return LedgerEntry(
+        restaurant_id="res_uow_001",
+        currency="PEN",
+        entry_type=LedgerEntryType.CHARGE,
+        amount=amount,
+        reference_type="processor_event",
+        reference_id=f"evt_uow_{amount}",
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_is_buffered_until_flush(test_db: AsyncSession):
+    """Test that creates in deferred mode are written only on flush."""
+    uow = UnitOfWork(test_db)
+    repo = LedgerRepository(test_db, uow)
+
+    entry = await repo.create(_entry(1000))
+    await repo.create_many([_entry(2000), _entry(3000)])
+
+    assert entry.id is not None
+    assert uow.pending_count == 3
+    assert await repo.get_balance("res_uow_001", "PEN") == 0
+
+    assert await uow.flush() == 3
+    assert uow.pending_count == 0
+    assert await repo.get_balance("res_uow_001", "PEN") == 6000
+
+
+@pytest.mark.asyncio
+async def test_create_many_without_uow_writes_immediately(test_db: AsyncSession):
+    """Test that create_many inserts right away by default."""
+    repo = LedgerRepository(test_db)
+
+    await repo.create_many([_entry(1000), _entry(2000)])
+
+    assert await repo.get_balance("res_uow_001", "PEN") == 3000
@@ -0,0 +1,127 @@
+"""
+Tests for per-restaurant sharded event ingestion.
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.exc import DataError
+
+from app.api.v1 import processor
+from app.config import settings
+from app.schemas.processor import ProcessorEventRequest
+from app.services.event_dispatcher import EventDispatcher
+from app.services.event_processor import EventProcessorService
+from tests.conftest import TestSessionLocal, charge_event
+
+
+@pytest_asyncio.fixture
+async def dispatcher(monkeypatch):
+    """Dispatch mode enabled on POST /v1/processor/events."""
+    # One shard: the in-memory test database has a single shared connection
+    dispatcher = EventDispatcher(shards=1, queue_size=10, session_factory=TestSessionLocal)
+    dispatcher.start()
+    monkeypatch.setattr(processor, "event_dispatcher", dispatcher)
+    monkeypatch.setattr(settings, "EVENT_DISPATCH_ENABLED", True)
+    yield dispatcher
+    await dispatcher.stop()
+
+
+def test_restaurant_always_maps_to_the_same_shard():
+    """Test that sharding is stable per restaurant and spreads restaurants."""
+    dispatcher = EventDispatcher(shards=8)
+
+    assert dispatcher.shard_for("res_001") == dispatcher.shard_for("res_001")
+    assert len({dispatcher.shard_for(f"res_{n:03d}") for n in range(100)}) == 8
+
+
+@pytest.mark.asyncio
+async def test_dispatched_events_are_micro_batched(
+    client: AsyncClient, dispatcher: EventDispatcher, monkeypatch
+):
+    """Test that events queued while the worker is busy are applied as one batch."""
+    # Hold the worker in its first batch until the other events are queued
+    busy, release = asyncio.Event(), asyncio.Event()
+    apply = dispatcher._apply
+
+    async def held_apply(batch):
+        busy.set()
+        await release.wait()
+        await apply(batch)
+
+    monkeypatch.setattr(dispatcher, "_apply", held_apply)
+
+    events = [charge_event(f"evt_dispatch_00{n}", f"res_dispatch_00{n % 2}") for n in range(6)]
+    events.append(charge_event("evt_dispatch_000", "res_dispatch_000"))
+
+    first = asyncio.create_task(client.post("/v1/processor/events", json=events[0]))
+    await asyncio.wait_for(busy.wait(), timeout=5)
+    rest = [
+        asyncio.create_task(client.post("/v1/processor/events", json=event))
+        for event in events[1:]
+    ]
+    while dispatcher.stats()["queue_depths"][0] < len(rest):
+        await asyncio.sleep(0.01)
+    release.set()
+    responses = [await first, *await asyncio.gather(*rest)]
+
+    assert sorted(r.status_code for r in responses) == [200] + [201] * 6
+    assert dispatcher.stats()["events"] == 7
+    assert dispatcher.stats()["batches"] == 2
+
+    for restaurant_id in ("res_dispatch_000", "res_dispatch_001"):
+        balance = await client.get(f"/v1/restaurants/{restaurant_id}/balance?currency=PEN")
+        assert balance.json()["available"] == 28500
+
+
+@pytest.mark.asyncio
+async def test_rejected_event_fails_only_its_own_submitter(
+    client: AsyncClient, dispatcher: EventDispatcher, monkeypatch
+):
+    """Test that a poisoned event in a micro-batch does not fail the other events."""
+    build_charge_entries = EventProcessorService._build_charge_entries
+
+    def poisoned(event_data):
+        # Stands in for e.g. an amount out of bigint range on PostgreSQL
+        if event_data.event_id == "evt_poison_bad":
+            raise DataError("INSERT INTO ledger_entries", {}, Exception("bigint out of range"))
+        return build_charge_entries(event_data)
+
+    monkeypatch.setattr(EventProcessorService, "_build_charge_entries", staticmethod(poisoned))
+
+    busy, release = asyncio.Event(), asyncio.Event()
+    apply = dispatcher._apply
+
+    async def held_apply(batch):
+        busy.set()
+        await release.wait()
+        await apply(batch)
+
+    monkeypatch.setattr(dispatcher, "_apply", held_apply)
+
+    events = [
+        ProcessorEventRequest(**charge_event(event_id, restaurant_id))
+        for event_id, restaurant_id in [
+            ("evt_poison_001", "res_poison_001"),
+            ("evt_poison_002", "res_poison_001"),
+            ("evt_poison_bad", "res_poison_002"),
+            ("evt_poison_003", "res_poison_002"),
+        ]
+    ]
+    first = asyncio.create_task(dispatcher.submit(events[0]))
+    await asyncio.wait_for(busy.wait(), timeout=5)
+    rest = [asyncio.create_task(dispatcher.submit(event)) for event in events[1:]]
+    while dispatcher.stats()["queue_depths"][0] < len(rest):
+        await asyncio.sleep(0.01)
+    release.set()
+    results = [await first, *await asyncio.gather(*rest, return_exceptions=True)]
+
+    assert results[:2] == [(True, "Event processed successfully")] * 2
+    assert isinstance(results[2], DataError)
+    assert results[3] == (True, "Event processed successfully")
+    assert dispatcher.stats()["events"] == 3
+    assert dispatcher.stats()["failures"] == 1
+
+    balance = await client.get("/v1/restaurants/res_poison_002/balance?currency=PEN")
+    assert balance.json()["available"] == 9500
@@ -0,0 +1,122 @@
+"""
+Tests for the durable event ingestion spool.
+"""
+import json
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.v1 import processor
+from app.config import settings
+from app.services.event_spool import EventSpool
+from tests.conftest import TestSessionLocal, charge_event
+
+RESTAURANT_ID = "res_spool_001"
+
+
+def _spool(directory: str) -> EventSpool:
+    return EventSpool(
+        str(directory), session_factory=TestSessionLocal, fsync_interval_ms=1, batch_size=2
+    )
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    """Spool mode enabled on POST /v1/processor/events, drained by hand."""
+    spool = _spool(tmp_path)
+    spool.open()
+    monkeypatch.setattr(processor, "event_spool", spool)
+    monkeypatch.setattr(settings, "EVENT_SPOOL_ENABLED", True)
+    yield spool
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_spooled_events_are_applied_by_drain(client: AsyncClient, spool: EventSpool):
+    """Test 202 on ingest, then batched, idempotent application by the drain."""
+    events = [
+        charge_event("evt_spool_001", RESTAURANT_ID),
+        charge_event("evt_spool_002", RESTAURANT_ID, 5000),
+        charge_event("evt_spool_001", RESTAURANT_ID),
+    ]
+    for event in events:
+        response = await client.post("/v1/processor/events", json=event)
+        assert response.status_code == 202
+        assert response.json()["status"] == "accepted"
+
+    assert spool.stats()["depth"] == 3
+    not_yet = await client.get("/v1/restaurants/res_spool_001/balance?currency=PEN")
+    assert not_yet.status_code == 404
+
+    assert await spool.drain_once() == 2
+    assert await spool.drain_once() == 1
+    assert await spool.drain_once() == 0
+
+    balance = await client.get("/v1/restaurants/res_spool_001/balance?currency=PEN")
+    assert balance.json()["available"] == 14000
+    stats = spool.stats()
+    assert stats["depth"] == 0
+    assert stats["drained"] == 3
+    assert stats["drain_rate_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_spool_replays_undrained_events_after_restart(
+    client: AsyncClient, spool: EventSpool, tmp_path
+):
+    """Test that a reopened spool resumes from the drain offset."""
+    for n in range(3):
+        event = charge_event(f"evt_replay_00{n}", RESTAURANT_ID)
+        await client.post("/v1/processor/events", json=event)
+    assert await spool.drain_once() == 2
+    spool.close()
+
+    # Crash in the middle of an unacknowledged write
+    with open(os.path.join(tmp_path, "000000000001.spool"), "ab") as f:
+        f.write(b'{"event_id": "evt_torn"')
+
+    restarted = _spool(tmp_path)
+    restarted.open()
+    try:
+        assert restarted.stats()["depth"] == 1
+        assert await restarted.drain_once() == 1
+    finally:
+        restarted.close()
+
+    balance = await client.get("/v1/restaurants/res_spool_001/balance?currency=PEN")
+    assert balance.json()["available"] == 28500
+
+
+@pytest.mark.asyncio
+async def test_lines_that_cannot_be_applied_are_moved_aside(
+    client: AsyncClient, spool: EventSpool, tmp_path
+):
+    """Test that a bad spooled line is rejected instead of blocking the drain."""
+    spool.close()
+    with open(os.path.join(tmp_path, "000000000001.spool"), "ab") as f:
+        f.write(json.dumps(charge_event("evt_poison_001", RESTAURANT_ID)).encode() + b"\n")
+        f.write(b"not json\n")
+        f.write(json.dumps({"event_id": "evt_poison_bad"}).encode() + b"\n")
+        f.write(json.dumps(charge_event("evt_poison_002", RESTAURANT_ID)).encode() + b"\n")
+
+    restarted = _spool(tmp_path)
+    restarted.open()
+    try:
+        assert await restarted.drain_once() == 2
+        assert await restarted.drain_once() == 2
+        assert await restarted.drain_once() == 0
+        stats = restarted.stats()
+    finally:
+        restarted.close()
+
+    assert stats["depth"] == 0
+    assert stats["drained"] == 2
+    assert stats["rejected"] == 2
+    balance = await client.get("/v1/restaurants/res_spool_001/balance?currency=PEN")
+    assert balance.json()["available"] == 19000
+
+    with open(os.path.join(tmp_path, "rejected.ndjson")) as f:
+        rejected = [json.loads(line) for line in f]
+    assert [r["line"] for r in rejected] == ["not json", '{"event_id": "evt_poison_bad"}']
+    assert all(r["error"] for r in rejected)
@@ -0,0 +1,38 @@
+"""
+Tests for the payout run worker.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models.payout_run_chunk import PayoutRunChunk
+from app.services.payout_runner import PayoutRunService, PayoutRunWorker
+from tests.conftest import TestSessionLocal
+
+
+async def _lease_expires_at(chunk_id):
+    async with TestSessionLocal() as session:
+        result = await session.execute(
+            select(PayoutRunChunk.lease_expires_at).where(PayoutRunChunk.id == chunk_id)
+        )
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_a_chunk_is_processed(test_db):
+    """Test that a slow chunk keeps extending its lease."""
+    await PayoutRunService(test_db).create_run("PEN", date(2025, 12, 31), 5000, partitions=1)
+    await test_db.commit()
+
+    worker = PayoutRunWorker(concurrency=1, lease_seconds=0.3, session_factory=TestSessionLocal)
+    [chunk] = await worker._claim()
+    claimed_until = await _lease_expires_at(chunk.chunk_id)
+
+    heartbeat = asyncio.create_task(worker._keep_lease(chunk))
+    await asyncio.sleep(0.25)
+    heartbeat.cancel()
+    await asyncio.gather(heartbeat, return_exceptions=True)
+
+    assert await _lease_expires_at(chunk.chunk_id) > claimed_until